@@ -9,6 +9,7 @@ from mlflow.tracking import MlflowClient
 sys.path.append("/opt/airflow/project")
 
 from scripts.train import train as train_telco_model  
+from scripts.data_cache import ensure_cache
 
 
 MLFLOW_TRACKING_URI = "http://mlflow:5050" 
@@ -19,11 +20,14 @@ def ingest_telco_data():
     """
     Kiểm tra file data có tồn tại ?
     Nếu muốn làm chuẩn hơn có thể sửa hàm này để download / sync data.
+    Build luôn cache Parquet có kiểu (key = md5 trong .dvc) để task train
+    và monitoring đọc cache thay vì parse lại CSV.
     """
     data_path = "/opt/airflow/project/data/telco_churn.csv"
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"{data_path} not found")
     print(f"[Ingest] Telco dataset available at {data_path}")
+    print(f"[Ingest] Typed data cache: {ensure_cache(data_path)}")
 
 
 def run_training():
@@ -0,0 +1,80 @@
+"""
+Benchmark build + serialize response của /predict_batch.
+
+    python -m scripts.benchmarks.batch_response
+
+So sánh (chỉ phần response, không tính scoring):
+  - pydantic: tạo TelcoPrediction từng dòng + TelcoBatchResponse, rồi FastAPI
+    validate + serialize response_model và JSONResponse render (path cũ)
+  - fast:     serialization.batch_response_bytes(proba, pred) (path hiện tại)
+"""
+import argparse
+import json
+import time
+from typing import Callable
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from scripts.service import serialization
+from scripts.service.schemas.response import TelcoBatchResponse, TelcoPrediction
+
+BATCH_SIZES = [1, 100, 10_000]
+
+_response_field = create_model_field(
+    name="Response_predict_batch", type_=TelcoBatchResponse, mode="serialization"
+)
+
+
+def pydantic_response(proba: np.ndarray, pred: np.ndarray) -> bytes:
+    preds = [
+        TelcoPrediction(churn_probability=float(p), churn_predicted=int(y))
+        for p, y in zip(proba, pred)
+    ]
+    # như fastapi.routing.serialize_response: validate lại theo response_model rồi serialize
+    value, errors = _response_field.validate(
+        TelcoBatchResponse(predictions=preds), {}, loc=("response",)
+    )
+    assert not errors
+    return JSONResponse(_response_field.serialize(value, mode="json")).body
+
+
+def fast_response(proba: np.ndarray, pred: np.ndarray) -> bytes:
+    return serialization.batch_response_bytes(proba, pred)
+
+
+def _time(fn: Callable[[], bytes], min_seconds: float) -> float:
+    """Thời gian trung bình / lần gọi (s)."""
+    fn()
+    n, elapsed = 0, 0.0
+    t0 = time.perf_counter()
+    while elapsed < min_seconds:
+        fn()
+        n += 1
+        elapsed = time.perf_counter() - t0
+    return elapsed / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    encoder = "orjson" if serialization.orjson is not None else "stdlib"
+    print(f"encoder: {encoder}")
+    print(f"{'batch':>8} {'pydantic (ms)':>14} {'fast (ms)':>10} {'speedup':>8}")
+
+    for n in BATCH_SIZES:
+        proba = rng.random(n)
+        pred = (proba >= 0.5).astype(int)
+        # cùng schema + giá trị với path cũ
+        assert json.loads(fast_response(proba, pred)) == json.loads(pydantic_response(proba, pred))
+        slow = _time(lambda: pydantic_response(proba, pred), args.min_seconds)
+        fast = _time(lambda: fast_response(proba, pred), args.min_seconds)
+        print(f"{n:>8} {slow * 1e3:>14.3f} {fast * 1e3:>10.3f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Cache dạng cột (Parquet, có kiểu) cho dữ liệu train data/telco_churn.csv.
+
+CSV được parse đúng 1 lần: chỉ giữ các cột thật sự dùng (6 feature, Churn,
+TotalCharges), category -> dtype category, TotalCharges -> float (chuỗi rỗng
+thành NaN). Các lần sau (train, task ingest của Airflow, reference profile /
+report drift của monitoring) đọc thẳng Parquet, chỉ các cột cần.
+
+- Key = md5 của dữ liệu. Có CSV: md5 thật của file; md5 trong <file>.dvc chỉ
+  được dùng thẳng khi cache của nó được build từ đúng file này (size + mtime
+  lưu trong metadata Parquet), nên CSV bị sửa / lệch với .dvc (`dvc status`
+  -> modified) sẽ có key mới -> build lại. Không có CSV: md5 trong .dvc, có
+  cache đúng md5 thì vẫn đọc được.
+- File: <TELCO_DATA_CACHE_DIR hoặc thư mục chứa CSV/.cache>/<tên>.<md5>.v<format>.parquet
+- Cột không có trong cache -> đọc CSV như cũ.
+
+Build trước (vd. task ingest của Airflow / Docker build):
+
+    python -m scripts.data_cache --data data/telco_churn.csv
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+
+logger = logging.getLogger("telco-data")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_DATA_PATH = PROJECT_ROOT / "data" / "telco_churn.csv"
+
+# rỗng = thư mục .cache cạnh file CSV
+CACHE_DIR = os.getenv("TELCO_DATA_CACHE_DIR", "")
+# đổi cột / dtype thì tăng số này để cache cũ bị build lại
+CACHE_FORMAT = 1
+
+CACHE_DTYPES: Dict[str, str] = {
+    "Contract": "category",
+    "tenure": "int64",
+    "MonthlyCharges": "float64",
+    "InternetService": "category",
+    "OnlineSecurity": "category",
+    "TechSupport": "category",
+    "TotalCharges": "float64",
+    "Churn": "category",
+}
+
+
+SOURCE_SIZE_KEY = b"telco.source_size"
+SOURCE_MTIME_KEY = b"telco.source_mtime_ns"
+
+
+def dvc_md5(path: Path) -> Optional[str]:
+    """outs[].md5 của `path` trong <path>.dvc (None nếu không có / không đọc được)."""
+    path = Path(path)
+    dvc_file = path.with_name(path.name + ".dvc")
+    if not dvc_file.exists():
+        return None
+    try:
+        meta = yaml.safe_load(dvc_file.read_text(encoding="utf-8")) or {}
+        for out in meta.get("outs", []):
+            if out.get("path") == path.name and out.get("md5"):
+                return out["md5"]
+    except Exception as e:
+        logger.warning(f"[DATA] could not parse {dvc_file}: {e!r}")
+    return None
+
+
+def _built_from(cached: Path, path: Path) -> bool:
+    """Cache `cached` được build từ đúng file `path` hiện tại (size + mtime)?"""
+    if not cached.exists():
+        return False
+    meta = pq.read_schema(cached).metadata or {}
+    st = path.stat()
+    return meta.get(SOURCE_SIZE_KEY) == str(st.st_size).encode() and meta.get(
+        SOURCE_MTIME_KEY
+    ) == str(st.st_mtime_ns).encode()
+
+
+def data_hash(path: Path) -> Optional[str]:
+    """
+    md5 của dữ liệu: không có file -> outs[].md5 trong <path>.dvc; có file ->
+    md5 trong .dvc nếu cache của nó build từ đúng file này, không thì hash file.
+    """
+    path = Path(path)
+    recorded = dvc_md5(path)
+    if not path.exists():
+        return recorded
+    if recorded is not None and _built_from(cache_path(path, recorded), path):
+        return recorded
+
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_path(path: Path, digest: str) -> Path:
+    path = Path(path)
+    root = Path(CACHE_DIR) if CACHE_DIR else path.parent / ".cache"
+    return root / f"{path.stem}.{digest}.v{CACHE_FORMAT}.parquet"
+
+
+def read_csv_typed(path: Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Đọc CSV (chỉ `columns`, None = mọi cột) với dtype của cache."""
+    wanted = None if columns is None else set(columns)
+    df = pd.read_csv(
+        path,
+        usecols=None if wanted is None else (lambda c: c in wanted),
+        dtype={c: t for c, t in CACHE_DTYPES.items() if t == "category"},
+    )
+    if "TotalCharges" in df.columns:
+        # chuỗi rỗng / " " -> NaN
+        df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors="coerce")
+    return df if columns is None else df[list(columns)]
+
+
+def build_cache(path: Path, digest: Optional[str] = None) -> Path:
+    """Parse CSV 1 lần (chỉ các cột trong CACHE_DTYPES) rồi ghi Parquet."""
+    path = Path(path)
+    digest = digest or data_hash(path)
+    out = cache_path(path, digest)
+
+    t0 = time.perf_counter()
+    st = path.stat()
+    header = pd.read_csv(path, nrows=0).columns
+    df = read_csv_typed(path, [c for c in CACHE_DTYPES if c in header])
+    df = df.astype({c: t for c, t in CACHE_DTYPES.items() if c in df.columns})
+
+    # size + mtime của CSV nguồn: data_hash dùng để tin md5 trong .dvc mà không hash lại
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {
+            **(table.schema.metadata or {}),
+            SOURCE_SIZE_KEY: str(st.st_size).encode(),
+            SOURCE_MTIME_KEY: str(st.st_mtime_ns).encode(),
+        }
+    )
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, out)
+    logger.info(
+        f"[DATA] Built data cache {out.name} ({len(df)} rows, {len(df.columns)} columns) "
+        f"in {time.perf_counter() - t0:.3f}s"
+    )
+    return out
+
+
+def ensure_cache(path: Path = DEFAULT_DATA_PATH) -> Optional[Path]:
+    """File cache cho `path` (build nếu chưa có); None nếu không có cả cache lẫn CSV."""
+    path = Path(path)
+    digest = data_hash(path)
+    if digest is None:
+        return None
+    out = cache_path(path, digest)
+    if out.exists():
+        return out
+    if not path.exists():
+        return None
+    return build_cache(path, digest)
+
+
+def column_names(path: Path) -> List[str]:
+    """Các cột đọc được từ `path`: header CSV, không có CSV thì schema của cache."""
+    path = Path(path)
+    if path.exists():
+        return list(pd.read_csv(path, nrows=0).columns)
+    digest = data_hash(path)
+    if digest is not None and cache_path(path, digest).exists():
+        return list(pq.read_schema(cache_path(path, digest)).names)
+    return []
+
+
+def read_table(path: Path, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Các cột `columns` của dữ liệu `path`: từ cache Parquet (build lần đầu),
+    fallback đọc CSV nếu có cột ngoài cache. FileNotFoundError nếu không có dữ liệu.
+    """
+    path = Path(path)
+    cached = ensure_cache(path)
+    if cached is not None:
+        available = set(pq.read_schema(cached).names)
+        if set(columns) <= available:
+            return pd.read_parquet(cached, columns=list(columns))
+    if not path.exists():
+        raise FileNotFoundError(f"{path} not found and no data cache covers {list(columns)}")
+    return read_csv_typed(path, columns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build typed Parquet cache of training data")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_PATH))
+    args = parser.parse_args()
+
+    out = ensure_cache(Path(args.data))
+    if out is None:
+        raise SystemExit(f"Training data not found: {args.data}")
+    print(f"✅ Data cache: {out}")
+
+
+if __name__ == "__main__":
+    main()
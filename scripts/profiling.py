@@ -0,0 +1,68 @@
+"""
+Đo thời gian + peak RAM (RSS) của 1 đoạn code, dùng chung cho train offline
+(scripts.train, từng stage) và service (render drift report).
+"""
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS hiện tại của process (Linux, /proc/self/statm); None nếu không đọc được."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class ResourceMeter:
+    """
+    with ResourceMeter() as m: ...  -> m.seconds, m.peak_rss_bytes
+    Peak RSS của process trong khoảng đo: lấy mẫu /proc/self/statm mỗi
+    `interval` giây (Linux); nơi khác dùng ru_maxrss (peak từ lúc process chạy).
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.seconds = 0.0
+        self.peak_rss_bytes: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._observe()
+
+    def _observe(self) -> None:
+        rss = rss_bytes()
+        if rss is not None and (self.peak_rss_bytes is None or rss > self.peak_rss_bytes):
+            self.peak_rss_bytes = rss
+
+    def __enter__(self) -> "ResourceMeter":
+        self._t0 = time.perf_counter()
+        self._observe()
+        if self.peak_rss_bytes is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._observe()
+        if self.peak_rss_bytes is None:
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Linux: KB, macOS: bytes
+            self.peak_rss_bytes = maxrss if sys.platform == "darwin" else maxrss * 1024
+        self.seconds = time.perf_counter() - self._t0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 3),
+            "peak_memory_mb": round((self.peak_rss_bytes or 0) / 2**20, 1),
+        }
@@ -0,0 +1,381 @@
+"""
+Hyperparameter search song song cho model telco churn (successive halving).
+
+- Ứng viên: các cấu hình LogisticRegression (C, penalty, solver, class_weight)
+  và estimator khác (RandomForest, GradientBoosting), đều đi qua
+  scripts.train.make_model nên dùng chung preprocessor với train().
+  Đổi không gian search bằng file JSON (TELCO_SEARCH_SPACE_PATH):
+      [{"estimator": "logreg", "params": {"C": 0.5}}, ...]
+- Successive halving: rung đầu mọi ứng viên fit trên phần nhỏ data
+  (TELCO_SEARCH_MIN_FRACTION), mỗi rung chỉ giữ 1/ETA ứng viên tốt nhất
+  (theo TELCO_SEARCH_METRIC trên tập validation) và tăng lượng data ETA lần,
+  rung cuối dùng toàn bộ phần train.
+- Trial chạy trên process pool (TELCO_SEARCH_WORKERS process, mỗi process
+  giới hạn 1 thread BLAS/OpenMP). Dừng sớm khi tổng CPU time của các trial
+  vượt TELCO_SEARCH_CPU_BUDGET_SECONDS hoặc quá TELCO_SEARCH_TIME_LIMIT_SECONDS
+  (wall clock, trial đang chạy bị kill); 0 = không giới hạn.
+- MLflow: 1 run cha "search", mỗi trial (ứng viên x rung) là 1 nested run.
+  Ứng viên tốt nhất được fit lại trên toàn bộ phần train, đánh giá trên tập
+  test như train(), log + đăng ký + promote trên run cha. Có time limit mà
+  fit lại trên toàn bộ phần train (ước lượng từ fit_seconds của trial) sẽ
+  vượt deadline thì chỉ fit lại trên đúng phần data của trial tốt nhất
+  (thời gian đã đo được), param refit_data = train | rung<n>.
+
+    python -m scripts.train --search --workers 4 --cpu-budget 1800 --time-limit 900
+"""
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import mlflow
+import mlflow.sklearn
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+
+from scripts import train as train_module
+
+SEARCH_WORKERS = int(os.getenv("TELCO_SEARCH_WORKERS", str(os.cpu_count() or 1)))
+SEARCH_CPU_BUDGET_SECONDS = float(os.getenv("TELCO_SEARCH_CPU_BUDGET_SECONDS", "0"))
+SEARCH_TIME_LIMIT_SECONDS = float(os.getenv("TELCO_SEARCH_TIME_LIMIT_SECONDS", "0"))
+SEARCH_ETA = int(os.getenv("TELCO_SEARCH_ETA", "3"))
+SEARCH_MIN_FRACTION = float(os.getenv("TELCO_SEARCH_MIN_FRACTION", "0.1"))
+SEARCH_METRIC = os.getenv("TELCO_SEARCH_METRIC", "f1")
+SEARCH_SPACE_PATH = os.getenv("TELCO_SEARCH_SPACE_PATH")
+
+ESTIMATORS = {
+    "logreg": LogisticRegression,
+    "sgd": SGDClassifier,
+    "random_forest": RandomForestClassifier,
+    "gradient_boosting": GradientBoostingClassifier,
+}
+
+
+def default_space() -> List[Dict[str, Any]]:
+    space: List[Dict[str, Any]] = []
+    for C in (0.01, 0.1, 1.0, 10.0):
+        for class_weight in (None, "balanced"):
+            for penalty, solver in (("l2", "lbfgs"), ("l1", "liblinear")):
+                space.append(
+                    {
+                        "estimator": "logreg",
+                        "params": {
+                            "C": C,
+                            "penalty": penalty,
+                            "solver": solver,
+                            "class_weight": class_weight,
+                            "max_iter": 500,
+                        },
+                    }
+                )
+    for n_estimators in (100, 300):
+        for max_depth in (8, None):
+            space.append(
+                {
+                    "estimator": "random_forest",
+                    "params": {
+                        "n_estimators": n_estimators,
+                        "max_depth": max_depth,
+                        "min_samples_leaf": 5,
+                        "random_state": 42,
+                    },
+                }
+            )
+    for n_estimators in (100, 200):
+        for learning_rate in (0.05, 0.1):
+            space.append(
+                {
+                    "estimator": "gradient_boosting",
+                    "params": {
+                        "n_estimators": n_estimators,
+                        "learning_rate": learning_rate,
+                        "max_depth": 3,
+                        "random_state": 42,
+                    },
+                }
+            )
+    return space
+
+
+def load_space(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        space = json.load(f)
+    for candidate in space:
+        if candidate.get("estimator") not in ESTIMATORS:
+            raise ValueError(f"Unknown estimator in search space: {candidate.get('estimator')}")
+        candidate.setdefault("params", {})
+    return space
+
+
+def make_estimator(candidate: Dict[str, Any]) -> Any:
+    return ESTIMATORS[candidate["estimator"]](**candidate["params"])
+
+
+def rung_fractions(min_fraction: float = SEARCH_MIN_FRACTION, eta: int = SEARCH_ETA) -> List[float]:
+    """Phần data của từng rung, vd. (0.1, 3) -> [1/9, 1/3, 1]."""
+    fractions = [1.0]
+    while eta > 1 and fractions[0] / eta >= min_fraction:
+        fractions.insert(0, fractions[0] / eta)
+    return fractions
+
+
+def _subset(y: pd.Series, fraction: float, seed: int = 42) -> np.ndarray:
+    """Vị trí các dòng của 1 rung (lấy mẫu phân tầng theo nhãn)."""
+    positions = np.arange(len(y))
+    if fraction >= 1.0:
+        return positions
+    picked, _ = train_test_split(
+        positions, train_size=fraction, stratify=y, random_state=seed
+    )
+    return np.sort(picked)
+
+
+# ================= WORKER PROCESS ===================
+_data: Dict[str, Any] = {}
+
+
+def _init_worker(X_fit, y_fit, X_val, y_val) -> None:
+    """Chạy 1 lần mỗi worker: nhận data (pickle 1 lần) + giới hạn 1 thread."""
+    from threadpoolctl import threadpool_limits
+
+    # mỗi trial dùng đúng 1 core -> số worker = số core bị chiếm
+    _data["limits"] = threadpool_limits(limits=1)
+    _data.update(X_fit=X_fit, y_fit=y_fit, X_val=X_val, y_val=y_val)
+
+
+def _evaluate(task: Dict[str, Any]) -> Dict[str, Any]:
+    positions = task["positions"]
+    X_fit, y_fit = _data["X_fit"].iloc[positions], _data["y_fit"].iloc[positions]
+    model = train_module.make_model(estimator=make_estimator(task["candidate"]))
+
+    t0, c0 = time.perf_counter(), time.process_time()
+    model.fit(X_fit, y_fit)
+    fit_seconds, cpu_seconds = time.perf_counter() - t0, time.process_time() - c0
+
+    y_pred = model.predict(_data["X_val"])
+    return {
+        "accuracy": accuracy_score(_data["y_val"], y_pred),
+        "f1": f1_score(_data["y_val"], y_pred),
+        "fit_seconds": fit_seconds,
+        "cpu_seconds": cpu_seconds,
+        "n_train": len(positions),
+    }
+
+
+def _kill(pool: ProcessPoolExecutor, existing: set) -> None:
+    """
+    Dừng pool ngay: ProcessPoolExecutor không có API public để kill worker
+    đang chạy, nên terminate các process con sinh ra sau khi tạo pool
+    (`existing` = process con có từ trước, không đụng tới).
+    """
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proc in multiprocessing.active_children():
+        if proc.pid not in existing:
+            proc.terminate()
+
+
+# ================= SEARCH ===================
+def _log_trial(
+    cid: int,
+    candidate: Dict[str, Any],
+    rung: int,
+    fraction: float,
+    result: Optional[Dict[str, Any]],
+    status: str,
+    error: Optional[str] = None,
+) -> None:
+    with mlflow.start_run(run_name=f"trial-{cid:02d}-rung{rung}", nested=True):
+        mlflow.log_param("candidate_id", cid)
+        mlflow.log_param("estimator", candidate["estimator"])
+        mlflow.log_params({f"clf__{k}": v for k, v in candidate["params"].items()})
+        mlflow.log_param("rung", rung)
+        mlflow.log_param("data_fraction", round(fraction, 4))
+        mlflow.set_tag("status", status)
+        if error:
+            mlflow.set_tag("error", error[:500])
+        if result:
+            mlflow.log_param("n_train", result["n_train"])
+            for key in ("accuracy", "f1", "fit_seconds", "cpu_seconds"):
+                mlflow.log_metric(key, result[key])
+
+
+def run_search(
+    df: Optional[pd.DataFrame] = None,
+    space: Optional[List[Dict[str, Any]]] = None,
+    workers: int = SEARCH_WORKERS,
+    cpu_budget: float = SEARCH_CPU_BUDGET_SECONDS,
+    time_limit: float = SEARCH_TIME_LIMIT_SECONDS,
+    eta: int = SEARCH_ETA,
+    min_fraction: float = SEARCH_MIN_FRACTION,
+    metric: str = SEARCH_METRIC,
+) -> Dict[str, Any]:
+    """Search + đăng ký/promote ứng viên tốt nhất; trả kết quả giống train()."""
+    if train_module.MLFLOW_TRACKING_URI:
+        mlflow.set_tracking_uri(train_module.MLFLOW_TRACKING_URI)
+
+    mlflow.set_experiment(train_module.EXPERIMENT_NAME)
+
+    t_start = time.perf_counter()
+    deadline = t_start + time_limit if time_limit > 0 else None
+
+    df = train_module.load_data() if df is None else df
+    X, y, _ = train_module.build_pipeline(df)
+    # cùng split với train(); validation cho halving lấy từ phần train, test giữ cho model cuối
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=0.25, random_state=42, stratify=y_train
+    )
+    X_fit, y_fit = X_fit.reset_index(drop=True), y_fit.reset_index(drop=True)
+
+    if space is None:
+        space = load_space(SEARCH_SPACE_PATH) if SEARCH_SPACE_PATH else default_space()
+    fractions = rung_fractions(min_fraction, eta)
+
+    with mlflow.start_run(run_name="search") as parent:
+        mlflow.log_param("mode", "search")
+        mlflow.log_param("candidates", len(space))
+        mlflow.log_param("workers", workers)
+        mlflow.log_param("cpu_budget_seconds", cpu_budget)
+        mlflow.log_param("time_limit_seconds", time_limit)
+        mlflow.log_param("eta", eta)
+        mlflow.log_param("rung_fractions", [round(f, 4) for f in fractions])
+        mlflow.log_param("metric", metric)
+
+        existing = {proc.pid for proc in multiprocessing.active_children()}
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(X_fit, y_fit, X_val, y_val),
+        )
+        alive = list(range(len(space)))
+        cpu_used, trials = 0.0, 0
+        stop_reason: Optional[str] = None
+        leaderboard: Optional[List[int]] = None
+        leader_results: Dict[int, Dict[str, Any]] = {}
+        reached_rung = -1
+        try:
+            for rung, fraction in enumerate(fractions):
+                positions = _subset(y_fit, fraction)
+                pending = {
+                    pool.submit(
+                        _evaluate, {"candidate": space[cid], "positions": positions}
+                    ): cid
+                    for cid in alive
+                }
+                results: Dict[int, Dict[str, Any]] = {}
+                while pending:
+                    timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    if not done:
+                        stop_reason = "time_limit"
+                        break
+                    for future in done:
+                        cid = pending.pop(future)
+                        if future.cancelled():
+                            continue
+                        trials += 1
+                        try:
+                            results[cid] = future.result()
+                        except Exception as e:
+                            _log_trial(cid, space[cid], rung, fraction, None, "failed", repr(e))
+                            continue
+                        cpu_used += results[cid]["cpu_seconds"]
+                    if cpu_budget > 0 and cpu_used >= cpu_budget and stop_reason is None:
+                        stop_reason = "cpu_budget"
+                        for future in pending:
+                            future.cancel()
+
+                ranked = sorted(results, key=lambda c: results[c][metric], reverse=True)
+                keep = len(ranked)
+                if stop_reason is None and rung < len(fractions) - 1:
+                    keep = max(1, math.ceil(len(ranked) / eta))
+                for pos, cid in enumerate(ranked):
+                    status = "promoted" if pos < keep else "pruned"
+                    if stop_reason is not None or rung == len(fractions) - 1:
+                        status = "final" if stop_reason is None else "stopped"
+                    _log_trial(cid, space[cid], rung, fraction, results[cid], status)
+                if ranked:
+                    leaderboard, leader_results, reached_rung = ranked, results, rung
+                print(
+                    f"[search] rung {rung} ({fraction:.2f} of train data): {len(results)} trials, "
+                    f"best {metric}={results[ranked[0]][metric]:.4f}" if ranked else
+                    f"[search] rung {rung}: no finished trials"
+                )
+                if stop_reason is not None or not ranked:
+                    break
+                alive = ranked[:keep]
+        finally:
+            if stop_reason == "time_limit":
+                _kill(pool, existing)
+            else:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        if not leaderboard:
+            raise RuntimeError(f"Search finished without any successful trial ({stop_reason})")
+
+        # ứng viên tốt nhất ở rung cao nhất đã chạy: fit lại trên toàn bộ phần train,
+        # trừ khi (ước lượng theo trial của nó) sẽ vượt deadline -> data của trial đó
+        best_id = leaderboard[0]
+        best = space[best_id]
+        best_result = leader_results[best_id]
+        X_refit, y_refit, refit_data = X_train, y_train, "train"
+        if deadline is not None:
+            estimate = best_result["fit_seconds"] * len(X_train) / best_result["n_train"]
+            if time.perf_counter() + estimate > deadline:
+                positions = _subset(y_fit, fractions[reached_rung])
+                X_refit, y_refit = X_fit.iloc[positions], y_fit.iloc[positions]
+                refit_data = f"rung{reached_rung}"
+        model = train_module.make_model(estimator=make_estimator(best))
+        model.fit(X_refit, y_refit)
+        y_pred = model.predict(X_test)
+        acc = accuracy_score(y_test, y_pred)
+        f1 = f1_score(y_test, y_pred)
+        search_seconds = time.perf_counter() - t_start
+
+        mlflow.log_param("model_type", type(model.named_steps["clf"]).__name__)
+        mlflow.log_param("best_candidate_id", best_id)
+        mlflow.log_param("refit_data", refit_data)
+        mlflow.log_params({f"best_clf__{k}": v for k, v in best["params"].items()})
+        mlflow.set_tag("stop_reason", stop_reason or "completed")
+        mlflow.log_metric("accuracy", acc)
+        mlflow.log_metric("f1", f1)
+        mlflow.log_metric("search_seconds", search_seconds)
+        mlflow.log_metric("search_cpu_seconds", cpu_used)
+        mlflow.log_metric("trials", trials)
+        mlflow.log_metric("reached_rung", reached_rung)
+
+        mlflow.sklearn.log_model(
+            model,
+            "model",
+            registered_model_name=train_module.MODEL_NAME,
+        )
+
+        print(
+            f"accuracy={acc:.4f}, f1={f1:.4f} (best: {best['estimator']} {best['params']}, "
+            f"{trials} trials in {search_seconds:.1f}s, stop={stop_reason or 'completed'})"
+        )
+
+        run_id = parent.info.run_id
+        return {
+            "mode": "search",
+            "accuracy": acc,
+            "f1": f1,
+            "run_id": run_id,
+            "model_version": train_module.promote_run_model(run_id, acc, f1),
+            "best": best,
+            "trials": trials,
+            "stop_reason": stop_reason,
+            "refit_data": refit_data,
+            "search_seconds": round(search_seconds, 3),
+            "search_cpu_seconds": round(cpu_used, 3),
+        }
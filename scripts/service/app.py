@@ -2,11 +2,17 @@ import os
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from scripts.service.router import telco
 from scripts.service.router.telco import router as telco_router
-from scripts.service import monitoring
+from scripts.service import model_loader, monitoring
+
+# load model + warm-up ngay trong startup event (thay vì ở request /predict đầu tiên)
+PRELOAD_MODEL = os.getenv("TELCO_PRELOAD_MODEL", "1") == "1"
 
 app = FastAPI(
     title="Telco Churn Prediction API",
@@ -29,6 +35,15 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready():
+    """Readiness cho load balancer: chỉ 200 khi model đã load + warm-up xong."""
+    if not telco.is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    active = model_loader.current()
+    return {"status": "ready", "model_version": active.version if active else None}
+
+
 app.include_router(telco_router)
 app.include_router(monitoring.router)
 
@@ -36,8 +51,17 @@ app.include_router(monitoring.router)
 @app.on_event("startup")
 async def startup_event():
     monitoring.start_scheduler()
+    telco.start_microbatcher()
+    telco.start_shadow()
+    if PRELOAD_MODEL:
+        await run_in_threadpool(telco.preload_model)
+    model_loader.start_watcher()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    telco.shutdown_microbatcher()
+    telco.shutdown_shadow()
+    telco.shutdown_executor()
+    model_loader.shutdown_watcher()
     monitoring.shutdown_scheduler()
@@ -0,0 +1,152 @@
+"""
+Micro-batching dispatcher cho /predict.
+
+Các request /predict đồng thời được gom lại thành 1 batch rồi score bằng
+1 lần gọi vectorized. Batch đóng khi đủ max_batch_size hoặc khi record
+đầu tiên đã chờ quá max_wait_ms. Khi traffic thấp (không có request nào
+khác đang chờ) batch đóng ngay, không cộng thêm latency.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.service import metrics
+
+logger = logging.getLogger("telco-api")
+
+ScoreFn = Callable[[Sequence[Dict[str, Any]]], np.ndarray]
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        score_fn: ScoreFn,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._last_batch_size = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="telco-microbatcher", daemon=True
+            )
+            self._thread.start()
+        logger.info(
+            "[BATCH] micro-batcher started (max_batch_size=%d, max_wait_ms=%.1f)",
+            self.max_batch_size,
+            self.max_wait * 1000,
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        logger.info("[BATCH] micro-batcher stopped.")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, record: Dict[str, Any]) -> "Future[float]":
+        """Đưa 1 record vào hàng đợi, trả Future chứa xác suất churn."""
+        if not self.running:
+            self.start()
+        fut: "Future[float]" = Future()
+        self._queue.put((record, fut, time.perf_counter()))
+        return fut
+
+    # ------------------------------------------------------------------
+    def _collect(self, first: Tuple[Dict[str, Any], Future, float]) -> Tuple[list, bool]:
+        batch = [first]
+        stop = False
+
+        # adaptive: chỉ chờ thêm khi đang có tải (queue còn record hoặc batch trước > 1)
+        wait = self.max_wait
+        if self._queue.qsize() == 0 and self._last_batch_size <= 1:
+            wait = 0.0
+        deadline = time.perf_counter() + wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+
+        return batch, stop
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch, stop = self._collect(item)
+            self._score(batch)
+            if stop:
+                break
+
+        # không bỏ rơi request nào còn trong queue khi stop
+        leftover: List[Any] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for i in range(0, len(leftover), self.max_batch_size):
+            self._score(leftover[i:i + self.max_batch_size])
+
+    def _score(self, batch: list) -> None:
+        now = time.perf_counter()
+        self._last_batch_size = len(batch)
+        metrics.MICROBATCH_SIZE.observe(len(batch))
+        metrics.MICROBATCH_QUEUE_DEPTH.observe(self._queue.qsize())
+        for _, _, enqueued_at in batch:
+            metrics.MICROBATCH_WAIT_SECONDS.observe(now - enqueued_at)
+
+        records = [record for record, _, _ in batch]
+        try:
+            proba = self.score_fn(records)
+        except Exception as e:
+            # trả lỗi (vd. HTTPException 503 khi chưa có model) về cho từng caller
+            for _, fut, _ in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for (_, fut, _), p in zip(batch, proba.tolist()):
+            if not fut.done():
+                fut.set_result(p)
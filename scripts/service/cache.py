@@ -0,0 +1,104 @@
+"""
+LRU + TTL cache cho kết quả dự đoán.
+
+Key = (model_version, feature tuple đã normalize) nên khi đổi model
+các entry cũ không bao giờ được dùng lại và tự bị đẩy ra theo LRU/TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from scripts.service import metrics
+
+FEATURE_ORDER = (
+    "Contract",
+    "tenure",
+    "MonthlyCharges",
+    "InternetService",
+    "OnlineSecurity",
+    "TechSupport",
+)
+
+
+def feature_key(record: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Tuple feature đã normalize (80 và 80.0 cho cùng 1 key)."""
+    return (
+        record["Contract"],
+        int(record["tenure"]),
+        float(record["MonthlyCharges"]),
+        record["InternetService"],
+        record["OnlineSecurity"],
+        record["TechSupport"],
+    )
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 300.0):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl_seconds)
+        self._data: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+        metrics.PREDICTION_CACHE_SIZE.set(0)
+
+    def get_many(self, keys: Sequence[Hashable]) -> List[Optional[float]]:
+        """Trả value (hoặc None nếu miss / hết hạn) cho từng key."""
+        now = time.monotonic()
+        out: List[Optional[float]] = []
+        hits = expired = 0
+
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    out.append(None)
+                    continue
+                expires_at, value = entry
+                if expires_at < now:
+                    del self._data[key]
+                    expired += 1
+                    out.append(None)
+                    continue
+                self._data.move_to_end(key)
+                hits += 1
+                out.append(value)
+            size = len(self._data)
+
+        if hits:
+            metrics.PREDICTION_CACHE_HITS.inc(hits)
+        if len(keys) - hits:
+            metrics.PREDICTION_CACHE_MISSES.inc(len(keys) - hits)
+        if expired:
+            metrics.PREDICTION_CACHE_EVICTIONS.labels(reason="ttl").inc(expired)
+        metrics.PREDICTION_CACHE_SIZE.set(size)
+        return out
+
+    def put_many(self, items: Sequence[Tuple[Hashable, float]]) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl
+        evicted = 0
+
+        with self._lock:
+            for key, value in items:
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+            size = len(self._data)
+
+        if evicted:
+            metrics.PREDICTION_CACHE_EVICTIONS.labels(reason="lru").inc(evicted)
+        metrics.PREDICTION_CACHE_SIZE.set(size)
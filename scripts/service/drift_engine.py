@@ -0,0 +1,180 @@
+"""
+Drift engine: so sánh production window với reference profile theo từng feature.
+
+- Cột số: bin giá trị hiện tại theo đúng bin edges của histogram reference
+  (2 bin ngoài cùng mở rộng tới ±inf), rồi tính
+    PSI = sum((p_cur - p_ref) * ln(p_cur / p_ref))
+    KS  = max |CDF_cur - CDF_ref| trên các bin edge (p-value Kolmogorov tiệm cận)
+- Cột category: tần suất hiện tại vs reference (category mới chưa có trong
+  reference được giữ nguyên), tính
+    chi-square goodness-of-fit (p-value) + Jensen–Shannon distance (log2, [0, 1])
+
+Mọi phép tính đều vectorized trên mảng count (vài chục phần tử), phần O(n)
+duy nhất là np.searchsorted/bincount trên view của ring buffer.
+
+Feature bị coi là drift khi effect size vượt ngưỡng (PSI / JS) VÀ khác biệt có
+ý nghĩa thống kê (p-value < DRIFT_PVALUE), để window nhỏ/nhiễu không kích retrain.
+"""
+import os
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+from scipy import special, stats
+
+PSI_THRESHOLD = float(os.getenv("TELCO_DRIFT_PSI_THRESHOLD", "0.2"))
+JS_THRESHOLD = float(os.getenv("TELCO_DRIFT_JS_THRESHOLD", "0.1"))
+DRIFT_PVALUE = float(os.getenv("TELCO_DRIFT_PVALUE", "0.05"))
+# số feature drift tối thiểu để coi cả dataset là drift (-> retrain)
+MIN_DRIFTED_FEATURES = int(os.getenv("TELCO_DRIFT_MIN_DRIFTED_FEATURES", "1"))
+
+_EPS = 1e-4
+
+
+def _proportions(counts: np.ndarray) -> np.ndarray:
+    """Tỉ lệ có làm trơn (tránh log(0) / chia 0 ở bin rỗng)."""
+    counts = np.asarray(counts, dtype=np.float64)
+    p = counts / counts.sum() if counts.sum() > 0 else np.full(len(counts), 1.0 / len(counts))
+    p = np.maximum(p, _EPS)
+    return p / p.sum()
+
+
+def psi(ref_counts: np.ndarray, cur_counts: np.ndarray) -> float:
+    p_ref, p_cur = _proportions(ref_counts), _proportions(cur_counts)
+    return float(np.sum((p_cur - p_ref) * np.log(p_cur / p_ref)))
+
+
+def ks_binned(ref_counts: np.ndarray, cur_counts: np.ndarray) -> Dict[str, float]:
+    """KS 2 mẫu trên count đã bin (D là cận dưới của D trên dữ liệu thô)."""
+    ref_counts = np.asarray(ref_counts, dtype=np.float64)
+    cur_counts = np.asarray(cur_counts, dtype=np.float64)
+    n, m = ref_counts.sum(), cur_counts.sum()
+    if n == 0 or m == 0:
+        return {"statistic": 0.0, "pvalue": 1.0}
+    d = float(np.max(np.abs(np.cumsum(ref_counts) / n - np.cumsum(cur_counts) / m)))
+    n_eff = n * m / (n + m)
+    return {"statistic": d, "pvalue": float(special.kolmogorov(np.sqrt(n_eff) * d))}
+
+
+def chi_square(ref_counts: np.ndarray, cur_counts: np.ndarray) -> Dict[str, float]:
+    """Goodness-of-fit: count hiện tại vs kỳ vọng theo tỉ lệ reference."""
+    cur_counts = np.asarray(cur_counts, dtype=np.float64)
+    m = cur_counts.sum()
+    if m == 0 or len(cur_counts) < 2:
+        return {"statistic": 0.0, "pvalue": 1.0}
+    expected = _proportions(ref_counts) * m
+    statistic = float(np.sum((cur_counts - expected) ** 2 / expected))
+    return {
+        "statistic": statistic,
+        "pvalue": float(stats.chi2.sf(statistic, df=len(cur_counts) - 1)),
+    }
+
+
+def jensen_shannon(ref_counts: np.ndarray, cur_counts: np.ndarray) -> float:
+    p, q = _proportions(ref_counts), _proportions(cur_counts)
+    mid = 0.5 * (p + q)
+    js = 0.5 * np.sum(p * np.log2(p / mid)) + 0.5 * np.sum(q * np.log2(q / mid))
+    return float(np.sqrt(max(js, 0.0)))
+
+
+def bin_counts(values: np.ndarray, edges: Sequence[float]) -> np.ndarray:
+    """Count theo bin của histogram reference; giá trị ngoài [min, max] vào bin ngoài cùng."""
+    inner = np.asarray(edges, dtype=np.float64)[1:-1]
+    idx = np.searchsorted(inner, np.asarray(values, dtype=np.float64), side="right")
+    return np.bincount(idx, minlength=len(inner) + 1)
+
+
+def numeric_drift(reference: Mapping[str, Any], values: np.ndarray) -> Dict[str, Any]:
+    """reference = profile["numeric"][col] (cần histogram edges/counts)."""
+    return numeric_drift_counts(reference, bin_counts(values, reference["histogram"]["edges"]))
+
+
+def numeric_drift_counts(reference: Mapping[str, Any], cur_counts: np.ndarray) -> Dict[str, Any]:
+    """Như numeric_drift nhưng nhận count đã bin theo edges của reference (vd. từ sketch)."""
+    ref_counts = np.asarray(reference["histogram"]["counts"], dtype=np.float64)
+    score = psi(ref_counts, cur_counts)
+    ks = ks_binned(ref_counts, cur_counts)
+    return {
+        "type": "numeric",
+        "psi": round(score, 6),
+        "ks_statistic": round(ks["statistic"], 6),
+        "ks_pvalue": ks["pvalue"],
+        "drifted": score >= PSI_THRESHOLD and ks["pvalue"] < DRIFT_PVALUE,
+    }
+
+
+def categorical_drift(
+    reference_counts: Mapping[str, int], current_counts: Mapping[str, int]
+) -> Dict[str, Any]:
+    names = list(reference_counts) + [k for k in current_counts if k not in reference_counts]
+    ref = np.array([reference_counts.get(k, 0) for k in names], dtype=np.float64)
+    cur = np.array([current_counts.get(k, 0) for k in names], dtype=np.float64)
+    chi = chi_square(ref, cur)
+    js = jensen_shannon(ref, cur)
+    return {
+        "type": "categorical",
+        "js_distance": round(js, 6),
+        "chi2_statistic": round(chi["statistic"], 6),
+        "chi2_pvalue": chi["pvalue"],
+        "unseen_categories": [k for k in current_counts if k not in reference_counts],
+        "drifted": js >= JS_THRESHOLD and chi["pvalue"] < DRIFT_PVALUE,
+    }
+
+
+def evaluate(
+    profile: Optional[Mapping[str, Any]],
+    numeric_values: Mapping[str, np.ndarray],
+    category_counts: Mapping[str, Mapping[str, int]],
+) -> Dict[str, Any]:
+    """
+    Drift của mọi feature + quyết định ở mức dataset.
+    numeric_values: {cột số: mảng giá trị của window};
+    category_counts: {cột category: {category: count}}.
+    """
+    numeric_counts = {}
+    if profile is not None:
+        for col, values in numeric_values.items():
+            ref = profile["numeric"].get(col)
+            if ref and ref["histogram"]["counts"] and len(values):
+                numeric_counts[col] = bin_counts(values, ref["histogram"]["edges"])
+    return evaluate_counts(profile, numeric_counts, category_counts)
+
+
+def evaluate_counts(
+    profile: Optional[Mapping[str, Any]],
+    numeric_counts: Mapping[str, np.ndarray],
+    category_counts: Mapping[str, Mapping[str, int]],
+) -> Dict[str, Any]:
+    """Như evaluate() nhưng cột số đã được bin theo edges của reference."""
+    if profile is None:
+        return {
+            "reference_available": False,
+            "drift_detected": False,
+            "drift_share": 0.0,
+            "drifted_features": [],
+            "features": {},
+        }
+
+    features: Dict[str, Any] = {}
+    for col, counts in numeric_counts.items():
+        ref = profile["numeric"].get(col)
+        if ref and ref["histogram"]["counts"] and np.sum(counts) > 0:
+            features[col] = numeric_drift_counts(ref, counts)
+    for col, counts in category_counts.items():
+        ref = profile["category_counts"].get(col)
+        if ref and counts:
+            features[col] = categorical_drift(ref, counts)
+
+    drifted = [col for col, f in features.items() if f["drifted"]]
+    return {
+        "reference_available": True,
+        "drift_detected": len(drifted) >= MIN_DRIFTED_FEATURES,
+        "drift_share": round(len(drifted) / len(features), 4) if features else 0.0,
+        "drifted_features": drifted,
+        "features": features,
+        "thresholds": {
+            "psi": PSI_THRESHOLD,
+            "js_distance": JS_THRESHOLD,
+            "pvalue": DRIFT_PVALUE,
+            "min_drifted_features": MIN_DRIFTED_FEATURES,
+        },
+    }
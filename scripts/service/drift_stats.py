@@ -0,0 +1,146 @@
+"""
+Thống kê chạy (running statistics) cho production window của monitoring.
+
+WindowStats được ring buffer (scripts/service/ring_buffer.py) cập nhật ngay khi
+prediction được log: dòng mới được add, dòng bị ghi đè được remove, nên luôn
+khớp với đúng PRODUCTION_WINDOW dòng gần nhất mà không phải đọc lại log.
+  - cột số: count / mean / M2 (Welford, gộp theo batch bằng công thức Chan;
+    remove = phép ngược lại)
+  - cột category: đếm theo code
+Mỗi dòng là O(1); sai số float của add/remove được xoá bằng cách tính lại
+chính xác từ window sau mỗi `capacity` lần remove (khấu hao vẫn O(1)).
+"""
+import threading
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class WindowStats:
+    def __init__(self, numeric: Sequence[str], categorical: Sequence[str]):
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._count = 0
+        # col -> [mean, M2]
+        self._moments = {col: [0.0, 0.0] for col in self.numeric}
+        self._counts = {col: np.zeros(0, dtype=np.int64) for col in self.categorical}
+        self.removed_since_sync = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    # ------------------------------------------------------------------
+    def add(self, numeric: Mapping[str, np.ndarray], codes: Mapping[str, np.ndarray]) -> None:
+        n_b = len(next(iter(numeric.values()))) if numeric else 0
+        if n_b == 0:
+            return
+        with self._lock:
+            n_a = self._count
+            n = n_a + n_b
+            for col in self.numeric:
+                x = np.asarray(numeric[col], dtype=np.float64)
+                mean_b = float(x.mean())
+                m2_b = float(((x - mean_b) ** 2).sum())
+                mean_a, m2_a = self._moments[col]
+                delta = mean_b - mean_a
+                self._moments[col] = [
+                    mean_a + delta * n_b / n,
+                    m2_a + m2_b + delta * delta * n_a * n_b / n,
+                ]
+            for col in self.categorical:
+                self._counts[col] = _add_counts(self._counts[col], codes[col], 1)
+            self._count = n
+
+    def remove(self, numeric: Mapping[str, np.ndarray], codes: Mapping[str, np.ndarray]) -> None:
+        n_b = len(next(iter(numeric.values()))) if numeric else 0
+        if n_b == 0:
+            return
+        with self._lock:
+            n = self._count
+            n_a = n - n_b
+            if n_a <= 0:
+                self.reset()
+                return
+            for col in self.numeric:
+                x = np.asarray(numeric[col], dtype=np.float64)
+                mean_b = float(x.mean())
+                m2_b = float(((x - mean_b) ** 2).sum())
+                mean, m2 = self._moments[col]
+                mean_a = (n * mean - n_b * mean_b) / n_a
+                delta = mean_b - mean_a
+                self._moments[col] = [
+                    mean_a,
+                    max(0.0, m2 - m2_b - delta * delta * n_a * n_b / n),
+                ]
+            for col in self.categorical:
+                self._counts[col] = _add_counts(self._counts[col], codes[col], -1)
+            self._count = n_a
+            self.removed_since_sync += n_b
+
+    def load(self, numeric: Mapping[str, np.ndarray], codes: Mapping[str, np.ndarray]) -> None:
+        """Tính lại chính xác từ toàn bộ window."""
+        with self._lock:
+            self.reset()
+        self.add(numeric, codes)
+
+    # ------------------------------------------------------------------
+    def mean(self, col: str) -> float:
+        return self._moments[col][0] if self._count else float("nan")
+
+    def std(self, col: str) -> float:
+        """Độ lệch chuẩn (population) của window."""
+        if not self._count:
+            return float("nan")
+        return float(np.sqrt(self._moments[col][1] / self._count))
+
+    def summary(self, categories: Mapping[str, List[str]]) -> Dict[str, Any]:
+        """{count, numeric: {col: {mean, std}}, categories: {col: {category: tỉ lệ}}}."""
+        with self._lock:
+            count = self._count
+            numeric = {
+                col: {"mean": self.mean(col), "std": self.std(col)} for col in self.numeric
+            }
+            cats = {}
+            for col in self.categorical:
+                counts = self._counts[col]
+                cats[col] = {
+                    name: int(k) / count
+                    for name, k in zip(categories.get(col, []), counts.tolist())
+                    if k and count
+                }
+        return {"count": count, "numeric": numeric, "categories": cats}
+
+
+def _add_counts(counts: np.ndarray, codes: np.ndarray, sign: int) -> np.ndarray:
+    codes = np.asarray(codes, dtype=np.int64)
+    size = max(len(counts), int(codes.max()) + 1 if len(codes) else 0)
+    if size > len(counts):
+        counts = np.concatenate([counts, np.zeros(size - len(counts), dtype=np.int64)])
+    return counts + sign * np.bincount(codes, minlength=size)
+
+
+def frame_summary(
+    df: pd.DataFrame, numeric: Sequence[str], categorical: Sequence[str]
+) -> Dict[str, Any]:
+    """Giống WindowStats.summary() nhưng tính từ DataFrame (reference, log multi-worker)."""
+    count = len(df)
+    return {
+        "count": count,
+        "numeric": {
+            col: {
+                "mean": float(df[col].mean()) if count else float("nan"),
+                "std": float(df[col].std(ddof=0)) if count else float("nan"),
+            }
+            for col in numeric
+        },
+        "categories": {
+            col: {str(k): float(v) for k, v in df[col].value_counts(normalize=True).items()}
+            for col in categorical
+        },
+    }
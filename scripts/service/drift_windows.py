@@ -0,0 +1,204 @@
+"""
+Drift theo nhiều cửa sổ thời gian (vd. 5m / 1h / 24h) với RAM cố định.
+
+Mỗi window trượt được chia thành `buckets` bucket thời gian bằng nhau; mỗi
+bucket chỉ giữ count, tổng prediction, 1 KLLSketch / cột số và bảng count /
+cột category (không giữ dòng thô). Bucket quá hạn bị bỏ; khi cần drift, các
+bucket còn trong window được merge lại rồi đưa vào drift_engine. RAM mỗi
+window ~ buckets x (số cột số x kích thước sketch + số category), không phụ
+thuộc QPS; số category / cột bị chặn bởi TELCO_MAX_CATEGORIES (phần vượt gom
+vào OTHER_CATEGORY như ring buffer).
+"""
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from scripts.service import drift_engine
+from scripts.service.ring_buffer import MAX_CATEGORIES, OTHER_CATEGORY
+from scripts.service.sketches import KLLSketch
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_windows(spec: str) -> Dict[str, float]:
+    """'5m,1h,24h' -> {'5m': 300, '1h': 3600, '24h': 86400}."""
+    windows: Dict[str, float] = {}
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        m = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", part)
+        if m is None:
+            raise ValueError(f"invalid drift window {part!r} (expected e.g. 5m, 1h, 24h)")
+        windows[part] = float(m.group(1)) * _UNITS[m.group(2)]
+    return windows
+
+
+def _count(values: Sequence[Any], limit: int = MAX_CATEGORIES) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for v in values:
+        key = "" if v is None else str(v)
+        if key not in counts and len(counts) >= limit:
+            key = OTHER_CATEGORY
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def _add(counts: Dict[str, int], other: Mapping[str, int], limit: int = MAX_CATEGORIES) -> None:
+    # dict thường thay Counter.update: đường nóng của mỗi prediction
+    for key, k in other.items():
+        if key not in counts and len(counts) >= limit:
+            key = OTHER_CATEGORY
+        counts[key] = counts.get(key, 0) + k
+
+
+class _Batch:
+    """Batch prediction đã gom sẵn 1 lần, dùng chung cho mọi window."""
+
+    def __init__(
+        self,
+        columns: Mapping[str, Sequence[Any]],
+        numeric: Sequence[str],
+        categorical: Sequence[str],
+    ):
+        self.n = len(next(iter(columns.values()))) if columns else 0
+        self.prediction_sum = (
+            float(np.sum(np.asarray(columns["prediction"], dtype=np.float64)))
+            if "prediction" in columns
+            else 0.0
+        )
+        self.numeric = {col: columns[col] for col in numeric}
+        self.categories = {col: _count(columns[col]) for col in categorical}
+
+
+class _Bucket:
+    def __init__(self, numeric: Sequence[str], categorical: Sequence[str], k: int):
+        self.count = 0
+        self.prediction_sum = 0.0
+        self.sketches = {col: KLLSketch(k) for col in numeric}
+        self.categories: Dict[str, Dict[str, int]] = {col: {} for col in categorical}
+
+    def add(self, batch: _Batch) -> None:
+        self.count += batch.n
+        self.prediction_sum += batch.prediction_sum
+        for col, sketch in self.sketches.items():
+            sketch.update_many(batch.numeric[col])
+        for col, counts in self.categories.items():
+            _add(counts, batch.categories[col])
+
+    def merge(self, other: "_Bucket") -> None:
+        self.count += other.count
+        self.prediction_sum += other.prediction_sum
+        for col, sketch in self.sketches.items():
+            sketch.merge(other.sketches[col])
+        for col, counts in self.categories.items():
+            _add(counts, other.categories[col])
+
+
+class SlidingWindow:
+    def __init__(
+        self,
+        name: str,
+        seconds: float,
+        numeric: Sequence[str],
+        categorical: Sequence[str],
+        buckets: int = 12,
+        k: int = 200,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.seconds = float(seconds)
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.n_buckets = max(1, int(buckets))
+        self.bucket_seconds = self.seconds / self.n_buckets
+        self.k = k
+        self.clock = clock
+        # bucket id (= floor(ts / bucket_seconds)) -> bucket, tăng dần
+        self._buckets: Dict[int, _Bucket] = {}
+
+    def _expire(self, current_id: int) -> None:
+        for bid in [b for b in self._buckets if b <= current_id - self.n_buckets]:
+            del self._buckets[bid]
+
+    def add(self, batch: _Batch) -> None:
+        bid = int(self.clock() // self.bucket_seconds)
+        bucket = self._buckets.get(bid)
+        if bucket is None:
+            bucket = self._buckets[bid] = _Bucket(self.numeric, self.categorical, self.k)
+            self._expire(bid)
+        bucket.add(batch)
+
+    def merged(self) -> _Bucket:
+        """Gộp các bucket còn trong window thành 1 bucket mới."""
+        self._expire(int(self.clock() // self.bucket_seconds))
+        out = _Bucket(self.numeric, self.categorical, self.k)
+        for bucket in self._buckets.values():
+            out.merge(bucket)
+        return out
+
+
+class MultiWindowMonitor:
+    def __init__(
+        self,
+        windows: Mapping[str, float],
+        numeric: Sequence[str],
+        categorical: Sequence[str],
+        buckets: int = 12,
+        k: int = 200,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.windows = [
+            SlidingWindow(name, seconds, numeric, categorical, buckets, k, clock)
+            for name, seconds in windows.items()
+        ]
+        self._lock = threading.Lock()
+
+    def add(self, columns: Mapping[str, Sequence[Any]]) -> None:
+        """columns: {cột: list giá trị} như log_predictions_for_monitoring."""
+        if not self.windows or not columns:
+            return
+        batch = _Batch(columns, self.windows[0].numeric, self.windows[0].categorical)
+        if batch.n == 0:
+            return
+        with self._lock:
+            for window in self.windows:
+                window.add(batch)
+
+    def evaluate(self, profile: Optional[Mapping[str, Any]], min_points: int = 10) -> Dict[str, Any]:
+        """{tên window: drift_engine result + data_points, prediction_rate, quantiles}."""
+        with self._lock:
+            merged = [(w, w.merged()) for w in self.windows]
+
+        out: Dict[str, Any] = {}
+        for window, bucket in merged:
+            numeric_counts: Dict[str, np.ndarray] = {}
+            if profile is not None:
+                for col, sketch in bucket.sketches.items():
+                    ref = profile["numeric"].get(col)
+                    if ref and ref["histogram"]["edges"] and sketch.n:
+                        numeric_counts[col] = sketch.bin_counts(ref["histogram"]["edges"])
+            result = drift_engine.evaluate_counts(
+                profile,
+                numeric_counts,
+                {col: c for col, c in bucket.categories.items() if c},
+            )
+            result["window_seconds"] = window.seconds
+            result["data_points"] = bucket.count
+            if bucket.count < min_points:
+                result["drift_detected"] = False
+            result["prediction_rate"] = (
+                round(bucket.prediction_sum / bucket.count, 4) if bucket.count else None
+            )
+            result["quantiles"] = {
+                col: dict(
+                    zip(("p05", "p50", "p95"), np.round(sketch.quantiles([0.05, 0.5, 0.95]), 4).tolist())
+                )
+                if sketch.n
+                else None
+                for col, sketch in bucket.sketches.items()
+            }
+            out[window.name] = result
+        return out
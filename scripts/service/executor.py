@@ -0,0 +1,123 @@
+"""
+Executor riêng cho inference.
+
+Handler /predict, /predict_batch, /predict_stream không chạy trên threadpool
+mặc định của FastAPI (dùng chung với /monitor/*, /reports, /metrics) mà trên
+1 ThreadPoolExecutor có kích thước cố định + hàng đợi giới hạn. Khi hàng đợi
+đầy, submit() fail ngay (ExecutorSaturatedError) để service trả 503 + Retry-After
+thay vì xếp hàng vô hạn.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from scripts.service import metrics
+
+logger = logging.getLogger("telco-api")
+
+T = TypeVar("T")
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Hàng đợi inference đã đầy."""
+
+
+class InferenceExecutor:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # số slot = đang chạy + đang chờ
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Số task đang chạy + đang chờ."""
+        return self._pending
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            metrics.INFERENCE_INFLIGHT.set(self._pending)
+        self._slots.release()
+
+    def submit(self, endpoint: str, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        fut = self._try_submit(endpoint, fn, *args)
+        if fut is None:
+            metrics.INFERENCE_REJECTED.labels(endpoint=endpoint).inc()
+            raise ExecutorSaturatedError(
+                f"inference queue is full ({self.max_workers} workers, {self.max_queue} queued)"
+            )
+        return fut
+
+    def _try_submit(self, endpoint: str, fn: Callable[..., T], *args: Any) -> "Optional[Future[T]]":
+        """Như submit() nhưng trả None khi đầy (không tính là rejected)."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._pending += 1
+            metrics.INFERENCE_INFLIGHT.set(self._pending)
+
+        enqueued_at = time.perf_counter()
+
+        def _run() -> T:
+            started_at = time.perf_counter()
+            metrics.INFERENCE_QUEUE_WAIT_SECONDS.labels(endpoint=endpoint).observe(
+                started_at - enqueued_at
+            )
+            try:
+                return fn(*args)
+            finally:
+                metrics.INFERENCE_COMPUTE_SECONDS.labels(endpoint=endpoint).observe(
+                    time.perf_counter() - started_at
+                )
+                self._release()
+
+        try:
+            fut = self._get_pool().submit(_run)
+        except RuntimeError:
+            self._release()
+            raise
+        # future bị cancel lúc còn trong hàng đợi (client ngắt kết nối -> wrap_future
+        # cancel) thì _run không bao giờ chạy -> trả slot ở đây. cancel() chỉ thành
+        # công trước khi _run bắt đầu nên slot không bị trả 2 lần.
+        fut.add_done_callback(lambda f: self._release() if f.cancelled() else None)
+        return fut
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # tạo lazy để executor dùng lại được sau shutdown (vd. app restart trong test)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="telco-inference"
+                )
+            return self._pool
+
+    async def run(
+        self, endpoint: str, fn: Callable[..., T], *args: Any, wait: bool = False
+    ) -> T:
+        """
+        Chạy fn trên executor và await kết quả.
+        wait=True: khi đầy thì chờ slot (dùng cho chunk tiếp theo của 1 stream
+        đã được nhận) thay vì raise ExecutorSaturatedError; việc chờ này không
+        tính vào telco_inference_rejected.
+        """
+        if not wait:
+            return await asyncio.wrap_future(self.submit(endpoint, fn, *args))
+        while True:
+            fut = self._try_submit(endpoint, fn, *args)
+            if fut is not None:
+                return await asyncio.wrap_future(fut)
+            await asyncio.sleep(0.005)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+            logger.info("[INFER] inference executor stopped.")
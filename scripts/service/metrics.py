@@ -0,0 +1,331 @@
+"""
+Prometheus metrics riêng của service (ngoài HTTP metrics của Instrumentator).
+
+Tất cả đăng ký vào default registry nên tự động xuất hiện trên /metrics.
+
+Multi-worker (scripts.service.serve set PROMETHEUS_MULTIPROC_DIR): /metrics
+được gộp từ file mmap của từng worker qua MultiProcessCollector, chỉ thấy các
+kiểu chuẩn Counter / Gauge / Histogram. Vì vậy không dùng Info hay
+Gauge.set_function, Gauge luôn có multiprocess_mode, và histogram của đường
+nóng là Histogram chuẩn thay cho FastHistogram (xem stage_histogram).
+"""
+import os
+import threading
+from collections import deque
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import HistogramMetricFamily
+
+
+class FastHistogram:
+    """
+    Histogram cho đường nóng của request (đo từng stage inference).
+
+    prometheus_client.Histogram.observe() lấy lock + duyệt bucket (~vài µs);
+    ở đây observe() chỉ deque.append (atomic, không lock, ~50ns). Giá trị được
+    gom vào bucket khi Prometheus scrape (collect) hoặc khi buffer vượt
+    FOLD_THRESHOLD phần tử (để RAM có giới hạn giữa 2 lần scrape).
+    """
+
+    FOLD_THRESHOLD = 10_000
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = Histogram.DEFAULT_BUCKETS,
+        registry=REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = np.array([b for b in buckets if b != float("inf")], dtype=np.float64)
+        self._children: Dict[Tuple[str, ...], "_FastHistogramChild"] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = _FastHistogramChild(self.bounds)
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values: str, **kwargs: str) -> "_FastHistogramChild":
+        key = tuple(str(kwargs[n]) for n in self.labelnames) if kwargs else tuple(map(str, values))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, _FastHistogramChild(self.bounds))
+        return child
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def describe(self):
+        return [HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)]
+
+    def collect(self):
+        family = HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for key, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = np.cumsum(counts).tolist()
+            buckets = [(repr(float(b)), c) for b, c in zip(self.bounds, cumulative)]
+            buckets.append(("+Inf", cumulative[-1]))
+            family.add_metric(list(key), buckets, total)
+        yield family
+
+
+class _FastHistogramChild:
+    __slots__ = ("bounds", "_pending", "_counts", "_sum", "_fold_lock")
+
+    def __init__(self, bounds: np.ndarray):
+        self.bounds = bounds
+        self._pending: deque = deque()
+        self._counts = np.zeros(len(bounds) + 1, dtype=np.int64)
+        self._sum = 0.0
+        self._fold_lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        self._pending.append(value)
+        if len(self._pending) > FastHistogram.FOLD_THRESHOLD:
+            self._fold()
+
+    def _fold(self) -> None:
+        with self._fold_lock:
+            pending = self._pending
+            n = len(pending)
+            if not n:
+                return
+            # popleft từng phần tử: không mất observe() chạy song song
+            values = np.fromiter((pending.popleft() for _ in range(n)), dtype=np.float64, count=n)
+            # bucket le=b chứa value <= b
+            idx = np.searchsorted(self.bounds, values, side="left")
+            self._counts += np.bincount(idx, minlength=len(self._counts))
+            self._sum += float(values.sum())
+
+    def snapshot(self) -> Tuple[np.ndarray, float]:
+        self._fold()
+        with self._fold_lock:
+            return self._counts.copy(), self._sum
+
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def stage_histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Iterable[float] = Histogram.DEFAULT_BUCKETS,
+):
+    """FastHistogram khi chạy 1 process; Histogram chuẩn khi multi-worker (collector tự viết không được gộp)."""
+    if MULTIPROCESS:
+        return Histogram(name, documentation, labelnames, buckets=tuple(buckets))
+    return FastHistogram(name, documentation, labelnames, buckets=buckets)
+
+# ================= MICRO-BATCHING (/predict) ===================
+MICROBATCH_SIZE = Histogram(
+    "telco_microbatch_size",
+    "Number of /predict records scored together in one micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+MICROBATCH_QUEUE_DEPTH = Histogram(
+    "telco_microbatch_queue_depth",
+    "Pending /predict records left in the dispatcher queue when a batch closes",
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+
+MICROBATCH_WAIT_SECONDS = Histogram(
+    "telco_microbatch_wait_seconds",
+    "Time a /predict record waited in the dispatcher queue before scoring",
+    buckets=(0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+# ================= PREDICTION CACHE ===================
+PREDICTION_CACHE_HITS = Counter(
+    "telco_prediction_cache_hits",
+    "Predictions served from the feature-vector cache",
+)
+
+PREDICTION_CACHE_MISSES = Counter(
+    "telco_prediction_cache_misses",
+    "Predictions that had to be scored by the model",
+)
+
+PREDICTION_CACHE_EVICTIONS = Counter(
+    "telco_prediction_cache_evictions",
+    "Entries removed from the prediction cache",
+    ["reason"],
+)
+
+PREDICTION_CACHE_SIZE = Gauge(
+    "telco_prediction_cache_entries",
+    "Current number of entries in the prediction cache",
+)
+
+# ================= INFERENCE EXECUTOR ===================
+INFERENCE_QUEUE_WAIT_SECONDS = Histogram(
+    "telco_inference_queue_wait_seconds",
+    "Time an inference task waited for a worker of the inference executor",
+    ["endpoint"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+INFERENCE_COMPUTE_SECONDS = Histogram(
+    "telco_inference_compute_seconds",
+    "Time an inference task ran on the inference executor",
+    ["endpoint"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+INFERENCE_INFLIGHT = Gauge(
+    "telco_inference_inflight",
+    "Inference tasks currently running or queued on the inference executor",
+)
+
+INFERENCE_REJECTED = Counter(
+    "telco_inference_rejected",
+    "Inference requests rejected because the executor queue was full",
+    ["endpoint"],
+)
+
+# ================= SHADOW SCORING (challenger) ===================
+SHADOW_PREDICTIONS = Counter(
+    "telco_shadow_predictions",
+    "Live records scored by the challenger model, by agreement with the champion label",
+    ["agreement"],
+)
+
+SHADOW_SCORE_DELTA = Histogram(
+    "telco_shadow_score_delta",
+    "Challenger minus champion churn probability per record",
+    buckets=(-0.5, -0.2, -0.1, -0.05, -0.01, 0.0, 0.01, 0.05, 0.1, 0.2, 0.5, 1.0),
+)
+
+SHADOW_LATENCY_SECONDS = Histogram(
+    "telco_shadow_latency_seconds",
+    "Time the challenger model took to score one shadow batch",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+SHADOW_BATCH_SIZE = Histogram(
+    "telco_shadow_batch_size",
+    "Number of records scored together by the challenger",
+    buckets=(1, 4, 16, 64, 256, 1024, 4096),
+)
+
+SHADOW_DROPPED = Counter(
+    "telco_shadow_dropped",
+    "Live records not shadow-scored",
+    ["reason"],
+)
+
+# ================= DRIFT REPORT ===================
+DRIFT_REPORT_SECONDS = Histogram(
+    "telco_drift_report_seconds",
+    "Wall time to render one drift report",
+    ["renderer"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+DRIFT_REPORT_PEAK_MEMORY_BYTES = Gauge(
+    "telco_drift_report_peak_memory_bytes",
+    "Peak RSS of the rendering process during the last drift report",
+    ["renderer"],
+)
+
+# ================= PREDICTION LOG (durable) ===================
+PREDICTION_LOG_ROWS_WRITTEN = Counter(
+    "telco_prediction_log_rows_written",
+    "Prediction rows persisted to prediction log segments",
+)
+
+PREDICTION_LOG_SEGMENTS = Counter(
+    "telco_prediction_log_segments",
+    "Prediction log segments written",
+)
+
+PREDICTION_LOG_FLUSH_SECONDS = Histogram(
+    "telco_prediction_log_flush_seconds",
+    "Time to write one prediction log segment",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+PREDICTION_LOG_BUFFERED = Gauge(
+    "telco_prediction_log_buffered_rows",
+    "Prediction rows waiting in memory for the next segment flush",
+)
+
+PREDICTION_LOG_DROPPED = Counter(
+    "telco_prediction_log_dropped",
+    "Prediction rows not persisted because the writer buffer was full",
+)
+
+# ================= INFERENCE STAGES (/predict, /predict_batch, /predict_stream) ===================
+# FastHistogram: observe() < 1µs, không làm chậm request (multi-worker: Histogram chuẩn)
+INFERENCE_STAGE_SECONDS = stage_histogram(
+    "telco_inference_stage_seconds",
+    "Time spent in one stage of an inference request "
+    "(validation, dataframe, predict_proba, monitoring_log, serialization)",
+    ["stage"],
+    buckets=(
+        0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    ),
+)
+
+SCORING_BATCH_SIZE = stage_histogram(
+    "telco_scoring_batch_size",
+    "Number of records passed to the model in one scoring call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384),
+)
+
+# ================= MODEL ===================
+# Gauge 0/1 thay cho Info (Info không có ở multiprocess mode); livemax: 1 nếu
+# có worker còn sống đang dùng model đó
+MODEL_INFO = Gauge(
+    "telco_model_info",
+    "Model (version, source, registry version, scoring engine): 1 = active, 0 = replaced",
+    ["version", "source", "registry_version", "uri", "scoring_engine"],
+    multiprocess_mode="livemax",
+)
+
+MODEL_LOAD_SECONDS = Gauge(
+    "telco_model_load_seconds",
+    "Time it took to load the active model",
+    multiprocess_mode="livemax",
+)
+
+MODEL_LOADED_TIMESTAMP = Gauge(
+    "telco_model_loaded_timestamp_seconds",
+    "Unix time the active model was loaded",
+    multiprocess_mode="livemax",
+)
+
+# ================= PREDICTIONS / DRIFT ===================
+PREDICTED_CHURN_RATE = Gauge(
+    "telco_predicted_churn_rate",
+    "Share of churn predictions in the monitoring production window",
+    multiprocess_mode="livemostrecent",
+)
+
+DRIFT_FEATURE_SCORE = Gauge(
+    "telco_drift_feature_score",
+    "Latest drift score per feature (psi / ks_statistic for numeric, js_distance for categorical)",
+    ["feature", "metric"],
+    multiprocess_mode="livemostrecent",
+)
+
+DRIFT_FEATURE_DRIFTED = Gauge(
+    "telco_drift_feature_drifted",
+    "1 if the feature was flagged as drifted in the latest drift evaluation",
+    ["feature"],
+    multiprocess_mode="livemostrecent",
+)
+
+DRIFT_SHARE = Gauge(
+    "telco_drift_share",
+    "Share of monitored features flagged as drifted in the latest drift evaluation",
+    multiprocess_mode="livemostrecent",
+)
@@ -0,0 +1,412 @@
+"""
+Load + hot reload model cho service.
+
+- Ưu tiên LOCAL_MODEL_PATH nếu tồn tại (deploy cloud), ngược lại MLflow Registry.
+- Model đang dùng nằm trong 1 object LoadedModel bất biến; đổi model = gán lại
+  1 reference (atomic), request đang chạy vẫn dùng trọn bộ model cũ.
+- Watcher thread định kỳ kiểm tra stage registry (vd. telco-churn-model/Production)
+  và checksum của LOCAL_MODEL_PATH; có bản mới thì load + warm-up ngoài request
+  path rồi mới swap. Load lỗi -> retry với exponential backoff, không latch 503.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import mlflow
+import mlflow.sklearn
+import pandas as pd
+from mlflow.models import Model
+from mlflow.tracking import MlflowClient
+
+from scripts.service import shared_state
+from scripts.service.scoring import CompiledPipeline, UnsupportedPipelineError
+
+logger = logging.getLogger("telco-api")
+
+MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://mlflow:5050")
+MODEL_URI = os.getenv("MODEL_URI", "models:/telco-churn-model/Production")
+
+# ✅ thêm biến để ưu tiên load local model khi deploy cloud
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", "/app/models/mlflow_export")
+
+# "native": score bằng scripts.service.scoring (NumPy), "sklearn": chạy full Pipeline
+SCORING_ENGINE = os.getenv("TELCO_SCORING_ENGINE", "native").lower()
+
+# chu kỳ watcher kiểm tra model mới (0 = tắt hot reload)
+MODEL_POLL_SECONDS = float(os.getenv("TELCO_MODEL_POLL_SECONDS", "60"))
+# backoff khi load lỗi: base * 2^(n-1), tối đa max
+MODEL_RETRY_BASE_SECONDS = float(os.getenv("TELCO_MODEL_RETRY_BASE_SECONDS", "5"))
+MODEL_RETRY_MAX_SECONDS = float(os.getenv("TELCO_MODEL_RETRY_MAX_SECONDS", "300"))
+# request đầu tiên chờ tối đa bao lâu nếu model đang được load ở thread khác
+MODEL_LOAD_WAIT_SECONDS = float(os.getenv("TELCO_MODEL_LOAD_WAIT_SECONDS", "30"))
+
+WARMUP_RECORD = {
+    "Contract": "Month-to-month",
+    "tenure": 5,
+    "MonthlyCharges": 80.5,
+    "InternetService": "Fiber optic",
+    "OnlineSecurity": "No",
+    "TechSupport": "No",
+}
+
+
+class ModelUnavailableError(RuntimeError):
+    """Chưa có model nào dùng được (đang load hoặc load lỗi)."""
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    # sklearn Pipeline (None nếu worker chỉ memory-map scorer đã compile, xem shared_state)
+    model: Any
+    # bản compile của model (None nếu SCORING_ENGINE=sklearn hoặc compile không được)
+    scorer: Optional[CompiledPipeline]
+    # định danh model (MLmodel model_uuid) -> 1 phần của prediction cache key
+    version: str
+    source: str  # "local" | "registry"
+    uri: str
+    # version số trong MLflow Registry (None với local model)
+    registry_version: Optional[str]
+    # checksum thư mục local model (None với registry)
+    checksum: Optional[str]
+    loaded_at: float
+    load_seconds: float
+
+
+# ================= STATE ===================
+_active: Optional[LoadedModel] = None
+_load_lock = threading.Lock()
+_swap_listeners: List[Callable[[Optional[LoadedModel], LoadedModel], None]] = []
+
+_status: Dict[str, Any] = {
+    "last_error": None,
+    "last_error_at": None,
+    "consecutive_failures": 0,
+    "next_retry_at": None,
+    "last_check_at": None,
+    "last_swap_at": None,
+    "swaps": 0,
+}
+
+# (mtime, size) của từng file trong LOCAL_MODEL_PATH ở lần check trước
+_local_signature: Optional[Tuple] = None
+
+_watcher: Optional[threading.Thread] = None
+_watcher_stop = threading.Event()
+
+
+def current() -> Optional[LoadedModel]:
+    return _active
+
+
+def add_swap_listener(fn: Callable[[Optional[LoadedModel], LoadedModel], None]) -> None:
+    """fn(old, new) được gọi ngay sau mỗi lần swap model."""
+    _swap_listeners.append(fn)
+
+
+def status() -> Dict[str, Any]:
+    return dict(_status)
+
+
+# ================= LOAD ===================
+def compile_scorer(model) -> Optional[CompiledPipeline]:
+    """
+    Compile Pipeline sang CompiledPipeline.
+    Trả None (-> dùng sklearn) nếu SCORING_ENGINE != native hoặc Pipeline không hỗ trợ.
+    """
+    if SCORING_ENGINE != "native":
+        return None
+    try:
+        scorer = CompiledPipeline.from_pipeline(model)
+        logger.info("✅ Native scoring engine compiled")
+        return scorer
+    except UnsupportedPipelineError as e:
+        logger.warning(f"Native scoring disabled, fallback to sklearn: {e}")
+        return None
+
+
+def _resolve_model_version(source: str) -> str:
+    """model_uuid trong MLmodel của source; fallback: source + thời điểm load."""
+    try:
+        model_uuid = Model.load(source).model_uuid
+        if model_uuid:
+            return model_uuid
+    except Exception as e:
+        logger.warning(f"Could not read MLmodel metadata from {source}: {e!r}")
+    return f"{source}@{time.time():.0f}"
+
+
+def _registry_name_and_stage(uri: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """'models:/telco-churn-model/Production' -> ('telco-churn-model', 'Production')."""
+    uri = uri or MODEL_URI
+    if not uri.startswith("models:/"):
+        return None
+    parts = uri[len("models:/"):].strip("/").split("/")
+    if len(parts) != 2 or parts[1].isdigit():
+        return None
+    return parts[0], parts[1]
+
+
+def _registry_latest_version(uri: Optional[str] = None) -> Optional[str]:
+    """Version đang ở stage của uri (mặc định MODEL_URI); None nếu uri không phải dạng name/stage."""
+    name_stage = _registry_name_and_stage(uri)
+    if name_stage is None:
+        return None
+    name, stage = name_stage
+    if MLFLOW_TRACKING_URI:
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+    versions = MlflowClient().get_latest_versions(name, stages=[stage])
+    if not versions:
+        raise RuntimeError(f"No version of '{name}' in stage '{stage}'")
+    return max(versions, key=lambda v: int(v.version)).version
+
+
+def _local_files(path: Path) -> List[Path]:
+    return sorted(p for p in path.rglob("*") if p.is_file())
+
+
+def _local_model_signature(path: Path) -> Tuple:
+    return tuple(
+        (str(p.relative_to(path)), p.stat().st_mtime_ns, p.stat().st_size)
+        for p in _local_files(path)
+    )
+
+
+def _local_model_checksum(path: Path) -> str:
+    h = hashlib.sha256()
+    for p in _local_files(path):
+        h.update(str(p.relative_to(path)).encode("utf-8"))
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def _warm_up(model, scorer: Optional[CompiledPipeline]) -> None:
+    """Chạy thử trước khi swap: model hỏng thì không bao giờ tới request path."""
+    if model is not None:
+        model.predict_proba(pd.DataFrame([WARMUP_RECORD]))
+    if scorer is not None:
+        scorer.predict_proba_records([WARMUP_RECORD, WARMUP_RECORD])
+
+
+def _load_pipeline(uri: str, fingerprint: str) -> Tuple[Any, Optional[CompiledPipeline]]:
+    """
+    (Pipeline, scorer) cho uri.
+    Multi-worker (TELCO_SHARED_DIR): worker đầu tiên load + compile + publish mảng
+    của scorer; các worker sau chỉ memory-map mảng đó, không load Pipeline (model=None).
+    """
+    if not shared_state.ENABLED or SCORING_ENGINE != "native":
+        model = mlflow.sklearn.load_model(uri)
+        return model, compile_scorer(model)
+
+    scorer = shared_state.load_compiled(fingerprint)
+    if scorer is None:
+        with shared_state.file_lock("model-load"):
+            scorer = shared_state.load_compiled(fingerprint)
+            if scorer is None:
+                model = mlflow.sklearn.load_model(uri)
+                scorer = compile_scorer(model)
+                if scorer is None:
+                    return model, None
+                shared_state.publish_compiled(fingerprint, scorer)
+                return model, scorer
+
+    logger.info(f"Using shared memory-mapped model for {uri}")
+    return None, scorer
+
+
+def _load(registry_version: Optional[str] = None) -> LoadedModel:
+    t0 = time.perf_counter()
+    local_path = Path(LOCAL_MODEL_PATH)
+
+    if local_path.exists():
+        # 1) ưu tiên local
+        logger.info(f"Loading LOCAL model from: {local_path}")
+        checksum = _local_model_checksum(local_path)
+        source, uri = "local", str(local_path)
+        fingerprint = f"local:{checksum}"
+    else:
+        # 2) fallback MLflow registry (pin đúng version để không lệch khi stage đổi giữa chừng)
+        if MLFLOW_TRACKING_URI:
+            mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        checksum = None
+        source, uri = "registry", MODEL_URI
+        name_stage = _registry_name_and_stage()
+        if name_stage is not None:
+            registry_version = registry_version or _registry_latest_version()
+            uri = f"models:/{name_stage[0]}/{registry_version}"
+        logger.info(f"Loading MLflow model from URI: {uri}")
+        fingerprint = f"registry:{uri}"
+
+    # mlflow.sklearn.load_model() load được cả local MLflow model directory
+    model, scorer = _load_pipeline(uri, fingerprint)
+    _warm_up(model, scorer)
+
+    return LoadedModel(
+        model=model,
+        scorer=scorer,
+        version=_resolve_model_version(uri),
+        source=source,
+        uri=uri,
+        registry_version=registry_version if source == "registry" else None,
+        checksum=checksum,
+        loaded_at=time.time(),
+        load_seconds=time.perf_counter() - t0,
+    )
+
+
+def _swap(new: LoadedModel) -> None:
+    global _active
+    old = _active
+    _active = new
+    _status["last_swap_at"] = new.loaded_at
+    _status["swaps"] += 1
+    logger.info(
+        "✅ %s model active: version=%s registry_version=%s (loaded in %.2fs)",
+        new.source,
+        new.version,
+        new.registry_version,
+        new.load_seconds,
+    )
+    for fn in _swap_listeners:
+        try:
+            fn(old, new)
+        except Exception:
+            logger.exception("[MODEL] swap listener failed")
+
+
+def _record_failure(e: Exception) -> None:
+    n = _status["consecutive_failures"] + 1
+    delay = min(MODEL_RETRY_MAX_SECONDS, MODEL_RETRY_BASE_SECONDS * 2 ** (n - 1))
+    _status.update(
+        last_error=repr(e),
+        last_error_at=time.time(),
+        consecutive_failures=n,
+        next_retry_at=time.time() + delay,
+    )
+    logger.error(f"❌ Failed to load model: {e!r} (retry #{n} in {delay:.0f}s)")
+
+
+def _record_success() -> None:
+    _status.update(consecutive_failures=0, next_retry_at=None)
+
+
+def _in_backoff() -> bool:
+    next_retry = _status["next_retry_at"]
+    return next_retry is not None and time.time() < next_retry
+
+
+def ensure_loaded() -> LoadedModel:
+    """
+    Trả model đang active; nếu chưa có thì load đồng bộ (tôn trọng backoff).
+    Raise ModelUnavailableError nếu không có model dùng được.
+    """
+    active = _active
+    if active is not None:
+        return active
+
+    lock = _load_lock
+    if not lock.acquire(timeout=MODEL_LOAD_WAIT_SECONDS):
+        raise ModelUnavailableError("model is still loading")
+    try:
+        if _active is not None:
+            return _active
+        if _in_backoff():
+            raise ModelUnavailableError(
+                f"last load failed: {_status['last_error']}"
+            )
+        try:
+            new = _load()
+        except Exception as e:
+            _record_failure(e)
+            raise ModelUnavailableError(repr(e)) from e
+        _record_success()
+        _swap(new)
+        return new
+    finally:
+        lock.release()
+
+
+# ================= HOT RELOAD ===================
+def check_for_update() -> bool:
+    """
+    1 vòng kiểm tra của watcher. Trả True nếu đã swap sang model mới.
+    Lỗi được ghi nhận + backoff, không raise.
+    """
+    global _local_signature
+
+    if _in_backoff():
+        return False
+    lock = _load_lock
+    if not lock.acquire(blocking=False):
+        return False  # đang có thread khác load
+
+    try:
+        _status["last_check_at"] = time.time()
+        active = _active
+        local_path = Path(LOCAL_MODEL_PATH)
+        registry_version = None
+
+        if active is None:
+            pass  # chưa có model -> load (retry sau lỗi)
+        elif local_path.exists():
+            signature = _local_model_signature(local_path)
+            if active.source == "local" and signature == _local_signature:
+                return False
+            _local_signature = signature
+            if active.source == "local" and _local_model_checksum(local_path) == active.checksum:
+                return False
+        else:
+            registry_version = _registry_latest_version()
+            if registry_version is None or registry_version == active.registry_version:
+                return False
+            logger.info(
+                "[MODEL] registry version changed: %s -> %s",
+                active.registry_version,
+                registry_version,
+            )
+
+        new = _load(registry_version)
+        if local_path.exists():
+            _local_signature = _local_model_signature(local_path)
+        _record_success()
+        _swap(new)
+        return True
+
+    except Exception as e:
+        _record_failure(e)
+        return False
+    finally:
+        lock.release()
+
+
+def _watch() -> None:
+    while not _watcher_stop.is_set():
+        check_for_update()
+        wait = MODEL_POLL_SECONDS
+        if _status["next_retry_at"] is not None:
+            wait = min(wait, max(0.0, _status["next_retry_at"] - time.time()))
+        _watcher_stop.wait(max(wait, 0.1))
+
+
+def start_watcher() -> None:
+    global _watcher
+    if MODEL_POLL_SECONDS <= 0 or (_watcher is not None and _watcher.is_alive()):
+        return
+    _watcher_stop.clear()
+    _watcher = threading.Thread(target=_watch, name="telco-model-watcher", daemon=True)
+    _watcher.start()
+    logger.info("[MODEL] watcher started. checking for new model every %.0f seconds.", MODEL_POLL_SECONDS)
+
+
+def shutdown_watcher() -> None:
+    global _watcher
+    if _watcher is None:
+        return
+    _watcher_stop.set()
+    _watcher.join(timeout=5)
+    _watcher = None
+    logger.info("[MODEL] watcher stopped.")
@@ -1,24 +1,39 @@
-import glob
 import logging
 import os
-import subprocess
 import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 from fastapi import Request
 import time
 
+import numpy as np
 import pandas as pd
 from apscheduler.schedulers.background import BackgroundScheduler
 # from evidently import Report
 # from evidently.presets import DataDriftPreset
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.staticfiles import StaticFiles
 
+from scripts.profiling import ResourceMeter
+from scripts.service import (
+    drift_engine,
+    metrics,
+    prediction_log,
+    reference_profile,
+    shared_state,
+)
+from scripts.service.report_index import ReportIndex
+from scripts.service.report_jobs import ReportJob, ReportJobQueue
+from scripts.service.report_renderer import EvidentlyRenderer
+from scripts.service.retrain_worker import RetrainWorker
+from scripts.service.drift_windows import MultiWindowMonitor, parse_windows
+from scripts.service.drift_stats import WindowStats, frame_summary
+from scripts.service.ring_buffer import ColumnarRingBuffer, RingSnapshot
+
 DRIFT_NUMERIC_FEATURES = ["tenure", "MonthlyCharges"]
-DRIFT_THRESHOLD = 0.15  # 15% lệch so với reference
+DRIFT_THRESHOLD = 0.15  # 15% lệch mean so với reference (chỉ để hiển thị, retrain dùng drift_engine)
 
 RETRAIN_COOLDOWN_SECONDS = int(os.getenv("RETRAIN_COOLDOWN_SECONDS", "21600"))
 _last_retrain_ts: float | None = None
@@ -41,19 +56,6 @@ REFERENCE_DATA_PATH = Path(
     os.getenv("TELCO_REFERENCE_DATA_PATH", str(DEFAULT_REFERENCE_PATH))
 )
 
-if REFERENCE_DATA_PATH.exists():
-    df_reference_raw = pd.read_csv(REFERENCE_DATA_PATH)
-    logger.info(
-        f"[MONITOR] Loaded reference data from {REFERENCE_DATA_PATH} "
-        f"({len(df_reference_raw)} rows)"
-    )
-else:
-    df_reference_raw = None
-    logger.warning(
-        f"[MONITOR] Reference data not found at {REFERENCE_DATA_PATH}. "
-        "Will use current data as baseline."
-    )
-
 # Cột dùng cho drift – phải trùng với schema /predict
 FEATURE_COLUMNS = [
     "Contract",
@@ -64,8 +66,114 @@ FEATURE_COLUMNS = [
     "TechSupport",
 ]
 
-# Lưu log production
-production_data: List[Dict[str, Any]] = []
+CATEGORICAL_FEATURES = [c for c in FEATURE_COLUMNS if c not in DRIFT_NUMERIC_FEATURES]
+
+# Reference profile (mean/std/quantile/histogram, tần suất category) load lazy
+# lần đầu cần, không giữ CSV reference trong RAM (xem reference_profile.py)
+_reference_profile: Optional[Dict[str, Any]] = None
+_reference_profile_loaded = False
+_reference_lock = threading.Lock()
+
+
+def get_reference_profile() -> Optional[Dict[str, Any]]:
+    global _reference_profile, _reference_profile_loaded
+    if _reference_profile_loaded:
+        return _reference_profile
+    with _reference_lock:
+        if not _reference_profile_loaded:
+            try:
+                _reference_profile = reference_profile.load_or_build(
+                    REFERENCE_DATA_PATH, DRIFT_NUMERIC_FEATURES, CATEGORICAL_FEATURES
+                )
+            except Exception:
+                logger.exception("[MONITOR] could not load reference profile")
+                _reference_profile = None
+            if _reference_profile is None:
+                logger.warning(
+                    f"[MONITOR] Reference data not found at {REFERENCE_DATA_PATH}. "
+                    "Will use current data as baseline."
+                )
+            _reference_profile_loaded = True
+    return _reference_profile
+
+
+# index các report đã sinh (SQLite) + retention; /monitor/status chỉ đọc index
+report_index = ReportIndex(REPORTS_DIR)
+
+# Evidently render trong worker process riêng (reference lấy mẫu phân tầng)
+report_renderer = EvidentlyRenderer()
+
+# Lưu log production: ring buffer dạng cột, giữ PRODUCTION_WINDOW prediction gần nhất.
+# production_stats luôn là thống kê của đúng window đó (cập nhật O(1) mỗi prediction).
+# Mặc định bằng TELCO_SHARED_LOG_MAX_ROWS (100k dòng ~ 7 MB cấp phát sẵn).
+PRODUCTION_WINDOW = int(os.getenv("TELCO_PRODUCTION_WINDOW", "100000"))
+production_stats = WindowStats(
+    numeric=DRIFT_NUMERIC_FEATURES + ["prediction"],
+    categorical=CATEGORICAL_FEATURES,
+)
+production_data = ColumnarRingBuffer(
+    PRODUCTION_WINDOW,
+    numeric={"tenure": np.int64, "MonthlyCharges": np.float64, "prediction": np.int8},
+    categorical=CATEGORICAL_FEATURES,
+    stats=production_stats,
+)
+
+# Drift theo cửa sổ thời gian (5m / 1h / 24h ...): bucket + KLL sketch, RAM cố định.
+# Ở chế độ multi-worker mỗi worker giữ window của riêng mình.
+DRIFT_WINDOWS = parse_windows(os.getenv("TELCO_DRIFT_WINDOWS", "5m,1h,24h"))
+drift_windows = MultiWindowMonitor(
+    DRIFT_WINDOWS,
+    numeric=DRIFT_NUMERIC_FEATURES,
+    categorical=CATEGORICAL_FEATURES,
+    buckets=int(os.getenv("TELCO_DRIFT_WINDOW_BUCKETS", "12")),
+    k=int(os.getenv("TELCO_DRIFT_SKETCH_K", "200")),
+)
+
+# prediction log bền vững trên đĩa (Parquet segment), flush ở background thread
+_prediction_log = (
+    prediction_log.PredictionLogWriter() if prediction_log.PREDICTION_LOG_DIR else None
+)
+
+# multi-worker: prediction của mọi worker được gom vào 1 store dùng chung
+_shared_log = shared_state.PredictionLogStore() if shared_state.ENABLED else None
+
+
+def production_count() -> int:
+    """Số điểm production đang dùng cho drift (mọi worker nếu multi-worker)."""
+    if _shared_log is not None:
+        return min(_shared_log.count(), PRODUCTION_WINDOW)
+    return len(production_data)
+
+
+def production_snapshot() -> RingSnapshot:
+    """Bản copy (snapshot) các prediction trong ring buffer của worker này."""
+    return production_data.snapshot()
+
+
+def production_frame() -> pd.DataFrame:
+    """PRODUCTION_WINDOW prediction gần nhất dạng DataFrame."""
+    if _shared_log is not None:
+        return _shared_log.recent(PRODUCTION_WINDOW)
+    return production_snapshot().frame(FEATURE_COLUMNS + ["prediction"])
+
+def production_summary() -> Dict[str, Any]:
+    """
+    Thống kê hiện tại của production window: count, mean/std cột số (kể cả
+    prediction = tỉ lệ churn dự đoán), tỉ lệ category.
+    Lấy thẳng từ running stats, không đọc lại log (multi-worker: tính từ log chung).
+    """
+    if _shared_log is not None:
+        return frame_summary(
+            production_frame(), DRIFT_NUMERIC_FEATURES + ["prediction"], CATEGORICAL_FEATURES
+        )
+    return production_data.stats_summary()
+
+
+def production_means() -> pd.Series:
+    """Mean các feature số của production window."""
+    numeric = production_summary()["numeric"]
+    return pd.Series({col: numeric[col]["mean"] for col in DRIFT_NUMERIC_FEATURES})
+
 
 def can_retrain_now() -> bool:
     global _last_retrain_ts
@@ -105,17 +213,40 @@ def latest_url(request: Request) -> str:
 # ================= 2. HÀM DÙNG TRONG /predict ===================
 def log_prediction_for_monitoring(features: Dict[str, Any], prediction: Any) -> None:
     """
-    Gọi hàm này trong /predict & /predict_batch sau khi đã có kết quả model.
+    Gọi hàm này trong /predict sau khi đã có kết quả model.
     """
-    entry = dict(features)
-    entry["prediction"] = prediction
-    production_data.append(entry)
+    log_predictions_for_monitoring([features], [prediction])
+
 
-    if len(production_data) > 500:
-        production_data.pop(0)
+def log_predictions_for_monitoring(
+    records: List[Dict[str, Any]], predictions: List[Any]
+) -> None:
+    """
+    Bản bulk cho /predict_batch, /predict_stream: cả batch được ghi vào
+    ring buffer trong 1 lần lấy lock.
+    """
+    if not records:
+        return
+    columns: Dict[str, List[Any]] = {
+        col: [r.get(col) for r in records] for col in FEATURE_COLUMNS
+    }
+    columns["prediction"] = list(predictions)
+    production_data.extend_columns(columns)
+    # tỉ lệ churn dự đoán của window (O(1)); set thẳng vì set_function không
+    # có ở multiprocess mode
+    metrics.PREDICTED_CHURN_RATE.set(production_stats.mean("prediction"))
+    drift_windows.add(columns)
+    if _prediction_log is not None:
+        _prediction_log.extend(columns)
+
+    if _shared_log is not None:
+        _shared_log.extend(
+            [dict(r, prediction=p) for r, p in zip(records, predictions)]
+        )
 
     logger.debug(
-        "[MONITOR] logged prediction. total production points = %d",
+        "[MONITOR] logged %d predictions. total production points = %d",
+        len(records),
         len(production_data),
     )
 
@@ -125,11 +256,12 @@ scheduler = BackgroundScheduler()
 
 
 def _can_run_report() -> bool:
-    if len(production_data) < 10:
+    count = production_count()
+    if count < 10:
         logger.warning(
             "[DRIFT] Not enough production data to generate report "
             "(have %d, need >=10)",
-            len(production_data),
+            count,
         )
         return False
     return True
@@ -144,161 +276,202 @@ def compute_drift_score(ref_means: pd.Series, cur_means: pd.Series) -> float:
             scores.append(abs(c - r) / abs(r))
     return max(scores) if scores else 0.0
 
-def trigger_retraining_async(drift_score: float):
-    """Gọi lại scripts.train dưới dạng background job."""
-    def _run():
-        try:
-            logger.info(f"[RETRAIN] Starting retraining, drift_score={drift_score:.3f}")
-            subprocess.run(
-                ["python", "-m", "scripts.train"],
-                cwd=str(PROJECT_ROOT),
-                check=True,
-            )
-            logger.info("[RETRAIN] Retrain finished successfully")
-        except Exception as e:
-            logger.error(f"[RETRAIN] Retrain failed: {e}")
+def production_drift_inputs() -> Tuple[Dict[str, np.ndarray], Dict[str, Dict[str, int]]]:
+    """(giá trị cột số, count category) của production window cho drift_engine."""
+    if _shared_log is not None:
+        df = production_frame()
+        return (
+            {col: df[col].to_numpy() for col in DRIFT_NUMERIC_FEATURES},
+            {
+                col: {str(k): int(v) for k, v in df[col].value_counts().items()}
+                for col in CATEGORICAL_FEATURES
+            },
+        )
+    snap = production_snapshot()
+    return (
+        {col: snap.numeric[col] for col in DRIFT_NUMERIC_FEATURES},
+        {col: snap.category_counts(col) for col in CATEGORICAL_FEATURES},
+    )
 
-    threading.Thread(target=_run, daemon=True).start()
 
-def generate_drift_report_background() -> None:
+def run_drift_engine(export_metrics: bool = True) -> Dict[str, Any]:
     """
-    Generate drift report.
-    - Nếu Evidently chạy được: dùng Evidently Report + DataDriftPreset.
-    - Nếu import Evidently lỗi (do numpy 2.x, v.v.): sinh 1 HTML report đơn giản bằng pandas.
+    PSI/KS (cột số) + chi-square/JS (category) của production window vs reference.
+    export_metrics=False: chỉ tính (GET /monitor/status), không ghi đè drift gauge
+    của lần drift detection gần nhất.
     """
-    logger.info(
-        "[DRIFT] Generating drift report. production_data size = %d",
-        len(production_data),
+    numeric, categories = production_drift_inputs()
+    count = len(next(iter(numeric.values()))) if numeric else 0
+    result = drift_engine.evaluate(get_reference_profile(), numeric, categories)
+    result["data_points"] = count
+    if count < 10:
+        result["drift_detected"] = False
+    if export_metrics:
+        _export_drift_metrics(result)
+    return result
+
+
+def _export_drift_metrics(result: Dict[str, Any]) -> None:
+    """Ghi kết quả drift mới nhất (từng feature) ra Prometheus gauge."""
+    for col, f in result["features"].items():
+        for metric in ("psi", "ks_statistic", "js_distance"):
+            if metric in f:
+                metrics.DRIFT_FEATURE_SCORE.labels(feature=col, metric=metric).set(f[metric])
+        metrics.DRIFT_FEATURE_DRIFTED.labels(feature=col).set(1 if f["drifted"] else 0)
+    metrics.DRIFT_SHARE.set(result["drift_share"])
+
+
+def current_drift() -> Dict[str, Any]:
+    """Drift hiện tại (reference vs production window) từ running stats + drift_engine."""
+    summary = production_summary()
+    cur_means = pd.Series(
+        {col: summary["numeric"][col]["mean"] for col in DRIFT_NUMERIC_FEATURES}
     )
+    ref = get_reference_profile()
+    ref_means = (
+        pd.Series({col: ref["numeric"][col]["mean"] for col in DRIFT_NUMERIC_FEATURES})
+        if ref is not None
+        else cur_means
+    )
+    mean_shift = float(compute_drift_score(ref_means, cur_means)) if summary["count"] else 0.0
+    engine = run_drift_engine(export_metrics=False)
 
-    if not _can_run_report():
-        return
+    def _num(x: float) -> float | None:
+        return None if pd.isna(x) else round(float(x), 4)
 
-    try:
-        df_current = pd.DataFrame(production_data)
-        logger.debug("[DRIFT] current_data shape = %s", df_current.shape)
+    return {
+        "drift_detected": engine["drift_detected"],
+        "drift_share": engine["drift_share"],
+        "drifted_features": engine["drifted_features"],
+        "features": engine["features"],
+        "mean_shift_score": round(mean_shift, 4),
+        "mean_shift_threshold": DRIFT_THRESHOLD,
+        "data_points": summary["count"],
+        "reference_available": ref is not None,
+        "prediction_rate": _num(summary["numeric"]["prediction"]["mean"]),
+        "numeric": {
+            col: {
+                "mean": _num(summary["numeric"][col]["mean"]),
+                "std": _num(summary["numeric"][col]["std"]),
+                "reference_mean": _num(ref["numeric"][col]["mean"]) if ref else None,
+            }
+            for col in DRIFT_NUMERIC_FEATURES
+        },
+        "categories": {
+            col: {k: round(v, 4) for k, v in dist.items()}
+            for col, dist in summary["categories"].items()
+        },
+    }
 
-        # Đảm bảo đủ cột
-        missing = [c for c in FEATURE_COLUMNS if c not in df_current.columns]
-        if missing:
-            logger.warning(
-                "[DRIFT] Missing columns in current data: %s. Skip report.",
-                missing,
-            )
-            return
 
-        current = df_current[FEATURE_COLUMNS].copy()
+def windows_drift() -> Dict[str, Any]:
+    """Drift của từng cửa sổ thời gian (TELCO_DRIFT_WINDOWS) vs reference."""
+    return drift_windows.evaluate(get_reference_profile())
 
-        # --------- Thử dùng Evidently nếu có ----------
-        use_evidently = True
-        try:
-            try:
-                from evidently.report import Report
-            except ImportError:
-                from evidently import Report  # type: ignore
 
-            try:
-                from evidently.presets import DataDriftPreset
-            except ImportError:
-                from evidently.metric_preset import DataDriftPreset  # type: ignore
+# Retrain chạy trong worker process sống lâu (đã import sẵn scripts.train),
+# qua hàng đợi job: trigger trùng khi đã có job chờ được gộp, có timeout.
+retrain_worker = RetrainWorker()
 
-            # Kiểm tra xem import có nổ vì numpy/pydantic không
-            _ = Report
-            _ = DataDriftPreset
 
-        except Exception as e:
-            logger.warning(
-                "[DRIFT] Evidently not usable in this environment (%s). "
-                "Will generate simple HTML summary instead.",
-                repr(e),
-            )
-            use_evidently = False
-        # -------------------------------------------------
+def _run_retrain_job() -> Dict[str, Any]:
+    result = retrain_worker.run()
+    logger.info(
+        f"[RETRAIN] Retrain finished in {result['train_seconds']:.1f}s, "
+        f"model_version={result.get('model_version')}"
+    )
+    return result
 
-        if use_evidently:
-            # Dùng Evidently nếu import ok
-            if df_reference_raw is not None and not df_reference_raw.empty:
-                reference = df_reference_raw[FEATURE_COLUMNS].copy()
-                logger.info(
-                    "[DRIFT] Using reference CSV with %d rows", len(reference)
-                )
-            else:
-                reference = current
-                logger.warning(
-                    "[DRIFT] No reference CSV, using current data as baseline."
-                )
 
-            report = Report([DataDriftPreset()])
-            report.run(reference_data=reference, current_data=current)
+retrain_jobs = ReportJobQueue(
+    _run_retrain_job, coalesce_running=False, name="retrain", tag="[RETRAIN][JOB]"
+)
 
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_path = REPORTS_DIR / f"drift_report_{timestamp}.html"
-            latest_path = REPORTS_DIR / "drift_report_latest.html"
 
-            logger.info("[DRIFT] saving Evidently report to %s", report_path)
+def trigger_retraining_async(
+    drift_score: float, trigger: str = "drift"
+) -> Tuple[ReportJob, bool]:
+    """Xếp 1 job retrain vào hàng đợi; trả (job, coalesced)."""
+    logger.info(f"[RETRAIN] retraining requested ({trigger}), drift_score={drift_score:.3f}")
+    return retrain_jobs.submit(trigger)
 
-            if hasattr(report, "save_html"):
-                report.save_html(str(report_path))
-                report.save_html(str(latest_path))
-            else:
-                if hasattr(report, "as_html"):
-                    html = report.as_html()
-                elif hasattr(report, "to_html"):
-                    html = report.to_html()
-                elif hasattr(report, "_repr_html_"):
-                    html = report._repr_html_()
-                else:
-                    html = str(report)
 
-                report_path.write_text(html, encoding="utf-8")
-                latest_path.write_text(html, encoding="utf-8")
+def retrain_job_info(request: Request, job: ReportJob) -> Dict[str, Any]:
+    info = retrain_jobs.info(job)
+    info["model_version"] = (job.result or {}).get("model_version")
+    info["job_url"] = str(request.url_for("get_retrain_job", job_id=job.id))
+    return info
 
-        else:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_path = REPORTS_DIR / f"drift_report_{timestamp}.html"
-            latest_path = REPORTS_DIR / "drift_report_latest.html"
-
-            prod_count = len(df_current)
-            ref_rows = (
-                len(df_reference_raw)
-                if df_reference_raw is not None and not df_reference_raw.empty
-                else 0
-            )
 
-            current_means = current.mean(numeric_only=True)
-            if df_reference_raw is not None and not df_reference_raw.empty:
-                ref_means = df_reference_raw[FEATURE_COLUMNS].mean(numeric_only=True)
-            else:
-                ref_means = current_means
-
-            drift_score = compute_drift_score(ref_means, current_means)
-            logger.info(f"[DRIFT] Computed drift_score={drift_score:.3f}")
-
-            if drift_score >= DRIFT_THRESHOLD and can_retrain_now():
-                global _last_retrain_ts
-                _last_retrain_ts = time.time()
-                logger.info(f"[DRIFT] triggering auto retraining (cooldown ok)")
-                trigger_retraining_async(drift_score)
-            elif drift_score >= DRIFT_THRESHOLD:
-                logger.info(f"[DRIFT] drift >= threshold but still in cooldown, skip retrain")
-            else:
-                logger.info(f"[DRIFT] drift < threshold, no retraining")
-
-            rows_html = ""
-            for col in FEATURE_COLUMNS:
-                cur_val = current_means.get(col, float("nan"))
-                ref_val = ref_means.get(col, float("nan"))
-                diff = cur_val - ref_val
-                rows_html += f"""
-                <tr>
-                  <td>{col}</td>
-                  <td>{ref_val:.4f}</td>
-                  <td>{cur_val:.4f}</td>
-                  <td>{diff:.4f}</td>
-                </tr>
-                """
-
-            html = f"""<!DOCTYPE html>
+def _maybe_trigger_retrain(drift: Dict[str, Any]) -> None:
+    global _last_retrain_ts
+    logger.info(
+        "[DRIFT] drift_detected=%s drift_share=%.3f drifted_features=%s",
+        drift["drift_detected"],
+        drift["drift_share"],
+        drift["drifted_features"],
+    )
+    if drift["drift_detected"] and can_retrain_now():
+        _last_retrain_ts = time.time()
+        logger.info(f"[DRIFT] triggering auto retraining (cooldown ok)")
+        trigger_retraining_async(drift["drift_share"])
+    elif drift["drift_detected"]:
+        logger.info(f"[DRIFT] drift detected but still in cooldown, skip retrain")
+    else:
+        logger.info(f"[DRIFT] no feature drifted, no retraining")
+
+
+def _render_simple_report(
+    df_current: pd.DataFrame, drift: Dict[str, Any], timestamp: str, paths: List[Path]
+) -> None:
+    """HTML summary đơn giản (khi Evidently không dùng được): drift engine + mean."""
+    prod_count = len(df_current)
+    ref = get_reference_profile()
+    ref_rows = ref["count"] if ref is not None else 0
+
+    current_means = production_means()
+    if ref is not None:
+        ref_means = pd.Series(
+            {c: ref["numeric"][c]["mean"] for c in DRIFT_NUMERIC_FEATURES}
+        )
+    else:
+        ref_means = current_means
+
+    rows_html = ""
+    for col in FEATURE_COLUMNS:
+        cur_val = current_means.get(col, float("nan"))
+        ref_val = ref_means.get(col, float("nan"))
+        diff = cur_val - ref_val
+        rows_html += f"""
+        <tr>
+          <td>{col}</td>
+          <td>{ref_val:.4f}</td>
+          <td>{cur_val:.4f}</td>
+          <td>{diff:.4f}</td>
+        </tr>
+        """
+
+    drift_rows_html = ""
+    for col, f in drift["features"].items():
+        if f["type"] == "numeric":
+            method = "PSI / KS"
+            score = f"{f['psi']:.4f} / {f['ks_statistic']:.4f}"
+            pvalue = f["ks_pvalue"]
+        else:
+            method = "JS / chi-square"
+            score = f"{f['js_distance']:.4f} / {f['chi2_statistic']:.2f}"
+            pvalue = f["chi2_pvalue"]
+        drift_rows_html += f"""
+        <tr>
+          <td>{col}</td>
+          <td>{method}</td>
+          <td>{score}</td>
+          <td>{pvalue:.4g}</td>
+          <td>{"⚠ drift" if f["drifted"] else "ok"}</td>
+        </tr>
+        """
+
+    html = f"""<!DOCTYPE html>
 <html>
 <head>
   <meta charset="utf-8" />
@@ -320,7 +493,23 @@ def generate_drift_report_background() -> None:
     <p><span class="label">Production data points:</span> {prod_count}</p>
     <p><span class="label">Reference rows:</span> {ref_rows}</p>
     <p><span class="label">Features monitored:</span> {", ".join(FEATURE_COLUMNS)}</p>
+    <p><span class="label">Dataset drift:</span> {drift["drift_detected"]} (drift share {drift["drift_share"]:.2f})</p>
   </div>
+  <h2>Feature Drift</h2>
+  <table>
+    <thead>
+      <tr>
+        <th>Feature</th>
+        <th>Method</th>
+        <th>Score</th>
+        <th>p-value</th>
+        <th>Status</th>
+      </tr>
+    </thead>
+    <tbody>
+      {drift_rows_html}
+    </tbody>
+  </table>
   <h2>Feature Means (Reference vs Current)</h2>
   <table>
     <thead>
@@ -342,8 +531,66 @@ def generate_drift_report_background() -> None:
 </body>
 </html>
 """
-            report_path.write_text(html, encoding="utf-8")
-            latest_path.write_text(html, encoding="utf-8")
+    for p in paths:
+        p.write_text(html, encoding="utf-8")
+
+
+def generate_drift_report_background(raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Generate drift report.
+    - Nếu Evidently chạy được: Evidently Report + DataDriftPreset, render trong
+      worker process riêng (report_renderer) với reference đã lấy mẫu phân tầng.
+    - Nếu import Evidently lỗi (do numpy 2.x, v.v.): sinh 1 HTML report đơn giản bằng pandas.
+    Trả {report, render: {seconds, peak_memory_mb, ...}, data_points, drift_detected, ...};
+    None nếu chưa đủ data.
+    raise_errors=True (job queue): lỗi được raise lại để job có trạng thái failed.
+    """
+    logger.info(
+        "[DRIFT] Generating drift report. production_data size = %d",
+        production_count(),
+    )
+
+    if not _can_run_report():
+        return None
+
+    try:
+        df_current = production_frame()
+        logger.debug("[DRIFT] current_data shape = %s", df_current.shape)
+
+        # Đảm bảo đủ cột
+        missing = [c for c in FEATURE_COLUMNS if c not in df_current.columns]
+        if missing:
+            logger.warning(
+                "[DRIFT] Missing columns in current data: %s. Skip report.",
+                missing,
+            )
+            return None
+
+        current = df_current[FEATURE_COLUMNS].copy()
+
+        # quyết định retrain theo drift từng feature (không phụ thuộc cách render report)
+        drift = run_drift_engine()
+        _maybe_trigger_retrain(drift)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path = REPORTS_DIR / f"drift_report_{timestamp}.html"
+        latest_path = REPORTS_DIR / "drift_report_latest.html"
+
+        # Evidently chạy trong worker process riêng (import sẵn, reference đã lấy mẫu)
+        use_evidently = report_renderer.available()
+
+        if use_evidently:
+            logger.info("[DRIFT] rendering Evidently report to %s in worker", report_path)
+            run_stats = report_renderer.render(
+                REFERENCE_DATA_PATH, current, [report_path, latest_path]
+            )
+            if run_stats["reference"] == "current":
+                logger.warning("[DRIFT] No reference CSV, used current data as baseline.")
+
+        else:
+            with ResourceMeter() as meter:
+                _render_simple_report(df_current, drift, timestamp, [report_path, latest_path])
+            run_stats = meter.stats()
 
         # ====== kiểm tra file đã được tạo chưa ======
         if report_path.exists():
@@ -351,19 +598,82 @@ def generate_drift_report_background() -> None:
             logger.info(
                 "[DRIFT] report saved, size=%d bytes, points=%d",
                 size,
-                len(production_data),
+                len(df_current),
             )
         else:
             logger.error("[DRIFT] report file not created at %s", report_path)
+            raise RuntimeError(f"report file not created at {report_path}")
+
+        renderer = "evidently" if use_evidently else "simple"
+        logger.info(
+            "[DRIFT] %s report rendered in %.3fs, peak memory %.1f MB",
+            renderer,
+            run_stats["seconds"],
+            run_stats["peak_memory_mb"],
+        )
+        metrics.DRIFT_REPORT_SECONDS.labels(renderer=renderer).observe(run_stats["seconds"])
+        metrics.DRIFT_REPORT_PEAK_MEMORY_BYTES.labels(renderer=renderer).set(
+            run_stats["peak_memory_mb"] * 2**20
+        )
+        report_index.add(
+            {
+                "name": report_path.name,
+                "size_bytes": size,
+                "renderer": renderer,
+                "data_points": len(df_current),
+                "drift_detected": drift["drift_detected"],
+                "drift_share": drift["drift_share"],
+                "drifted_features": drift["drifted_features"],
+                "render_seconds": run_stats["seconds"],
+                "peak_memory_mb": run_stats["peak_memory_mb"],
+            }
+        )
+
+        return {
+            "report": report_path.name,
+            "renderer": renderer,
+            "render": run_stats,
+            "data_points": len(df_current),
+            "drift_detected": drift["drift_detected"],
+            "drift_share": drift["drift_share"],
+            "drifted_features": drift["drifted_features"],
+        }
 
     except Exception as e:
         logger.exception("[DRIFT] error generating report: %s", str(e))
+        if raise_errors:
+            raise
+        return None
+
+
+def _run_report_job() -> Optional[Dict[str, Any]]:
+    return generate_drift_report_background(raise_errors=True)
+
+
+# Sinh report trên worker thread riêng; trigger trùng khi đang có job được gộp lại
+report_jobs = ReportJobQueue(_run_report_job)
+
+
+def _scheduled_drift_job() -> None:
+    report_jobs.submit("scheduled")
+
+
+def job_info(request: Request, job: ReportJob) -> Dict[str, Any]:
+    info = report_jobs.info(job)
+    if job.result and job.result.get("report"):
+        info["result"] = dict(
+            job.result,
+            report_url=report_url(request, job.result["report"]),
+            latest_report_url=latest_url(request),
+        )
+    info["job_url"] = str(request.url_for("get_report_job", job_id=job.id))
+    return info
 
 
 
 # Job định kỳ
 scheduler.add_job(
-    generate_drift_report_background,
+    _scheduled_drift_job,
     "interval",
     seconds=300,
     id="drift_detection",
@@ -373,6 +683,13 @@ scheduler.add_job(
 
 
 def start_scheduler() -> None:
+    # multi-worker: chỉ 1 worker (giữ leader lock) chạy drift job trên log dùng chung
+    if not shared_state.try_become_leader("drift-scheduler"):
+        logger.info("[MONITOR] another worker runs the drift scheduler, skip.")
+        return
+    # import sẵn Evidently / scripts.train trong worker process trước lần dùng đầu tiên
+    report_renderer.start()
+    retrain_worker.start()
     if not scheduler.running:
         scheduler.start()
         logger.info(
@@ -384,92 +701,144 @@ def shutdown_scheduler() -> None:
     if scheduler.running:
         scheduler.shutdown()
         logger.info("[MONITOR] scheduler stopped.")
+    report_jobs.stop()
+    report_renderer.stop()
+    retrain_jobs.stop()
+    retrain_worker.stop()
+    if _prediction_log is not None:
+        _prediction_log.stop()
+    if _shared_log is not None:
+        _shared_log.stop()
 
 
 # ================= 4. 3 API MONITOR ===================
 @router.get("/monitor/generate_report")
 async def generate_report(request: Request):
+    count = production_count()
     logger.info(
-        "[DRIFT][MANUAL] requested. production_data size = %d", len(production_data)
+        "[DRIFT][MANUAL] requested. production_data size = %d", count
     )
     if not _can_run_report():
         return {
             "message": "Not enough data to generate report. Run the simulator first.",
-            "current_data_points": len(production_data),
+            "current_data_points": count,
             "minimum_data_points_required": 10,
         }
 
-    try:
-        # dùng lại hàm core
-        generate_drift_report_background()
-
-        # tìm file mới nhất
-        pattern = str(REPORTS_DIR / "drift_report_*.html")
-        files = glob.glob(pattern)
-        files.sort(key=os.path.getmtime, reverse=True)
-        latest_name = os.path.basename(files[0]) if files else None
-
-        return {
-            "message": "Report generated successfully (manual trigger)",
-            "latest_report_url": latest_url(request),
-            "timestamped_report": report_url(request, latest_name) if latest_name else None,
-            "data_points_analyzed": len(production_data),
-        }
-    except Exception as e:
-        logger.exception("[DRIFT][MANUAL] error generating report: %s", str(e))
-        return {"error": str(e)}
+    job, coalesced = report_jobs.submit("manual")
+    return {
+        "message": (
+            "Report already in progress, joined existing job"
+            if coalesced
+            else "Report job submitted (manual trigger)"
+        ),
+        "coalesced": coalesced,
+        **job_info(request, job),
+        "latest_report_url": latest_url(request),
+        "data_points_analyzed": count,
+    }
 
 
+# def (không async): SQLite index + drift engine + merge KLL là việc chặn, FastAPI
+# chạy handler trong threadpool để không chặn event loop
 @router.get("/monitor/status")
-async def monitor_status(request: Request):
-    report_files = []
-
-    if REPORTS_DIR.exists():
-        pattern = str(REPORTS_DIR / "drift_report_*.html")
-        files = glob.glob(pattern)
-        files.sort(key=os.path.getmtime, reverse=True)
-
-        for file in files[:10]:
-            p = Path(file)
-            size = p.stat().st_size
-            mod_time = datetime.fromtimestamp(p.stat().st_mtime).strftime(
+def monitor_status(
+    request: Request,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    # chỉ đọc index (không glob/stat thư mục reports/)
+    total, entries = report_index.page(limit=limit, offset=offset)
+    report_files = [
+        {
+            **entry,
+            "url": report_url(request, entry["name"]),
+            "modified": datetime.fromtimestamp(entry["created_at"]).strftime(
                 "%Y-%m-%d %H:%M:%S"
-            )
-            report_files.append(
-                {
-                    "name": p.name,
-                    "url": report_url(request, p.name),
-                    "size_bytes": size,
-                    "modified": mod_time,
-                }
-            )
+            ),
+        }
+        for entry in entries
+    ]
 
+    # worker không phải leader không start scheduler: job còn pending, chưa có next_run_time
     job = scheduler.get_job("drift_detection")
-    next_run = (
-        job.next_run_time.strftime("%Y-%m-%d %H:%M:%S")
-        if job and job.next_run_time
-        else None
-    )
+    next_run_time = getattr(job, "next_run_time", None)
+    next_run = next_run_time.strftime("%Y-%m-%d %H:%M:%S") if next_run_time else None
 
+    count = production_count()
     return {
         "automatic_detection": "enabled",
         "interval_seconds": 300,
         "interval_description": "5 minutes",
         "next_scheduled_run": next_run,
-        "current_data_points": len(production_data),
+        "current_data_points": count,
         "minimum_data_points_required": 10,
-        "ready_for_detection": len(production_data) >= 10,
+        "ready_for_detection": count >= 10,
+        "current_drift": current_drift(),
+        "windows": windows_drift(),
+        "recent_jobs": report_jobs.recent(5),
         "recent_reports": report_files,
-        "latest_report_url": (latest_url(request) if report_files else None),
+        "reports_page": {"limit": limit, "offset": offset, "total": total},
+        "latest_report_url": (latest_url(request) if total else None),
     }
 
 
 @router.post("/monitor/trigger_now")
 async def trigger_drift_detection_now(request: Request):
     logger.info("[DRIFT][TRIGGER] immediate drift detection requested")
-    generate_drift_report_background()
+    job, coalesced = report_jobs.submit("trigger_now")
     return {
-        "message": "Drift detection triggered successfully",
-        "data_points_analyzed": len(production_data),
+        "message": (
+            "Drift detection already in progress, joined existing job"
+            if coalesced
+            else "Drift detection triggered successfully"
+        ),
+        "coalesced": coalesced,
+        **job_info(request, job),
+        "data_points_analyzed": production_count(),
         "latest_report_url": latest_url(request),
     }
+
+
+@router.get("/monitor/jobs/{job_id}", name="get_report_job")
+async def get_report_job(job_id: str, request: Request):
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job id: {job_id}")
+    return job_info(request, job)
+
+
+@router.post("/monitor/retrain")
+async def trigger_retrain(request: Request):
+    """Retrain thủ công (bỏ qua cooldown; reset cooldown cho retrain tự động)."""
+    global _last_retrain_ts
+    _last_retrain_ts = time.time()
+    job, coalesced = trigger_retraining_async(0.0, trigger="manual")
+    return {
+        "message": (
+            "Retrain already queued, joined existing job"
+            if coalesced
+            else "Retrain job submitted (manual trigger)"
+        ),
+        "coalesced": coalesced,
+        **retrain_job_info(request, job),
+    }
+
+
+@router.get("/monitor/retrain/status")
+async def retrain_status(request: Request, limit: int = Query(10, ge=1, le=100)):
+    return {
+        "worker": retrain_worker.status(),
+        "queue_length": retrain_jobs.queue_length(),
+        "cooldown_seconds": RETRAIN_COOLDOWN_SECONDS,
+        "last_retrain_trigger_at": _last_retrain_ts,
+        "recent_jobs": retrain_jobs.recent(limit),
+    }
+
+
+@router.get("/monitor/retrain/jobs/{job_id}", name="get_retrain_job")
+async def get_retrain_job(job_id: str, request: Request):
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown retrain job id: {job_id}")
+    return retrain_job_info(request, job)
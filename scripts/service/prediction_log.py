@@ -0,0 +1,255 @@
+"""
+Prediction log bền vững (append-only) trên đĩa, dạng Parquet nén zstd.
+
+production_data chỉ nằm trong RAM (restart là mất, không dùng lại để retrain
+được). PredictionLogWriter nhận mọi batch từ log_predictions_for_monitoring:
+  - request thread chỉ append vào buffer theo cột trong RAM (không I/O);
+  - background thread flush khi buffer đủ FLUSH_ROWS dòng hoặc sau
+    FLUSH_SECONDS giây, mỗi lần flush ghi 1 segment mới (tmp + rename nên
+    reader không bao giờ thấy file ghi dở):
+        <dir>/dt=YYYY-MM-DD/part-<ts_min_ms>-<ts_max_ms>-<pid>-<seq>.parquet
+  - buffer vượt MAX_BUFFER_ROWS (đĩa chậm / lỗi) thì bỏ batch mới + đếm metric
+    thay vì làm request chờ;
+  - stop() flush nốt buffer (drain) khi shutdown.
+
+Đọc lại theo khoảng thời gian (vd. lấy dữ liệu retrain):
+
+    for df in read_segments(PREDICTION_LOG_DIR, start=t0, end=t1): ...
+
+Tên file chứa ts min/max nên segment ngoài khoảng bị bỏ qua mà không phải mở.
+"""
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scripts.service import metrics
+
+logger = logging.getLogger("telco-monitor")
+
+# state ghi được của service (prediction log, index report): không ghi vào data/ của
+# repo (image mount data/ read-only), mặc định thư mục tạm của hệ thống
+STATE_DIR = Path(os.getenv("TELCO_STATE_DIR", str(Path(tempfile.gettempdir()) / "telco-service")))
+
+# để rỗng (TELCO_PREDICTION_LOG_DIR=) để tắt
+PREDICTION_LOG_DIR = os.getenv("TELCO_PREDICTION_LOG_DIR", str(STATE_DIR / "prediction_log"))
+FLUSH_ROWS = int(os.getenv("TELCO_PREDICTION_LOG_FLUSH_ROWS", "5000"))
+FLUSH_SECONDS = float(os.getenv("TELCO_PREDICTION_LOG_FLUSH_SECONDS", "30"))
+MAX_BUFFER_ROWS = int(os.getenv("TELCO_PREDICTION_LOG_MAX_BUFFER", "200000"))
+COMPRESSION = os.getenv("TELCO_PREDICTION_LOG_COMPRESSION", "zstd")
+
+SCHEMA = pa.schema(
+    [
+        ("ts", pa.float64()),
+        ("Contract", pa.string()),
+        ("tenure", pa.int64()),
+        ("MonthlyCharges", pa.float64()),
+        ("InternetService", pa.string()),
+        ("OnlineSecurity", pa.string()),
+        ("TechSupport", pa.string()),
+        ("prediction", pa.int8()),
+    ]
+)
+LOG_COLUMNS = [f.name for f in SCHEMA if f.name != "ts"]
+
+_SEGMENT_RE = re.compile(r"part-(\d+)-(\d+)-\d+-\d+\.parquet$")
+
+
+class PredictionLogWriter:
+    def __init__(
+        self,
+        directory: str = PREDICTION_LOG_DIR,
+        flush_rows: int = FLUSH_ROWS,
+        flush_seconds: float = FLUSH_SECONDS,
+        max_buffer_rows: int = MAX_BUFFER_ROWS,
+        compression: str = COMPRESSION,
+    ):
+        self.directory = Path(directory)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_buffer_rows = max_buffer_rows
+        self.compression = compression
+        self._buffer: Dict[str, List[Any]] = {c: [] for c in SCHEMA.names}
+        self._buffered = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    def extend(self, columns: Mapping[str, Sequence[Any]]) -> None:
+        """Gọi từ request thread: chỉ append vào buffer, không I/O."""
+        n = len(columns["prediction"])
+        if n == 0:
+            return
+        now = time.time()
+        with self._lock:
+            if self._buffered + n > self.max_buffer_rows:
+                metrics.PREDICTION_LOG_DROPPED.inc(n)
+                return
+            self._buffer["ts"].extend([now] * n)
+            for col in LOG_COLUMNS:
+                self._buffer[col].extend(columns[col])
+            self._buffered += n
+            buffered = self._buffered
+        metrics.PREDICTION_LOG_BUFFERED.set(buffered)
+        if buffered >= self.flush_rows:
+            self._wake.set()
+        if self._thread is None:
+            self.start()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="telco-prediction-log", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Dừng writer và flush nốt buffer (drain)."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join(timeout)
+        written = self.flush()
+        if written:
+            logger.info(f"[MONITOR] prediction log drained {written} rows on shutdown")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("[MONITOR] failed to flush prediction log")
+
+    # ------------------------------------------------------------------
+    def flush(self) -> int:
+        """Ghi buffer hiện tại thành 1 segment; trả số dòng đã ghi."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffered:
+                    return 0
+                buffer, n = self._buffer, self._buffered
+                self._buffer = {c: [] for c in SCHEMA.names}
+                self._buffered = 0
+            metrics.PREDICTION_LOG_BUFFERED.set(0)
+
+            t0 = time.perf_counter()
+            try:
+                path = self._write(buffer)
+            except Exception:
+                # trả lại buffer (nếu còn chỗ) để lần flush sau thử lại
+                with self._lock:
+                    if self._buffered + n <= self.max_buffer_rows:
+                        for col in SCHEMA.names:
+                            self._buffer[col][:0] = buffer[col]
+                        self._buffered += n
+                    else:
+                        metrics.PREDICTION_LOG_DROPPED.inc(n)
+                raise
+            metrics.PREDICTION_LOG_FLUSH_SECONDS.observe(time.perf_counter() - t0)
+            metrics.PREDICTION_LOG_ROWS_WRITTEN.inc(n)
+            metrics.PREDICTION_LOG_SEGMENTS.inc()
+            logger.debug(f"[MONITOR] prediction log wrote {n} rows to {path.name}")
+            return n
+
+    def _write(self, buffer: Dict[str, List[Any]]) -> Path:
+        table = pa.Table.from_pydict(buffer, schema=SCHEMA)
+        ts = buffer["ts"]
+        t_min, t_max = min(ts), max(ts)
+        day = datetime.fromtimestamp(t_min, tz=timezone.utc).strftime("%Y-%m-%d")
+        self._seq += 1
+        out_dir = self.directory / f"dt={day}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        ms_min, ms_max = math.floor(t_min * 1000), math.ceil(t_max * 1000)
+        name = f"part-{ms_min}-{ms_max}-{os.getpid()}-{self._seq:06d}"
+        path = out_dir / f"{name}.parquet"
+        tmp = path.with_name(f".{path.name}.tmp")
+        pq.write_table(table, tmp, compression=self.compression)
+        os.replace(tmp, path)
+        return path
+
+
+# ================= READER ===================
+def list_segments(
+    directory: str = PREDICTION_LOG_DIR,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> List[Path]:
+    """Segment có thể chứa dòng với start <= ts < end (theo tên file), cũ trước."""
+    root = Path(directory)
+    if not root.exists():
+        return []
+
+    def _day(ts: float) -> str:
+        return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    # thư mục ngày = ngày của ts_min; segment có thể vắt qua nửa đêm nên lùi 1 ngày
+    day_lo = _day(start - 86400) if start is not None else None
+    day_hi = _day(end) if end is not None else None
+    segments = []
+    for day_dir in root.glob("dt=*"):
+        day = day_dir.name[3:]
+        if (day_lo and day < day_lo) or (day_hi and day > day_hi):
+            continue
+        for path in day_dir.glob("part-*.parquet"):
+            m = _SEGMENT_RE.search(path.name)
+            if m is None:
+                continue
+            t_min, t_max = int(m.group(1)) / 1000, int(m.group(2)) / 1000
+            if start is not None and t_max < start:
+                continue
+            if end is not None and t_min >= end:
+                continue
+            segments.append((t_min, path))
+    return [p for _, p in sorted(segments)]
+
+
+def read_segments(
+    directory: str = PREDICTION_LOG_DIR,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream từng segment (DataFrame) có dòng với start <= ts < end, theo thời gian."""
+    read_cols = None if columns is None else list(dict.fromkeys(["ts", *columns]))
+    for path in list_segments(directory, start, end):
+        df = pq.read_table(path, columns=read_cols, partitioning=None).to_pandas()
+        if start is not None:
+            df = df[df["ts"] >= start]
+        if end is not None:
+            df = df[df["ts"] < end]
+        if columns is not None:
+            df = df[list(columns)]
+        if len(df):
+            yield df.reset_index(drop=True)
+
+
+def read_range(
+    directory: str = PREDICTION_LOG_DIR,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    frames = list(read_segments(directory, start, end, columns))
+    if not frames:
+        return pd.DataFrame(columns=list(columns) if columns else SCHEMA.names)
+    return pd.concat(frames, ignore_index=True)
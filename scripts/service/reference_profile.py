@@ -0,0 +1,153 @@
+"""
+Reference profile cho drift: thống kê của dữ liệu reference (data/telco_churn.csv)
+được tính 1 lần rồi lưu thành file JSON nhỏ, thay vì giữ cả CSV trong RAM.
+
+- Key = md5 của dữ liệu (scripts.data_cache.data_hash): md5 trong file .dvc đi kèm
+  (data/telco_churn.csv.dvc) nếu khớp CSV hiện tại / CSV chưa pull, không thì tự
+  hash file. Dữ liệu đổi (dvc pull bản mới, sửa CSV) -> key mới -> build lại.
+- Nội dung: số dòng, mean/std/quantile/histogram cho cột số, tần suất category.
+- File: TELCO_REFERENCE_PROFILE_DIR/<tên file>.<md5>.json
+
+Build trước (vd. trong Airflow / Docker build):
+
+    python -m scripts.service.reference_profile --data data/telco_churn.csv
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from scripts.data_cache import data_hash, read_table
+
+logger = logging.getLogger("telco-monitor")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+PROFILE_DIR = Path(
+    os.getenv(
+        "TELCO_REFERENCE_PROFILE_DIR", str(PROJECT_ROOT / "data" / "reference_profiles")
+    )
+)
+# đổi cấu trúc profile thì tăng số này để file cũ bị build lại
+PROFILE_FORMAT = 1
+HISTOGRAM_BINS = 20
+QUANTILES = [0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1.0]
+
+
+def profile_path(path: Path, digest: str) -> Path:
+    return PROFILE_DIR / f"{path.stem}.{digest}.json"
+
+
+def build_profile(
+    df: pd.DataFrame, numeric: Sequence[str], categorical: Sequence[str]
+) -> Dict[str, Any]:
+    count = len(df)
+    numeric_profile: Dict[str, Any] = {}
+    for col in numeric:
+        x = pd.to_numeric(df[col], errors="coerce").dropna().to_numpy(dtype=np.float64)
+        if len(x):
+            hist, edges = np.histogram(x, bins=HISTOGRAM_BINS)
+            numeric_profile[col] = {
+                "mean": float(x.mean()),
+                "std": float(x.std()),
+                "quantiles": dict(zip(map(str, QUANTILES), np.quantile(x, QUANTILES).tolist())),
+                "histogram": {"edges": edges.tolist(), "counts": hist.tolist()},
+                "missing": int(count - len(x)),
+            }
+        else:
+            numeric_profile[col] = {
+                "mean": float("nan"),
+                "std": float("nan"),
+                "quantiles": {},
+                "histogram": {"edges": [], "counts": []},
+                "missing": count,
+            }
+
+    category_counts = {
+        col: {str(k): int(v) for k, v in df[col].value_counts().items()} for col in categorical
+    }
+    return {
+        "format": PROFILE_FORMAT,
+        "count": count,
+        "features": list(numeric) + list(categorical),
+        "numeric": numeric_profile,
+        "category_counts": category_counts,
+        # cùng dạng với drift_stats.frame_summary()
+        "categories": {
+            col: {k: v / count for k, v in counts.items()} if count else {}
+            for col, counts in category_counts.items()
+        },
+    }
+
+
+def _valid(profile: Dict[str, Any], features: Sequence[str]) -> bool:
+    return profile.get("format") == PROFILE_FORMAT and profile.get("features") == list(features)
+
+
+def load_or_build(
+    path: Path, numeric: Sequence[str], categorical: Sequence[str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Profile cho file reference `path`: đọc file JSON đã lưu, hoặc build từ CSV
+    (chỉ đọc các cột cần) rồi lưu. None nếu không có cả profile lẫn CSV.
+    """
+    features = list(numeric) + list(categorical)
+    digest = data_hash(path)
+    if digest is None:
+        return None
+
+    out = profile_path(path, digest)
+    if out.exists():
+        profile = json.loads(out.read_text(encoding="utf-8"))
+        if _valid(profile, features):
+            logger.info(f"[MONITOR] Loaded reference profile {out.name} ({profile['count']} rows)")
+            return profile
+
+    if not path.exists():
+        logger.warning(f"[MONITOR] No reference profile for md5={digest} and {path} is missing")
+        return None
+
+    t0 = time.perf_counter()
+    # dùng chung cache Parquet với training (scripts.data_cache)
+    df = read_table(path, features)
+    profile = build_profile(df, numeric, categorical)
+    profile["source"] = path.name
+    profile["md5"] = digest
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+    os.replace(tmp, out)
+    logger.info(
+        f"[MONITOR] Built reference profile {out.name} from {len(df)} rows "
+        f"in {time.perf_counter() - t0:.3f}s"
+    )
+    return profile
+
+
+def main() -> None:
+    from scripts.service.monitoring import (
+        CATEGORICAL_FEATURES,
+        DRIFT_NUMERIC_FEATURES,
+        REFERENCE_DATA_PATH,
+    )
+
+    parser = argparse.ArgumentParser(description="Build drift reference profile")
+    parser.add_argument("--data", default=str(REFERENCE_DATA_PATH))
+    args = parser.parse_args()
+
+    path = Path(args.data)
+    profile = load_or_build(path, DRIFT_NUMERIC_FEATURES, CATEGORICAL_FEATURES)
+    if profile is None:
+        raise SystemExit(f"Reference data not found: {path}")
+    print(f"✅ Reference profile: {profile_path(path, profile['md5'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Index các drift report đã sinh (SQLite nhỏ) + retention.
+
+/monitor/status chỉ đọc index (có phân trang) thay vì glob + stat mọi file
+trong reports/. Mỗi report được ghi 1 dòng ngay khi render xong: tên file,
+thời điểm tạo, kích thước, renderer, kết quả drift, thời gian render / peak RAM.
+
+Retention (chạy sau mỗi lần thêm report): giữ tối đa MAX_REPORTS report mới
+nhất và không quá MAX_AGE_DAYS ngày; report bị loại thì xoá cả file HTML lẫn
+dòng index. drift_report_latest.html không nằm trong index nên không bị xoá.
+
+Lần đầu tạo index, các file drift_report_*.html có sẵn được nạp vào (1 lần).
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("telco-monitor")
+
+# cùng thư mục state với prediction log (TELCO_STATE_DIR, mặc định thư mục tạm)
+STATE_DIR = Path(os.getenv("TELCO_STATE_DIR", str(Path(tempfile.gettempdir()) / "telco-service")))
+
+INDEX_PATH = Path(os.getenv("TELCO_REPORT_INDEX_PATH", str(STATE_DIR / "report_index.sqlite")))
+MAX_REPORTS = int(os.getenv("TELCO_REPORT_RETENTION_COUNT", "200"))
+MAX_AGE_DAYS = float(os.getenv("TELCO_REPORT_RETENTION_DAYS", "30"))
+
+_FIELDS = [
+    "name",
+    "created_at",
+    "size_bytes",
+    "renderer",
+    "data_points",
+    "drift_detected",
+    "drift_share",
+    "drifted_features",
+    "render_seconds",
+    "peak_memory_mb",
+]
+
+
+class ReportIndex:
+    def __init__(
+        self,
+        reports_dir: Path,
+        path: Path = INDEX_PATH,
+        max_reports: int = MAX_REPORTS,
+        max_age_days: float = MAX_AGE_DAYS,
+    ):
+        self.reports_dir = Path(reports_dir)
+        self.path = Path(path)
+        self.max_reports = max_reports
+        self.max_age_days = max_age_days
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._init(conn)
+                    self._ready = True
+        return conn
+
+    def _init(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    name TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    size_bytes INTEGER,
+                    renderer TEXT,
+                    data_points INTEGER,
+                    drift_detected INTEGER,
+                    drift_share REAL,
+                    drifted_features TEXT,
+                    render_seconds REAL,
+                    peak_memory_mb REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_created ON reports (created_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            backfilled = conn.execute("SELECT 1 FROM meta WHERE key = 'backfilled'").fetchone()
+            if backfilled is None:
+                rows = [
+                    (p.name, p.stat().st_mtime, p.stat().st_size)
+                    for p in self.reports_dir.glob("drift_report_*.html")
+                    if p.name != "drift_report_latest.html"
+                ]
+                conn.executemany(
+                    "INSERT OR IGNORE INTO reports (name, created_at, size_bytes) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('backfilled', ?)", (str(time.time()),)
+                )
+                if rows:
+                    logger.info(f"[MONITOR] report index: backfilled {len(rows)} existing reports")
+
+    # ------------------------------------------------------------------
+    def add(self, entry: Dict[str, Any]) -> List[str]:
+        """Thêm 1 report (entry có ít nhất name) rồi áp retention; trả tên report bị xoá."""
+        row = {f: entry.get(f) for f in _FIELDS}
+        if row["created_at"] is None:
+            row["created_at"] = time.time()
+        if row["size_bytes"] is None:
+            p = self.reports_dir / row["name"]
+            row["size_bytes"] = p.stat().st_size if p.exists() else None
+        if row["drifted_features"] is not None:
+            row["drifted_features"] = json.dumps(list(row["drifted_features"]))
+        if row["drift_detected"] is not None:
+            row["drift_detected"] = int(bool(row["drift_detected"]))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO reports ({', '.join(_FIELDS)}) "
+                    f"VALUES ({', '.join('?' for _ in _FIELDS)})",
+                    [row[f] for f in _FIELDS],
+                )
+            return self._cleanup(conn)
+        finally:
+            conn.close()
+
+    def cleanup(self) -> List[str]:
+        conn = self._connect()
+        try:
+            return self._cleanup(conn)
+        finally:
+            conn.close()
+
+    def _cleanup(self, conn: sqlite3.Connection) -> List[str]:
+        cutoff = time.time() - self.max_age_days * 86400
+        names = [
+            r["name"]
+            for r in conn.execute(
+                "SELECT name FROM reports WHERE created_at < ? "
+                "OR name NOT IN (SELECT name FROM reports ORDER BY created_at DESC LIMIT ?)",
+                (cutoff, self.max_reports),
+            )
+        ]
+        if not names:
+            return []
+        for name in names:
+            try:
+                (self.reports_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"[MONITOR] could not delete old report {name}: {e!r}")
+        with conn:
+            conn.executemany("DELETE FROM reports WHERE name = ?", [(n,) for n in names])
+        logger.info(f"[MONITOR] report retention removed {len(names)} reports")
+        return names
+
+    # ------------------------------------------------------------------
+    def page(self, limit: int = 10, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """(tổng số report, report mới nhất trước, từ offset, tối đa limit)."""
+        conn = self._connect()
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            rows = conn.execute(
+                "SELECT * FROM reports ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        finally:
+            conn.close()
+        return total, [_decode(r) for r in rows]
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        _, rows = self.page(limit=1)
+        return rows[0] if rows else None
+
+
+def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+    out = dict(row)
+    if out["drifted_features"] is not None:
+        out["drifted_features"] = json.loads(out["drifted_features"])
+    if out["drift_detected"] is not None:
+        out["drift_detected"] = bool(out["drift_detected"])
+    return out
@@ -0,0 +1,187 @@
+"""
+Hàng đợi job sinh drift report chạy trên 1 worker thread riêng.
+
+Endpoint /monitor/* chỉ submit job rồi trả job_id ngay, không chạy pandas /
+Evidently trên event loop. Trong lúc đã có job đang chờ/chạy, mọi trigger mới
+(manual, trigger_now, scheduler) được gộp (coalesce) vào job đó thay vì xếp
+thêm job trùng. Trạng thái job: queued -> running -> succeeded | skipped | failed,
+tra cứu qua /monitor/jobs/{job_id}; chỉ giữ MAX_HISTORY job gần nhất.
+
+Hàng đợi retrain (scripts.service.retrain_worker) dùng lại class này với
+coalesce_running=False: trigger mới chỉ gộp vào job còn đang chờ, không gộp
+vào job đang chạy (data có thể đã đổi sau khi job đó bắt đầu).
+"""
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("telco-monitor")
+
+MAX_HISTORY = int(os.getenv("TELCO_REPORT_JOB_HISTORY", "100"))
+
+QUEUED, RUNNING, SUCCEEDED, SKIPPED, FAILED = "queued", "running", "succeeded", "skipped", "failed"
+
+
+class ReportJob:
+    def __init__(self, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.trigger = trigger
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.coalesced = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def info(self, queue_position: Optional[int] = None) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None:
+            duration = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "job_id": self.id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": duration,
+            "queue_position": queue_position,
+            "coalesced_triggers": self.coalesced,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class ReportJobQueue:
+    """
+    fn() chạy job: trả dict kết quả (vd. tên file report), None nếu bỏ qua
+    (chưa đủ data), raise nếu lỗi.
+    coalesce_running: trigger mới được gộp cả vào job đang chạy (True) hay chỉ
+    vào job đang chờ (False).
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[], Optional[Dict[str, Any]]],
+        max_history: int = MAX_HISTORY,
+        coalesce_running: bool = True,
+        name: str = "drift-report",
+        tag: str = "[DRIFT][JOB]",
+    ):
+        self.fn = fn
+        self.max_history = max_history
+        self.coalesce_running = coalesce_running
+        self.name = name
+        self.tag = tag
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._running: Optional[ReportJob] = None
+        self._pending: List[ReportJob] = []
+        self._queue: "queue.Queue[Optional[ReportJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=f"{self.name}-worker", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    def submit(self, trigger: str) -> Tuple[ReportJob, bool]:
+        """(job, coalesced): coalesced=True nếu gộp vào job đang chờ/chạy."""
+        self.start()
+        with self._lock:
+            target = self._pending[-1] if self._pending else None
+            if target is None and self.coalesce_running:
+                target = self._running
+            if target is not None:
+                target.coalesced += 1
+                logger.info(
+                    f"{self.tag} {trigger} trigger coalesced into job {target.id} "
+                    f"({target.status})"
+                )
+                return target, True
+            job = ReportJob(trigger)
+            self._pending.append(job)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+        self._queue.put(job)
+        logger.info(f"{self.tag} submitted job {job.id} ({trigger})")
+        return job, False
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _position(self, job: ReportJob) -> Optional[int]:
+        # 0 = đang chạy, 1 = chạy tiếp theo, ...; None = đã xong
+        if job is self._running:
+            return 0
+        if job in self._pending:
+            return self._pending.index(job) + (1 if self._running is not None else 0)
+        return None
+
+    def info(self, job: ReportJob) -> Dict[str, Any]:
+        """job.info() kèm vị trí hiện tại trong hàng đợi."""
+        with self._lock:
+            return job.info(self._position(job))
+
+    def queue_length(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                job.info(self._position(job))
+                for job in reversed(list(self._jobs.values())[-limit:])
+            ]
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._pending.remove(job)
+                self._running = job
+                job.status = RUNNING
+                job.started_at = time.time()
+            result, error = None, None
+            try:
+                result = self.fn()
+            except Exception as e:
+                logger.exception(f"{self.tag} job {job.id} failed: {e!r}")
+                error = repr(e)
+            with self._lock:
+                self._running = None
+                job.result, job.error = result, error
+                job.status = FAILED if error else (SUCCEEDED if result is not None else SKIPPED)
+                job.finished_at = time.time()
+            job.done.set()
+            logger.info(
+                f"{self.tag} job {job.id} {job.status} in "
+                f"{job.finished_at - job.started_at:.3f}s"
+            )
@@ -0,0 +1,247 @@
+"""
+Render Evidently drift report trong 1 worker process riêng, sống lâu.
+
+- Worker (spawn, 1 process) import Evidently 1 lần lúc khởi động, nên mỗi lần
+  render không phải import lại và CPU / GIL / RAM của Evidently không tranh
+  với inference trong process phục vụ API.
+- Reference được đọc + lấy mẫu phân tầng (stratified) 1 lần trong worker rồi
+  cache theo (file, mtime, cỡ mẫu); theo cột TELCO_REPORT_STRATIFY_COLUMN
+  (mặc định "Churn", không có thì "Contract") để giữ đúng tỉ lệ từng nhóm.
+- Mỗi lần render đo thời gian + peak RSS (ResourceMeter) và trả về cho caller.
+- Worker chết / quá TELCO_REPORT_TIMEOUT_SECONDS -> bị kill, lần sau tạo lại.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import pandas as pd
+
+from scripts import data_cache
+from scripts.profiling import ResourceMeter
+
+logger = logging.getLogger("telco-monitor")
+
+REFERENCE_SAMPLE_SIZE = int(os.getenv("TELCO_REPORT_REFERENCE_SAMPLE", "5000"))
+STRATIFY_COLUMN = os.getenv("TELCO_REPORT_STRATIFY_COLUMN", "Churn")
+FALLBACK_STRATIFY_COLUMN = "Contract"
+RENDER_TIMEOUT_SECONDS = float(os.getenv("TELCO_REPORT_TIMEOUT_SECONDS", "300"))
+
+
+# ================= LẤY MẪU REFERENCE ===================
+def stratified_sample(
+    df: pd.DataFrame, size: int, column: Optional[str], seed: int = 42
+) -> pd.DataFrame:
+    """Lấy ~size dòng, giữ tỉ lệ từng giá trị của `column` (None -> mẫu ngẫu nhiên)."""
+    if size <= 0 or len(df) <= size:
+        return df
+    frac = size / len(df)
+    if column is None or column not in df.columns:
+        return df.sample(n=size, random_state=seed)
+    return df.groupby(column, group_keys=False, dropna=False, observed=True).sample(
+        frac=frac, random_state=seed
+    )
+
+
+def load_reference_sample(
+    path: Path, columns: Sequence[str], size: int, stratify: Optional[str] = STRATIFY_COLUMN
+) -> Optional[pd.DataFrame]:
+    """Reference (chỉ `columns`) đã lấy mẫu phân tầng; None nếu không có dữ liệu."""
+    header = data_cache.column_names(path)
+    if not header:
+        return None
+    strata = next(
+        (c for c in (stratify, FALLBACK_STRATIFY_COLUMN) if c and c in header), None
+    )
+    wanted = list(dict.fromkeys([*columns, *([strata] if strata else [])]))
+    df = data_cache.read_table(path, wanted)
+    return stratified_sample(df, size, strata)[list(columns)].reset_index(drop=True)
+
+
+# ================= WORKER PROCESS ===================
+_worker: Dict[str, Any] = {"error": None, "reference": {}}
+
+
+def _init_worker(pids: Any) -> None:
+    """Chạy 1 lần khi worker khởi động: báo pid cho process cha, import sẵn Evidently."""
+    pids.put(os.getpid())
+    try:
+        try:
+            from evidently.report import Report
+        except ImportError:
+            from evidently import Report  # type: ignore
+
+        try:
+            from evidently.presets import DataDriftPreset
+        except ImportError:
+            from evidently.metric_preset import DataDriftPreset  # type: ignore
+
+        _worker["Report"], _worker["DataDriftPreset"] = Report, DataDriftPreset
+    except Exception as e:
+        _worker["error"] = repr(e)
+
+
+def _probe() -> Optional[str]:
+    return _worker["error"]
+
+
+def _reference(path: str, columns: Sequence[str], size: int, stratify: Optional[str]):
+    p = Path(path)
+    key = (path, p.stat().st_mtime if p.exists() else None, size, stratify, tuple(columns))
+    cache = _worker["reference"]
+    if key not in cache:
+        cache.clear()
+        cache[key] = load_reference_sample(p, columns, size, stratify)
+    return cache[key]
+
+
+def _save_html(report: Any, snapshot: Any, paths: Sequence[Path]) -> None:
+    # Evidently mới: run() trả Snapshot có save_html; bản cũ: chính Report có save_html
+    target = snapshot if snapshot is not None and hasattr(snapshot, "save_html") else report
+    if hasattr(target, "save_html"):
+        for p in paths:
+            target.save_html(str(p))
+        return
+    if hasattr(target, "as_html"):
+        html = target.as_html()
+    elif hasattr(target, "to_html"):
+        html = target.to_html()
+    elif hasattr(target, "_repr_html_"):
+        html = target._repr_html_()
+    else:
+        html = str(target)
+    for p in paths:
+        p.write_text(html, encoding="utf-8")
+
+
+def _render(task: Dict[str, Any]) -> Dict[str, Any]:
+    if _worker["error"] is not None:
+        raise RuntimeError(f"Evidently not usable in report worker: {_worker['error']}")
+    current: pd.DataFrame = task["current"]
+    with ResourceMeter() as meter:
+        reference = _reference(
+            task["reference_path"], list(current.columns), task["sample_size"], task["stratify"]
+        )
+        source = "sample"
+        if reference is None or reference.empty:
+            reference, source = current, "current"
+        report = _worker["Report"]([_worker["DataDriftPreset"]()])
+        snapshot = report.run(reference_data=reference, current_data=current)
+        _save_html(report, snapshot, [Path(p) for p in task["paths"]])
+    return {
+        **meter.stats(),
+        "reference": source,
+        "reference_rows": len(reference),
+        "current_rows": len(current),
+        "worker_pid": os.getpid(),
+    }
+
+
+class EvidentlyRenderer:
+    def __init__(
+        self,
+        sample_size: int = REFERENCE_SAMPLE_SIZE,
+        stratify: Optional[str] = STRATIFY_COLUMN,
+        timeout: float = RENDER_TIMEOUT_SECONDS,
+    ):
+        self.sample_size = sample_size
+        self.stratify = stratify
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # pid do worker tự báo lúc khởi động (ProcessPoolExecutor không có API public)
+        self._pid_queue: Any = None
+        self._pids: set = set()
+        self._error: Optional[str] = None
+        self._probed = False
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Khởi động worker + import Evidently ngay (không đợi report đầu tiên)."""
+        with self._lock:
+            if self._pool is None:
+                ctx = multiprocessing.get_context("spawn")
+                self._pid_queue, self._pids = ctx.SimpleQueue(), set()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(self._pid_queue,),
+                )
+                self._probed = False
+                logger.info("[DRIFT] report worker process started")
+            pool = self._pool
+        pool.submit(_probe)
+
+    def stop(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def worker_pids(self) -> list:
+        """Pid các worker đã khởi động của pool hiện tại."""
+        with self._lock:
+            while self._pid_queue is not None and not self._pid_queue.empty():
+                self._pids.add(self._pid_queue.get())
+            return sorted(self._pids)
+
+    def _kill(self) -> None:
+        pids = self.worker_pids()
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pid_queue, self._pids = None, set()
+        if pool is None:
+            return
+        pool.shutdown(wait=False, cancel_futures=True)
+        # worker chưa kịp báo pid thì vẫn đang khởi động: shutdown ở trên cho nó thoát
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def available(self) -> bool:
+        """Evidently import được trong worker không (hỏi worker 1 lần rồi nhớ)."""
+        if not self._probed:
+            self.start()
+            try:
+                self._error = self._pool.submit(_probe).result(timeout=self.timeout)
+            except BrokenProcessPool as e:
+                self._kill()
+                self._error = repr(e)
+            self._probed = True
+            if self._error:
+                logger.warning(
+                    f"[DRIFT] Evidently not usable in report worker ({self._error}). "
+                    "Will generate simple HTML summary instead."
+                )
+        return self._error is None
+
+    def render(
+        self, reference_path: Path, current: pd.DataFrame, paths: Sequence[Path]
+    ) -> Dict[str, Any]:
+        """Render report vào `paths` trong worker; trả {seconds, peak_memory_mb, ...}."""
+        self.start()
+        task = {
+            "reference_path": str(reference_path),
+            "current": current,
+            "paths": [str(p) for p in paths],
+            "sample_size": self.sample_size,
+            "stratify": self.stratify,
+        }
+        future = self._pool.submit(_render, task)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            logger.error(f"[DRIFT] report worker timed out after {self.timeout}s, restarting it")
+            self._kill()
+            raise
+        except BrokenProcessPool:
+            logger.error("[DRIFT] report worker died, it will be restarted on next run")
+            self._kill()
+            raise
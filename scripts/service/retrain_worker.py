@@ -0,0 +1,153 @@
+"""
+Chạy retrain trong 1 worker process riêng, sống lâu và đã import sẵn.
+
+Trước đây mỗi lần retrain là 1 `python -m scripts.train` mới: tốn thời gian
+khởi động interpreter + import mlflow / sklearn / pandas, không có timeout và
+thread chạy nó chết im lặng cùng process. Ở đây:
+
+- Worker (spawn, 1 process) import target (mặc định scripts.train:train) ngay
+  lúc khởi động, nên job retrain chỉ còn tốn thời gian train thật sự.
+- Job đi qua ReportJobQueue (coalesce_running=False): trigger trùng trong lúc
+  đã có job đang chờ được gộp vào job đó; job đang chạy không bị gộp.
+- Job quá TELCO_RETRAIN_TIMEOUT_SECONDS -> worker bị kill (job failed), job
+  sau tạo lại worker mới.
+- Kết quả job: thời gian train, pid worker và những gì target trả về
+  (scripts.train.train trả run_id, accuracy, f1, model_version).
+"""
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("telco-monitor")
+
+RETRAIN_TARGET = os.getenv("TELCO_RETRAIN_TARGET", "scripts.train:train")
+RETRAIN_TIMEOUT_SECONDS = float(os.getenv("TELCO_RETRAIN_TIMEOUT_SECONDS", "3600"))
+
+
+def _resolve(target: str) -> Callable[..., Any]:
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module), attr or "main")
+
+
+# ================= WORKER PROCESS ===================
+_worker: Dict[str, Any] = {"fn": None, "error": None}
+
+
+def _init_worker(target: str, pids: Any) -> None:
+    """
+    Chạy 1 lần khi worker khởi động: báo pid cho process cha, import target
+    (+ mlflow, sklearn, pandas).
+    """
+    pids.put(os.getpid())
+    try:
+        _worker["fn"] = _resolve(target)
+    except Exception as e:
+        _worker["error"] = repr(e)
+
+
+def _probe() -> Optional[str]:
+    return _worker["error"]
+
+
+def _train(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    if _worker["error"] is not None:
+        raise RuntimeError(f"Retrain target not importable in worker: {_worker['error']}")
+    t0 = time.perf_counter()
+    result = _worker["fn"](**kwargs)
+    out = dict(result) if isinstance(result, dict) else {"return_value": result}
+    out["train_seconds"] = round(time.perf_counter() - t0, 3)
+    out["worker_pid"] = os.getpid()
+    return out
+
+
+class RetrainWorker:
+    def __init__(self, target: str = RETRAIN_TARGET, timeout: float = RETRAIN_TIMEOUT_SECONDS):
+        self.target = target
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # pid do worker tự báo lúc khởi động (ProcessPoolExecutor không có API public)
+        self._pid_queue: Any = None
+        self._pids: set = set()
+        self._started_at: Optional[float] = None
+        self._runs = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor:
+        """Khởi động worker + import target ngay (không đợi retrain đầu tiên)."""
+        with self._lock:
+            if self._pool is None:
+                ctx = multiprocessing.get_context("spawn")
+                self._pid_queue, self._pids = ctx.SimpleQueue(), set()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(self.target, self._pid_queue),
+                )
+                self._started_at = time.time()
+                logger.info(f"[RETRAIN] worker process started (target={self.target})")
+            pool = self._pool
+        pool.submit(_probe)
+        return pool
+
+    def stop(self) -> None:
+        """Dừng worker; retrain đang chạy (nếu có) bị huỷ luôn, không chờ."""
+        self._kill()
+
+    def worker_pids(self) -> list:
+        """Pid các worker đã khởi động của pool hiện tại."""
+        with self._lock:
+            while self._pid_queue is not None and not self._pid_queue.empty():
+                self._pids.add(self._pid_queue.get())
+            return sorted(self._pids)
+
+    def _kill(self) -> None:
+        pids = self.worker_pids()
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pid_queue, self._pids = None, set()
+        if pool is None:
+            return
+        pool.shutdown(wait=False, cancel_futures=True)
+        # worker chưa kịp báo pid thì vẫn đang khởi động: shutdown ở trên cho nó thoát
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self, **kwargs: Any) -> Dict[str, Any]:
+        """Chạy target(**kwargs) trong worker; raise TimeoutError nếu quá timeout."""
+        future = self.start().submit(_train, kwargs)
+        try:
+            result = future.result(timeout=self.timeout)
+        except TimeoutError:
+            logger.error(f"[RETRAIN] worker timed out after {self.timeout}s, killing it")
+            self._kill()
+            raise
+        except BrokenProcessPool:
+            logger.error("[RETRAIN] worker died, it will be restarted on next job")
+            self._kill()
+            raise
+        self._runs += 1
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        pids = self.worker_pids()
+        with self._lock:
+            pool = self._pool
+        return {
+            "target": self.target,
+            "running": pool is not None,
+            "worker_pids": pids,
+            "started_at": self._started_at if pool is not None else None,
+            "timeout_seconds": self.timeout,
+            "completed_runs": self._runs,
+        }
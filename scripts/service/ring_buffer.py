@@ -0,0 +1,217 @@
+"""
+Ring buffer dạng cột (NumPy) cho prediction log của monitoring.
+
+- Mỗi cột số là 1 mảng NumPy cố định; cột category lưu code int32 + list category
+  (dictionary encoding), nên RAM không tăng theo số request. Category là chuỗi
+  tự do từ client: tối đa TELCO_MAX_CATEGORIES giá trị / cột, giá trị mới sau
+  đó được gom vào OTHER_CATEGORY.
+- Append 1 dòng hay cả batch đều O(số dòng), có lock (request thread, threadpool,
+  APScheduler dùng chung).
+- Mảng được cấp 2 * capacity và mỗi dòng ghi 2 lần (i và i + capacity), nên
+  `capacity` dòng gần nhất luôn là 1 đoạn liên tục -> snapshot() chỉ cần copy
+  1 slice liền (memcpy) / cột trong lock, theo đúng thứ tự thời gian. Snapshot
+  là bản copy: append sau đó không làm đổi dữ liệu của nó.
+- Tuỳ chọn `stats` (WindowStats): được add dòng mới / remove dòng bị ghi đè
+  ngay trong lúc append, nên luôn là thống kê của đúng window hiện tại.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from scripts.service.drift_stats import WindowStats
+
+MAX_CATEGORIES = int(os.getenv("TELCO_MAX_CATEGORIES", "64"))
+OTHER_CATEGORY = "__other__"
+
+
+@dataclass(frozen=True)
+class RingSnapshot:
+    """
+    n dòng gần nhất, cũ -> mới: mảng + list category được copy cùng lúc trong
+    lock, nên code luôn khớp categories và không bị append sau đó ghi đè.
+    """
+
+    n: int
+    # tổng số dòng đã append tới thời điểm snapshot (kể cả dòng đã bị ghi đè)
+    total: int
+    numeric: Dict[str, np.ndarray]
+    codes: Dict[str, np.ndarray]
+    categories: Dict[str, List[str]]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def copy(self) -> "RingSnapshot":
+        return RingSnapshot(
+            n=self.n,
+            total=self.total,
+            numeric={k: v.copy() for k, v in self.numeric.items()},
+            codes={k: v.copy() for k, v in self.codes.items()},
+            categories=self.categories,
+        )
+
+    def category_counts(self, column: str) -> Dict[str, int]:
+        counts = np.bincount(self.codes[column], minlength=len(self.categories[column]))
+        return {c: int(k) for c, k in zip(self.categories[column], counts) if k}
+
+    def frame(self, columns: Sequence[str] = (), as_category: bool = False) -> pd.DataFrame:
+        """
+        DataFrame của snapshot (cột số không copy nếu được).
+        Cột category: chuỗi (object) như input, hoặc pd.Categorical nếu as_category.
+        """
+        data: Dict[str, Any] = {}
+        for col in columns or list(self.codes) + list(self.numeric):
+            if col in self.codes:
+                if as_category:
+                    data[col] = pd.Categorical.from_codes(
+                        self.codes[col], categories=self.categories[col]
+                    )
+                else:
+                    data[col] = np.asarray(self.categories[col] or [""], dtype=object)[
+                        self.codes[col]
+                    ]
+            else:
+                data[col] = self.numeric[col]
+        return pd.DataFrame(data, copy=False)
+
+
+class ColumnarRingBuffer:
+    def __init__(
+        self,
+        capacity: int,
+        numeric: Mapping[str, Any],
+        categorical: Sequence[str],
+        stats: Optional[WindowStats] = None,
+        max_categories: int = MAX_CATEGORIES,
+    ):
+        self.capacity = max(1, int(capacity))
+        self.max_categories = max(1, int(max_categories))
+        self.stats = stats
+        self.columns = list(categorical) + list(numeric)
+        self._numeric = {
+            col: np.zeros(2 * self.capacity, dtype=dtype) for col, dtype in numeric.items()
+        }
+        self._codes = {
+            col: np.zeros(2 * self.capacity, dtype=np.int32) for col in categorical
+        }
+        self._categories: Dict[str, List[str]] = {col: [] for col in categorical}
+        self._category_index: Dict[str, Dict[str, int]] = {col: {} for col in categorical}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._total, self.capacity)
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def _encode(self, col: str, values: Sequence[Any]) -> List[int]:
+        index = self._category_index[col]
+        out = []
+        for v in values:
+            key = "" if v is None else str(v)
+            code = index.get(key)
+            if code is None:
+                if len(self._categories[col]) >= self.max_categories:
+                    key = OTHER_CATEGORY
+                    code = index.get(key)
+                if code is None:
+                    code = index[key] = len(self._categories[col])
+                    self._categories[col].append(key)
+            out.append(code)
+        return out
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        self.extend([row])
+
+    def extend(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        """Append nhiều dòng trong 1 lần lấy lock (vd. cả /predict_batch)."""
+        self.extend_columns({col: [r.get(col) for r in rows] for col in self.columns})
+
+    def extend_columns(self, columns: Mapping[str, Sequence[Any]]) -> None:
+        """Append theo cột: {tên cột: list/mảng giá trị}, mọi cột cùng độ dài."""
+        n = len(next(iter(columns.values()))) if columns else 0
+        if n == 0:
+            return
+        skip = max(0, n - self.capacity)  # batch lớn hơn capacity: chỉ giữ phần cuối
+
+        with self._lock:
+            if self.stats is not None:
+                self._evict_from_stats(n - skip)
+
+            idx = (self._total + skip + np.arange(n - skip)) % self.capacity
+            mirror = idx + self.capacity
+            added_numeric: Dict[str, np.ndarray] = {}
+            added_codes: Dict[str, np.ndarray] = {}
+            for col, buf in self._numeric.items():
+                values = np.asarray(columns[col][skip:], dtype=buf.dtype)
+                buf[idx] = values
+                buf[mirror] = values
+                added_numeric[col] = values
+            for col, buf in self._codes.items():
+                codes = np.asarray(self._encode(col, columns[col][skip:]), dtype=np.int32)
+                buf[idx] = codes
+                buf[mirror] = codes
+                added_codes[col] = codes
+            self._total += n
+
+            if self.stats is not None:
+                self.stats.add(added_numeric, added_codes)
+                if self.stats.removed_since_sync >= self.capacity:
+                    self._resync_stats()
+
+    def _evict_from_stats(self, incoming: int) -> None:
+        """Remove khỏi stats các dòng cũ nhất sắp bị `incoming` dòng mới ghi đè."""
+        stored = len(self)
+        evicted = stored + incoming - self.capacity
+        if evicted <= 0:
+            return
+        start = (self._total - stored) % self.capacity
+        end = start + evicted
+        # copy(): các ô này sắp bị ghi đè
+        self.stats.remove(
+            {col: buf[start:end].copy() for col, buf in self._numeric.items()},
+            {col: buf[start:end].copy() for col, buf in self._codes.items()},
+        )
+
+    def _resync_stats(self) -> None:
+        n = len(self)
+        start = (self._total - n) % self.capacity
+        end = start + n
+        self.stats.load(
+            {col: buf[start:end] for col, buf in self._numeric.items()},
+            {col: buf[start:end] for col, buf in self._codes.items()},
+        )
+
+    def stats_summary(self) -> Dict[str, Any]:
+        """WindowStats.summary() với tên category (cần stats)."""
+        with self._lock:
+            categories = {col: list(c) for col, c in self._categories.items()}
+            return self.stats.summary(categories)
+
+    def snapshot(self, last: int = 0) -> RingSnapshot:
+        """Bản copy của `last` dòng gần nhất (0 = toàn bộ)."""
+        with self._lock:
+            n = len(self) if last <= 0 else min(last, len(self))
+            start = (self._total - n) % self.capacity
+            end = start + n
+            # copy trong lock: view sẽ thấy dòng bị append sau ghi đè, và code
+            # của category mới không có trong list categories đã copy
+            return RingSnapshot(
+                n=n,
+                total=self._total,
+                numeric={col: buf[start:end].copy() for col, buf in self._numeric.items()},
+                codes={col: buf[start:end].copy() for col, buf in self._codes.items()},
+                categories={col: list(c) for col, c in self._categories.items()},
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._total = 0
+            if self.stats is not None:
+                self.stats.reset()
@@ -1,14 +1,26 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import io
+import json
 import os
 from pathlib import Path
 import logging
+import threading
+import time
+from datetime import datetime
 
+import numpy as np
 import pandas as pd
-import mlflow
-import mlflow.sklearn
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
 
-from scripts.service import monitoring
+from scripts.service import metrics, model_loader, monitoring, serialization
+from scripts.service.batching import MicroBatcher
+from scripts.service.cache import PredictionCache, feature_key
+from scripts.service.executor import ExecutorSaturatedError, InferenceExecutor
+from scripts.service.model_loader import LOCAL_MODEL_PATH, MLFLOW_TRACKING_URI, MODEL_URI
+from scripts.service.shadow import ShadowScorer
+from scripts.service.streaming import BodyPipe, DuplexStreamingResponse
 from scripts.service.schemas.request import TelcoFeatures, TelcoBatchRequest
 from scripts.service.schemas.response import TelcoPrediction, TelcoBatchResponse
 
@@ -16,123 +28,616 @@ logger = logging.getLogger("telco-api")
 
 router = APIRouter()
 
-MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://mlflow:5050")
-MODEL_URI = os.getenv("MODEL_URI", "models:/telco-churn-model/Production")
+# gom các request /predict đồng thời thành 1 batch (tắt mặc định)
+MICROBATCH_ENABLED = os.getenv("TELCO_MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("TELCO_MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("TELCO_MICROBATCH_MAX_WAIT_MS", "2"))
+MICROBATCH_TIMEOUT_SECONDS = float(os.getenv("TELCO_MICROBATCH_TIMEOUT_SECONDS", "30"))
 
-# ✅ thêm biến để ưu tiên load local model khi deploy cloud
-LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", "/app/models/mlflow_export")
+# executor riêng cho inference: số worker + số task được xếp hàng, đầy -> 503.
+# Với micro-batching, mỗi /predict giữ 1 worker trong lúc chờ batch nên cần
+# ít nhất MICROBATCH_MAX_SIZE worker để batch đạt kích thước tối đa.
+INFERENCE_WORKERS = int(
+    os.getenv(
+        "TELCO_INFERENCE_WORKERS",
+        str(MICROBATCH_MAX_SIZE if MICROBATCH_ENABLED else min(32, (os.cpu_count() or 1) + 4)),
+    )
+)
+INFERENCE_QUEUE_SIZE = int(os.getenv("TELCO_INFERENCE_QUEUE_SIZE", "64"))
+INFERENCE_RETRY_AFTER_SECONDS = int(os.getenv("TELCO_INFERENCE_RETRY_AFTER_SECONDS", "1"))
+
+# cache kết quả theo (model version, feature tuple); size=0 để tắt
+PREDICTION_CACHE_SIZE = int(os.getenv("TELCO_PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("TELCO_PREDICTION_CACHE_TTL_SECONDS", "300"))
+
+# shadow scoring: challenger (registry stage/version hoặc path local) score bản sao
+# traffic thật ở background; rỗng = tắt
+SHADOW_MODEL_URI = os.getenv("TELCO_SHADOW_MODEL_URI", "")
+SHADOW_QUEUE_SIZE = int(os.getenv("TELCO_SHADOW_QUEUE_SIZE", "1000"))
+SHADOW_BATCH_SIZE = int(os.getenv("TELCO_SHADOW_BATCH_SIZE", "256"))
+SHADOW_RETRY_SECONDS = float(os.getenv("TELCO_SHADOW_RETRY_SECONDS", "60"))
+
+# /predict_stream: số record mỗi chunk score + số byte body tối đa đọc trước khi parser đọc kịp
+STREAM_CHUNK_SIZE = int(os.getenv("TELCO_STREAM_CHUNK_SIZE", "1000"))
+STREAM_BUFFER_BYTES = int(os.getenv("TELCO_STREAM_BUFFER_BYTES", str(8 * 1024 * 1024)))
+
+# warm-up lúc startup: số vòng + file JSON (list TelcoFeatures) tuỳ chọn
+WARMUP_ROUNDS = int(os.getenv("TELCO_WARMUP_ROUNDS", "3"))
+WARMUP_RECORDS_PATH = os.getenv("TELCO_WARMUP_RECORDS_PATH")
 
-# cache model + lỗi lần load gần nhất
-_model = None
-_model_error: Optional[str] = None
+DEFAULT_WARMUP_RECORDS = [
+    model_loader.WARMUP_RECORD,
+    {
+        "Contract": "Two year",
+        "tenure": 40,
+        "MonthlyCharges": 60.0,
+        "InternetService": "DSL",
+        "OnlineSecurity": "Yes",
+        "TechSupport": "Yes",
+    },
+    {
+        "Contract": "One year",
+        "tenure": 18,
+        "MonthlyCharges": 20.0,
+        "InternetService": "No",
+        "OnlineSecurity": "No internet service",
+        "TechSupport": "No internet service",
+    },
+]
 
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+ARROW_CONTENT_TYPES = {"application/vnd.apache.arrow.stream"}
 
-def _load_local_model_if_exists():
+# set sau khi warm-up xong -> /ready trả 200
+_ready = threading.Event()
+
+# thời gian từng stage inference (FastHistogram: observe < 1µs); child bind sẵn
+_perf = time.perf_counter
+_STAGE_VALIDATION = metrics.INFERENCE_STAGE_SECONDS.labels(stage="validation")
+_STAGE_DATAFRAME = metrics.INFERENCE_STAGE_SECONDS.labels(stage="dataframe")
+_STAGE_PREDICT_PROBA = metrics.INFERENCE_STAGE_SECONDS.labels(stage="predict_proba")
+_STAGE_MONITORING_LOG = metrics.INFERENCE_STAGE_SECONDS.labels(stage="monitoring_log")
+_STAGE_SERIALIZATION = metrics.INFERENCE_STAGE_SECONDS.labels(stage="serialization")
+
+
+async def _validation_started() -> float:
     """
-    Trả model nếu LOCAL_MODEL_PATH tồn tại, ngược lại trả None.
+    Dependency: FastAPI resolve dependency trước khi validate body bằng pydantic,
+    nên (lúc vào handler - giá trị này) = thời gian validate request.
     """
-    p = Path(LOCAL_MODEL_PATH)
-    if p.exists():
-        logger.info(f"Loading LOCAL model from: {p}")
-        # mlflow.sklearn.load_model() load được cả local MLflow model directory
-        return mlflow.sklearn.load_model(str(p))
-    return None
+    return _perf()
+
+
+_executor = InferenceExecutor(
+    max_workers=INFERENCE_WORKERS,
+    max_queue=INFERENCE_QUEUE_SIZE,
+)
+
+_cache = PredictionCache(
+    maxsize=PREDICTION_CACHE_SIZE,
+    ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+)
+# version là 1 phần của key nên entry cũ không dùng lại được; clear để giải phóng RAM
+model_loader.add_swap_listener(lambda old, new: _cache.clear())
+
+
+def _model_labels(model: model_loader.LoadedModel) -> Dict[str, str]:
+    return {
+        "version": str(model.version),
+        "source": str(model.source),
+        "registry_version": str(model.registry_version or ""),
+        "uri": str(model.uri or ""),
+        "scoring_engine": "native" if model.scorer is not None else "sklearn",
+    }
+
+
+def _export_model_metrics(
+    old: Optional[model_loader.LoadedModel], new: model_loader.LoadedModel
+) -> None:
+    """Thông tin model active trên /metrics (version, nguồn, thời gian load)."""
+    if old is not None:
+        metrics.MODEL_INFO.labels(**_model_labels(old)).set(0)
+    metrics.MODEL_INFO.labels(**_model_labels(new)).set(1)
+    metrics.MODEL_LOAD_SECONDS.set(new.load_seconds)
+    metrics.MODEL_LOADED_TIMESTAMP.set(new.loaded_at)
+
+
+model_loader.add_swap_listener(_export_model_metrics)
+
+
+def _get_active() -> model_loader.LoadedModel:
+    """Model đang active; raise 503 nếu chưa có model dùng được."""
+    try:
+        return model_loader.ensure_loaded()
+    except model_loader.ModelUnavailableError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model could not be loaded; please try again later. ({e})",
+        )
 
 
 def get_model():
     """
-    Lazy-load model.
+    Pipeline đang active (load lần đầu nếu cần); None nếu worker chỉ
+    memory-map scorer đã compile (multi-worker, xem shared_state).
     Ưu tiên:
       1) LOCAL_MODEL_PATH nếu tồn tại (deploy cloud)
       2) MLflow Registry (local docker-compose)
+    Model mới được scripts.service.model_loader hot reload ở background.
     """
-    global _model, _model_error
+    return _get_active().model
 
-    if _model is not None:
-        return _model
 
-    if _model_error is not None:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Model not available (last error: {_model_error})",
-        )
+def _predict_proba(records: List[Dict[str, Any]]) -> np.ndarray:
+    """Xác suất churn (class 1) cho list record, shape (n,)."""
+    active = _get_active()
+    metrics.SCORING_BATCH_SIZE.observe(len(records))
 
-    try:
-        # 1) ưu tiên local
-        local_model = _load_local_model_if_exists()
-        if local_model is not None:
-            _model = local_model
-            logger.info("✅ Local model loaded successfully")
-            return _model
-
-        # 2) fallback MLflow registry
-        if MLFLOW_TRACKING_URI:
-            mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
-
-        logger.info(f"Loading MLflow model from URI: {MODEL_URI}")
-        _model = mlflow.sklearn.load_model(MODEL_URI)
-        logger.info("✅ MLflow model loaded successfully")
-        return _model
+    if active.scorer is not None:
+        t0 = _perf()
+        proba = active.scorer.predict_proba_records(records)
+        _STAGE_PREDICT_PROBA.observe(_perf() - t0)
+        return proba
 
-    except Exception as e:
-        _model_error = repr(e)
-        logger.error(f"❌ Failed to load model: {_model_error}")
-        raise HTTPException(
-            status_code=503,
-            detail="Model could not be loaded; please try again later.",
-        )
+    t0 = _perf()
+    df = pd.DataFrame(records)
+    t1 = _perf()
+    proba = active.model.predict_proba(df)[:, 1]
+    _STAGE_DATAFRAME.observe(t1 - t0)
+    _STAGE_PREDICT_PROBA.observe(_perf() - t1)
+    return proba
+
+
+def _predict_proba_cached(
+    records: List[Dict[str, Any]],
+    score_fn: Callable[[List[Dict[str, Any]]], np.ndarray] = _predict_proba,
+) -> np.ndarray:
+    """
+    Giống _predict_proba nhưng đi qua prediction cache:
+    chỉ các record miss mới được score (bằng score_fn).
+    """
+    if not _cache.enabled:
+        return score_fn(records)
+
+    version = _get_active().version
+    keys = [(version, feature_key(r)) for r in records]
+    cached = _cache.get_many(keys)
+
+    miss_idx = [i for i, value in enumerate(cached) if value is None]
+    if not miss_idx:
+        return np.array(cached, dtype=np.float64)
+
+    proba = np.array(
+        [0.0 if value is None else value for value in cached], dtype=np.float64
+    )
+    miss_proba = score_fn([records[i] for i in miss_idx])
+    proba[miss_idx] = miss_proba
+    _cache.put_many([(keys[i], p) for i, p in zip(miss_idx, miss_proba.tolist())])
+    return proba
+
+
+_batcher: Optional[MicroBatcher] = (
+    MicroBatcher(
+        _predict_proba,
+        max_batch_size=MICROBATCH_MAX_SIZE,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+    )
+    if MICROBATCH_ENABLED
+    else None
+)
+
+
+def _predict_proba_microbatched(records: List[Dict[str, Any]]) -> np.ndarray:
+    futures = [_batcher.submit(r) for r in records]
+    return np.array(
+        [f.result(timeout=MICROBATCH_TIMEOUT_SECONDS) for f in futures],
+        dtype=np.float64,
+    )
+
+
+_shadow: Optional[ShadowScorer] = (
+    ShadowScorer(
+        SHADOW_MODEL_URI,
+        max_queue=SHADOW_QUEUE_SIZE,
+        max_batch_size=SHADOW_BATCH_SIZE,
+        retry_seconds=SHADOW_RETRY_SECONDS,
+    )
+    if SHADOW_MODEL_URI
+    else None
+)
+
+
+def _shadow_submit(records: List[Dict[str, Any]], proba: np.ndarray) -> None:
+    """Gửi bản sao traffic cho challenger; không bao giờ chặn response của champion."""
+    if _shadow is not None:
+        _shadow.submit(records, proba)
+
+
+def _fmt_ts(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def start_microbatcher() -> None:
+    if _batcher is not None:
+        _batcher.start()
+
+
+def shutdown_microbatcher() -> None:
+    if _batcher is not None:
+        _batcher.stop()
+
+
+def start_shadow() -> None:
+    if _shadow is not None:
+        _shadow.start()
+
+
+def shutdown_shadow() -> None:
+    if _shadow is not None:
+        _shadow.stop()
+
+
+def shutdown_executor() -> None:
+    _executor.shutdown()
 
 
 @router.get("/model_info")
 def model_info():
+    active = model_loader.current()
+    status = model_loader.status()
     return {
         "tracking_uri": MLFLOW_TRACKING_URI,
         "model_uri": MODEL_URI,
         "local_model_path": LOCAL_MODEL_PATH,
         "local_model_exists": Path(LOCAL_MODEL_PATH).exists(),
-        "model_loaded": _model is not None,
-        "last_error": _model_error,
+        "model_loaded": active is not None,
+        "model_source": active.source if active else None,
+        "active_model_uri": active.uri if active else None,
+        "model_version": active.version if active else None,
+        "registry_version": active.registry_version if active else None,
+        "load_duration_seconds": round(active.load_seconds, 3) if active else None,
+        "loaded_at": _fmt_ts(active.loaded_at) if active else None,
+        "last_swap_at": _fmt_ts(status["last_swap_at"]),
+        "last_check_at": _fmt_ts(status["last_check_at"]),
+        "swaps": status["swaps"],
+        "scoring_engine": "native" if active and active.scorer is not None else "sklearn",
+        "last_error": status["last_error"],
+        "consecutive_failures": status["consecutive_failures"],
+        "next_retry_at": _fmt_ts(status["next_retry_at"]),
+        "microbatch": (
+            {
+                "enabled": True,
+                "max_batch_size": _batcher.max_batch_size,
+                "max_wait_ms": _batcher.max_wait * 1000,
+                "queue_depth": _batcher.queue_depth(),
+            }
+            if _batcher is not None
+            else {"enabled": False}
+        ),
+        "inference_executor": {
+            "workers": _executor.max_workers,
+            "max_queue": _executor.max_queue,
+            "pending": _executor.pending,
+        },
+        "prediction_cache": {
+            "enabled": _cache.enabled,
+            "entries": len(_cache),
+            "max_entries": _cache.maxsize,
+            "ttl_seconds": _cache.ttl,
+        },
+        "shadow": _shadow.info() if _shadow is not None else {"enabled": False},
     }
 
 
-@router.post("/predict", response_model=TelcoPrediction)
-def predict(features: TelcoFeatures):
-    model = get_model()
-
-    df = pd.DataFrame([features.dict()])
-    proba = model.predict_proba(df)[:, 1]
+def _predict_single(record: Dict[str, Any], log: bool = True) -> TelcoPrediction:
+    if _batcher is not None:
+        proba = _predict_proba_cached([record], _predict_proba_microbatched)
+    else:
+        proba = _predict_proba_cached([record])
     pred = (proba >= 0.5).astype(int)
 
-    monitoring.log_prediction_for_monitoring(
-        features.dict(),
-        int(pred[0]),
-    )
+    if log:
+        t0 = _perf()
+        monitoring.log_prediction_for_monitoring(
+            record,
+            int(pred[0]),
+        )
+        _STAGE_MONITORING_LOG.observe(_perf() - t0)
+        _shadow_submit([record], proba)
 
-    return TelcoPrediction(
+    t0 = _perf()
+    response = TelcoPrediction(
         churn_probability=float(proba[0]),
         churn_predicted=int(pred[0]),
     )
+    _STAGE_SERIALIZATION.observe(_perf() - t0)
+    return response
 
 
+def _predict_records(
+    records: List[Dict[str, Any]], log: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(proba, pred) cho list record; response được build thẳng từ 2 mảng này."""
+    proba = _predict_proba_cached(records)
+    pred = (proba >= 0.5).astype(int)
+
+    if log:
+        t0 = _perf()
+        monitoring.log_predictions_for_monitoring(records, pred.tolist())
+        _STAGE_MONITORING_LOG.observe(_perf() - t0)
+        _shadow_submit(records, proba)
+
+    return proba, pred
+
+
+async def _run_inference(endpoint: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """Chạy fn trên inference executor; executor đầy -> 503 + Retry-After."""
+    try:
+        return await _executor.run(endpoint, fn, *args)
+    except ExecutorSaturatedError as e:
+        logger.warning(f"[INFER] shedding {endpoint} request: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Inference queue is full; please retry later.",
+            headers={"Retry-After": str(INFERENCE_RETRY_AFTER_SECONDS)},
+        )
+
+
+def _predict_batch_sync(request: TelcoBatchRequest, validation_seconds: float = 0.0) -> Response:
+    _get_active()
+
+    # validation = pydantic (đo ở handler) + model_dump, ghi 1 lần / request như /predict
+    t0 = _perf()
+    records = [r.model_dump() for r in request.records]
+    _STAGE_VALIDATION.observe(validation_seconds + _perf() - t0)
+    if records:
+        proba, pred = _predict_records(records)
+    else:
+        proba, pred = np.empty(0), np.empty(0, dtype=int)
+
+    # trả bytes JSON trực tiếp: FastAPI không validate/serialize lại response_model
+    t0 = _perf()
+    content = serialization.batch_response_bytes(proba, pred)
+    _STAGE_SERIALIZATION.observe(_perf() - t0)
+    return Response(content=content, media_type="application/json")
+
+
+@router.post("/predict", response_model=TelcoPrediction)
+async def predict(features: TelcoFeatures, started: float = Depends(_validation_started)):
+    record = features.model_dump()
+    _STAGE_VALIDATION.observe(_perf() - started)
+    return await _run_inference("predict", _predict_single, record)
+
+
+# response_model chỉ để giữ schema trên /docs; body được encode sẵn
 @router.post("/predict_batch", response_model=TelcoBatchResponse)
-def predict_batch(request: TelcoBatchRequest):
-    model = get_model()
+async def predict_batch(
+    request: TelcoBatchRequest, started: float = Depends(_validation_started)
+):
+    return await _run_inference(
+        "predict_batch", _predict_batch_sync, request, _perf() - started
+    )
 
-    if not request.records:
-        return TelcoBatchResponse(predictions=[])
 
-    df = pd.DataFrame([r.dict() for r in request.records])
-    proba = model.predict_proba(df)[:, 1]
-    pred = (proba >= 0.5).astype(int)
+# ================= PRELOAD + WARM-UP ===================
+def _warmup_records() -> List[Dict[str, Any]]:
+    """Record dùng để warm-up: TELCO_WARMUP_RECORDS_PATH (JSON list) hoặc mặc định."""
+    if WARMUP_RECORDS_PATH:
+        with open(WARMUP_RECORDS_PATH, encoding="utf-8") as f:
+            raw = json.load(f)
+        return [TelcoFeatures(**r).model_dump() for r in raw]
+    return [dict(r) for r in DEFAULT_WARMUP_RECORDS]
+
+
+def warm_up() -> None:
+    """
+    Chạy TELCO_WARMUP_ROUNDS vòng qua đúng code path của /predict và /predict_batch
+    (scoring, cache, micro-batcher, serialize response) nhưng không log monitoring.
+    Xong thì service được coi là ready.
+    """
+    _get_active()
+    records = _warmup_records()
+    t0 = time.perf_counter()
+
+    for _ in range(max(1, WARMUP_ROUNDS)):
+        for record in records:
+            _predict_single(record, log=False).model_dump_json()
+        serialization.batch_response_bytes(*_predict_records(records, log=False))
+
+    _ready.set()
+    logger.info(
+        "✅ Warm-up done: %d rounds x %d records in %.3fs",
+        max(1, WARMUP_ROUNDS),
+        len(records),
+        time.perf_counter() - t0,
+    )
+
+
+def preload_model() -> bool:
+    """Load model + warm-up (gọi lúc startup). Trả False nếu chưa load được."""
+    try:
+        warm_up()
+        return True
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else repr(e)
+        logger.error(f"❌ Preload failed, model watcher will retry: {detail}")
+        return False
+
+
+def is_ready() -> bool:
+    return _ready.is_set() and model_loader.current() is not None
+
+
+def _warm_up_first_model(old, new) -> None:
+    # model load lần đầu ngoài startup (preload lỗi / tắt) -> warm-up rồi mới ready
+    if old is None and not _ready.is_set():
+        try:
+            warm_up()
+        except Exception:
+            logger.exception("Warm-up failed")
 
-    preds: List[TelcoPrediction] = []
-    for record, p, y in zip(request.records, proba, pred):
-        monitoring.log_prediction_for_monitoring(record.dict(), int(y))
-        preds.append(
-            TelcoPrediction(
-                churn_probability=float(p),
-                churn_predicted=int(y),
+
+model_loader.add_swap_listener(_warm_up_first_model)
+
+
+# ================= STREAMING BATCH ===================
+_FEATURE_TYPES = {
+    name: field.annotation for name, field in TelcoFeatures.model_fields.items()
+}
+
+
+def _coerce_stream_record(obj: Any) -> Dict[str, Any]:
+    """Validate nhẹ 1 record stream (không tạo pydantic object cho từng dòng)."""
+    if not isinstance(obj, dict):
+        raise ValueError("record must be a JSON object")
+    record = {}
+    for name, typ in _FEATURE_TYPES.items():
+        value = obj.get(name)
+        if value is None:
+            raise ValueError(f"missing field '{name}'")
+        if typ is int and isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"field '{name}' must be an integer")
+        record[name] = typ(value)
+    return record
+
+
+def _iter_ndjson_chunks(body) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for raw in body:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            chunk.append(json.loads(raw))
+        except ValueError as e:
+            chunk.append(e)
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_arrow_chunks(body) -> Iterator[List[Any]]:
+    import pyarrow as pa
+
+    reader = pa.ipc.open_stream(body)
+    for batch in reader:
+        for start in range(0, batch.num_rows, STREAM_CHUNK_SIZE):
+            yield batch.slice(start, STREAM_CHUNK_SIZE).to_pylist()
+
+
+def _score_stream_chunk(items: List[Any]) -> bytes:
+    """Score 1 chunk, trả các dòng NDJSON đúng thứ tự input."""
+    out: List[Optional[str]] = [None] * len(items)
+    records: List[Dict[str, Any]] = []
+    positions: List[int] = []
+
+    for i, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise ValueError(f"invalid JSON: {item}")
+            records.append(_coerce_stream_record(item))
+            positions.append(i)
+        except (TypeError, ValueError) as e:
+            out[i] = json.dumps({"error": str(e)})
+
+    if records:
+        proba = _predict_proba_cached(records)
+        pred = (proba >= 0.5).astype(int)
+        t0 = _perf()
+        for i, row in zip(positions, serialization.prediction_rows(proba, pred)):
+            out[i] = row
+        _STAGE_SERIALIZATION.observe(_perf() - t0)
+        t0 = _perf()
+        monitoring.log_predictions_for_monitoring(records, pred.tolist())
+        _STAGE_MONITORING_LOG.observe(_perf() - t0)
+        _shadow_submit(records, proba)
+
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+async def _stream_chunks(request: Request, arrow: bool) -> AsyncIterator[List[Any]]:
+    """
+    Các chunk record của body, parse (trên thread, không chặn event loop) ngay
+    trong lúc body còn đang upload.
+    """
+    pipe = BodyPipe(STREAM_BUFFER_BYTES)
+    pump = asyncio.ensure_future(pipe.fill(request.stream()))
+    reader = io.BufferedReader(pipe)
+    chunks = _iter_arrow_chunks(reader) if arrow else _iter_ndjson_chunks(reader)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        await pump
+    finally:
+        pump.cancel()
+        pipe.close()
+
+
+async def _stream_predictions(
+    chunks: AsyncIterator[List[Any]], first: Optional[bytes]
+) -> AsyncIterator[bytes]:
+    try:
+        if first is not None:
+            yield first
+        async for chunk in chunks:
+            # stream đã được nhận -> chunk sau chờ slot executor thay vì bị từ chối
+            yield await _executor.run("predict_stream", _score_stream_chunk, chunk, wait=True)
+    finally:
+        await chunks.aclose()
+
+
+@router.post("/predict_stream")
+async def predict_stream(request: Request):
+    """
+    Batch scoring dạng stream cho upload lớn (100k+ record).
+
+    Body: NDJSON (1 TelcoFeatures / dòng) hoặc Arrow IPC stream
+    (Content-Type: application/vnd.apache.arrow.stream).
+    Response: NDJSON, mỗi dòng {"churn_probability", "churn_predicted"} theo đúng
+    thứ tự input; record không hợp lệ trả {"error": ...} tại vị trí của nó.
+    Body được parse + score từng chunk TELCO_STREAM_CHUNK_SIZE record ngay khi
+    đọc tới (kết quả đầu tiên trả về trước khi upload xong), chỉ đọc trước tối đa
+    TELCO_STREAM_BUFFER_BYTES nên RAM không phụ thuộc kích thước upload.
+    """
+    await _run_inference("predict_stream", _get_active)
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ARROW_CONTENT_TYPES:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=415,
+                detail="Arrow IPC input requires pyarrow to be installed",
             )
+    elif content_type and content_type not in NDJSON_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type '{content_type}', "
+            "use application/x-ndjson or application/vnd.apache.arrow.stream",
         )
 
-    return TelcoBatchResponse(predictions=preds)
+    chunks = _stream_chunks(request, content_type in ARROW_CONTENT_TYPES)
+    try:
+        # chunk đầu tiên đi qua admission control như /predict_batch (503 nếu executor đầy)
+        first = await _run_inference(
+            "predict_stream", _score_stream_chunk, await chunks.__anext__()
+        )
+    except StopAsyncIteration:
+        first = None
+    except BaseException:
+        await chunks.aclose()
+        raise
+
+    return DuplexStreamingResponse(
+        _stream_predictions(chunks, first),
+        media_type="application/x-ndjson",
+    )
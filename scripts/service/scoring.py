@@ -0,0 +1,214 @@
+"""
+Native NumPy scoring engine cho pipeline telco churn.
+
+Pipeline train trong scripts/train.py chỉ gồm:
+    ColumnTransformer(OneHotEncoder(handle_unknown="ignore") + passthrough)
+    -> LogisticRegression
+
+nên xác suất churn = sigmoid(intercept + sum(weight[category]) + coef · numeric).
+Module này đọc Pipeline đã train 1 lần, "compile" thành các mảng NumPy phẳng
+rồi score từng record bằng lookup + dot product, không cần DataFrame/sklearn.
+"""
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence, Union
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+
+class UnsupportedPipelineError(ValueError):
+    """Pipeline không compile được -> caller nên fallback về sklearn."""
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    # giống scipy.special.expit nhưng tránh overflow khi z rất âm
+    out = np.empty_like(z)
+    pos = z >= 0
+    out[pos] = 1.0 / (1.0 + np.exp(-z[pos]))
+    ez = np.exp(z[~pos])
+    out[~pos] = ez / (1.0 + ez)
+    return out
+
+
+def _sigmoid_scalar(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    ez = math.exp(z)
+    return ez / (1.0 + ez)
+
+
+def _is_passthrough(transformer: Any) -> bool:
+    if transformer == "passthrough":
+        return True
+    # sklearn >= 1.4 thay "passthrough" bằng FunctionTransformer(func=None) sau khi fit
+    return (
+        isinstance(transformer, FunctionTransformer)
+        and transformer.func is None
+    )
+
+
+class CompiledPipeline:
+    """
+    Dạng "phẳng" của Pipeline telco:
+      - cat_columns / categories / cat_weights: mỗi cột category có mảng
+        category (đúng thứ tự OneHotEncoder) và mảng weight tương ứng
+      - num_columns / num_coef: các cột passthrough và hệ số LR
+      - intercept: intercept của LR
+    """
+
+    def __init__(
+        self,
+        intercept: float,
+        cat_columns: List[str],
+        categories: List[np.ndarray],
+        cat_weights: List[np.ndarray],
+        num_columns: List[str],
+        num_coef: np.ndarray,
+    ):
+        self.intercept = float(intercept)
+        self.cat_columns = list(cat_columns)
+        self.categories = [np.asarray(c, dtype=object) for c in categories]
+        self.cat_weights = [np.asarray(w, dtype=np.float64) for w in cat_weights]
+        self.num_columns = list(num_columns)
+        self.num_coef = np.asarray(num_coef, dtype=np.float64)
+
+        # dict lookup: category -> weight (category lạ -> 0.0, giống handle_unknown="ignore")
+        self._lookups: List[Dict[Any, float]] = [
+            dict(zip(cats.tolist(), weights.tolist()))
+            for cats, weights in zip(self.categories, self.cat_weights)
+        ]
+        self._num_pairs = list(zip(self.num_columns, self.num_coef.tolist()))
+
+    @classmethod
+    def from_pipeline(cls, model: Pipeline) -> "CompiledPipeline":
+        if not isinstance(model, Pipeline) or len(model.steps) != 2:
+            raise UnsupportedPipelineError("expected Pipeline(preprocessor, clf)")
+
+        preprocessor = model.steps[0][1]
+        clf = model.steps[-1][1]
+
+        if not isinstance(clf, LogisticRegression):
+            raise UnsupportedPipelineError(
+                f"unsupported classifier: {type(clf).__name__}"
+            )
+        if not hasattr(clf, "coef_"):
+            raise UnsupportedPipelineError("classifier is not fitted")
+        if len(clf.classes_) != 2 or clf.coef_.shape[0] != 1:
+            raise UnsupportedPipelineError("only binary LogisticRegression is supported")
+        if not hasattr(preprocessor, "transformers_"):
+            raise UnsupportedPipelineError("preprocessor is not a fitted ColumnTransformer")
+
+        coef = clf.coef_[0]
+        cat_columns: List[str] = []
+        categories: List[np.ndarray] = []
+        cat_weights: List[np.ndarray] = []
+        num_columns: List[str] = []
+        num_coef: List[float] = []
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop":
+                continue
+            sl = preprocessor.output_indices_[name]
+            if sl.stop == sl.start:
+                continue
+            block = coef[sl]
+
+            if isinstance(transformer, OneHotEncoder):
+                if transformer.handle_unknown != "ignore":
+                    raise UnsupportedPipelineError(
+                        "OneHotEncoder must use handle_unknown='ignore'"
+                    )
+                if transformer.drop_idx_ is not None:
+                    raise UnsupportedPipelineError("OneHotEncoder(drop=...) is not supported")
+                if getattr(transformer, "_infrequent_enabled", False):
+                    raise UnsupportedPipelineError("infrequent categories are not supported")
+
+                offset = 0
+                for col, cats in zip(columns, transformer.categories_):
+                    cat_columns.append(col)
+                    categories.append(cats)
+                    cat_weights.append(block[offset:offset + len(cats)])
+                    offset += len(cats)
+            elif _is_passthrough(transformer):
+                num_columns.extend(columns)
+                num_coef.extend(block.tolist())
+            else:
+                raise UnsupportedPipelineError(
+                    f"unsupported transformer '{name}': {type(transformer).__name__}"
+                )
+
+        return cls(
+            intercept=clf.intercept_[0],
+            cat_columns=cat_columns,
+            categories=categories,
+            cat_weights=cat_weights,
+            num_columns=num_columns,
+            num_coef=np.asarray(num_coef, dtype=np.float64),
+        )
+
+    def score_one(self, record: Mapping[str, Any]) -> float:
+        """Xác suất churn cho 1 record (pure Python, không cấp phát mảng)."""
+        z = self.intercept
+        for col, lookup in zip(self.cat_columns, self._lookups):
+            z += lookup.get(record[col], 0.0)
+        for col, w in self._num_pairs:
+            z += w * float(record[col])
+        return _sigmoid_scalar(z)
+
+    def predict_proba_records(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Xác suất churn (class 1) cho list record dạng dict, shape (n,)."""
+        n = len(records)
+        if n == 1:
+            return np.array([self.score_one(records[0])], dtype=np.float64)
+
+        z = np.full(n, self.intercept, dtype=np.float64)
+        for col, lookup in zip(self.cat_columns, self._lookups):
+            z += np.fromiter(
+                (lookup.get(r[col], 0.0) for r in records), dtype=np.float64, count=n
+            )
+        for col, w in self._num_pairs:
+            z += w * np.fromiter(
+                (r[col] for r in records), dtype=np.float64, count=n
+            )
+        return _sigmoid(z)
+
+    # ------------------------------------------------------------------
+    # Lưu/đọc dạng mảng phẳng: 1 file weights.npy (cat weights nối tiếp + num coef)
+    # + meta.json. load(mmap=True) map file thay vì copy vào RAM của từng process.
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        flat = np.concatenate(self.cat_weights + [self.num_coef]).astype(np.float64)
+        np.save(path / "weights.npy", flat)
+        meta = {
+            "intercept": self.intercept,
+            "cat_columns": self.cat_columns,
+            "categories": [c.tolist() for c in self.categories],
+            "num_columns": self.num_columns,
+        }
+        (path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "CompiledPipeline":
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        flat = np.load(path / "weights.npy", mmap_mode="r" if mmap else None)
+
+        cat_weights = []
+        offset = 0
+        for cats in meta["categories"]:
+            cat_weights.append(flat[offset:offset + len(cats)])
+            offset += len(cats)
+
+        return cls(
+            intercept=meta["intercept"],
+            cat_columns=meta["cat_columns"],
+            categories=[np.array(c, dtype=object) for c in meta["categories"]],
+            cat_weights=cat_weights,
+            num_columns=meta["num_columns"],
+            num_coef=flat[offset:],
+        )
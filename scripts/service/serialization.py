@@ -0,0 +1,51 @@
+"""
+Encode JSON cho response prediction.
+
+/predict_batch build response trực tiếp từ mảng proba/pred (NumPy) thành bytes,
+không tạo TelcoPrediction cho từng dòng và không để FastAPI validate + serialize
+lại TelcoBatchResponse. Schema output giữ nguyên:
+
+    {"predictions": [{"churn_probability": float, "churn_predicted": int}, ...]}
+
+Dùng orjson nếu có cài, không thì format chuỗi (repr float của Python là
+shortest round-trip, giống json.dumps).
+"""
+from typing import Any, List
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_ROW = '{"churn_probability":%r,"churn_predicted":%d}'
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    import json
+
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def prediction_rows(proba: np.ndarray, pred: np.ndarray) -> List[str]:
+    """1 object JSON / dòng (dùng chung cho /predict_batch và /predict_stream)."""
+    return [_ROW % (p, y) for p, y in zip(proba.tolist(), pred.tolist())]
+
+
+def batch_response_bytes(proba: np.ndarray, pred: np.ndarray) -> bytes:
+    """Body JSON của TelcoBatchResponse từ proba (float) + pred (0/1)."""
+    if orjson is not None:
+        return orjson.dumps(
+            {
+                "predictions": [
+                    {"churn_probability": p, "churn_predicted": y}
+                    for p, y in zip(proba.tolist(), pred.tolist())
+                ]
+            }
+        )
+    return ('{"predictions":[' + ",".join(prediction_rows(proba, pred)) + "]}").encode(
+        "utf-8"
+    )
@@ -0,0 +1,63 @@
+"""
+Chạy API với nhiều uvicorn worker, dùng chung model + monitoring state.
+
+    python -m scripts.service.serve --workers 4
+
+- TELCO_SHARED_DIR: model đã compile được publish 1 lần rồi các worker memory-map,
+  prediction log của mọi worker gom vào 1 SQLite store (xem scripts/service/shared_state.py),
+  chỉ 1 worker chạy scheduler drift.
+- PROMETHEUS_MULTIPROC_DIR: /metrics gộp metric của mọi worker.
+
+Chạy 1 worker thì tương đương `uvicorn scripts.service.app:app`.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+
+def prepare_shared_dir(shared_dir: Path) -> None:
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    os.environ["TELCO_SHARED_DIR"] = str(shared_dir)
+
+    # Prometheus multiprocess mode: thư mục phải sạch mỗi lần start
+    prom_dir = Path(os.getenv("PROMETHEUS_MULTIPROC_DIR", str(shared_dir / "prometheus")))
+    shutil.rmtree(prom_dir, ignore_errors=True)
+    prom_dir.mkdir(parents=True, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(prom_dir)
+
+    for lock in shared_dir.glob("*.lock"):
+        lock.unlink(missing_ok=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Telco churn API (multi-worker)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("TELCO_WORKERS", str(os.cpu_count() or 1)))
+    )
+    parser.add_argument(
+        "--shared-dir",
+        default=os.getenv(
+            "TELCO_SHARED_DIR", str(Path(tempfile.gettempdir()) / "telco-shared")
+        ),
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        prepare_shared_dir(Path(args.shared_dir))
+
+    uvicorn.run(
+        "scripts.service.app:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Shadow scoring: 1 model challenger score bản sao của traffic thật ở background.
+
+Handler /predict, /predict_batch, /predict_stream chỉ submit() (records, proba
+của champion) vào 1 hàng đợi giới hạn rồi trả response ngay; hàng đợi đầy thì
+bỏ qua (đếm vào telco_shadow_dropped), không bao giờ chờ. 1 thread riêng gom
+các record thành batch, score bằng challenger và xuất lên /metrics:
+  - telco_shadow_predictions{agreement="agree|disagree"}: nhãn 2 model giống/khác
+  - telco_shadow_score_delta: challenger - champion (xác suất churn)
+  - telco_shadow_latency_seconds: thời gian score của challenger / batch
+
+Challenger = TELCO_SHADOW_MODEL_URI: registry theo stage
+(models:/telco-churn-model/Staging), theo version (models:/telco-churn-model/7)
+hoặc đường dẫn local tới MLflow model.
+"""
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import mlflow
+import mlflow.sklearn
+import numpy as np
+import pandas as pd
+
+from scripts.service import metrics, model_loader
+
+logger = logging.getLogger("telco-api")
+
+_STOP = object()
+
+
+class ShadowScorer:
+    def __init__(
+        self,
+        uri: str,
+        max_queue: int = 1000,
+        max_batch_size: int = 256,
+        retry_seconds: float = 60.0,
+    ):
+        self.uri = uri
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.retry_seconds = retry_seconds
+
+        # mỗi item = 1 lần submit (records, champion proba)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self._model = None
+        self._scorer = None
+        self.version: Optional[str] = None
+        self.registry_version: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._next_load_at = 0.0
+        self.scored = 0
+        self.agreed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None or self._scorer is not None
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="telco-shadow", daemon=True
+            )
+            self._thread.start()
+        logger.info("[SHADOW] shadow scoring started (challenger=%s)", self.uri)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        # queue có thể đang đầy: bỏ bớt để chắc chắn put được _STOP
+        while True:
+            try:
+                self._queue.put_nowait(_STOP)
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+        thread.join(timeout)
+        logger.info("[SHADOW] shadow scoring stopped.")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, records: List[Dict[str, Any]], champion_proba: np.ndarray) -> bool:
+        """Non-blocking; False nếu record bị bỏ qua vì hàng đợi đầy."""
+        if not records:
+            return True
+        if not self.running:
+            self.start()
+        try:
+            self._queue.put_nowait((records, champion_proba))
+            return True
+        except queue.Full:
+            metrics.SHADOW_DROPPED.labels(reason="queue_full").inc(len(records))
+            return False
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "challenger_uri": self.uri,
+            "challenger_loaded": self.loaded,
+            "challenger_version": self.version,
+            "challenger_registry_version": self.registry_version,
+            "queue_depth": self.queue_depth(),
+            "scored": self.scored,
+            "agreement_rate": round(self.agreed / self.scored, 4) if self.scored else None,
+            "last_error": self.last_error,
+        }
+
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        """Load challenger (ở thread shadow, không bao giờ trên request path)."""
+        uri = self.uri
+        registry_version = None
+        if not Path(uri).exists():
+            if model_loader.MLFLOW_TRACKING_URI:
+                mlflow.set_tracking_uri(model_loader.MLFLOW_TRACKING_URI)
+            name_stage = model_loader._registry_name_and_stage(uri)
+            if name_stage is not None:
+                registry_version = model_loader._registry_latest_version(uri)
+                uri = f"models:/{name_stage[0]}/{registry_version}"
+            elif uri.startswith("models:/"):
+                registry_version = uri.rstrip("/").rsplit("/", 1)[-1]
+
+        t0 = time.perf_counter()
+        model = mlflow.sklearn.load_model(uri)
+        scorer = model_loader.compile_scorer(model)
+        model_loader._warm_up(model, scorer)
+
+        self._model, self._scorer = model, scorer
+        self.version = model_loader._resolve_model_version(uri)
+        self.registry_version = registry_version
+        self.last_error = None
+        logger.info(
+            "[SHADOW] challenger loaded from %s (version=%s) in %.3fs",
+            uri,
+            self.version,
+            time.perf_counter() - t0,
+        )
+
+    def _ensure_loaded(self) -> bool:
+        if self.loaded:
+            return True
+        if time.monotonic() < self._next_load_at:
+            return False
+        try:
+            self._load()
+            return True
+        except Exception as e:
+            self.last_error = repr(e)
+            self._next_load_at = time.monotonic() + self.retry_seconds
+            logger.error(
+                f"[SHADOW] could not load challenger {self.uri}, "
+                f"retry in {self.retry_seconds:.0f}s: {e!r}"
+            )
+            return False
+
+    def _predict_proba(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        if self._scorer is not None:
+            return self._scorer.predict_proba_records(records)
+        return self._model.predict_proba(pd.DataFrame(records))[:, 1]
+
+    def _collect(self, first: Tuple[list, np.ndarray]) -> Tuple[list, bool]:
+        """Gom thêm các item đang chờ (không đợi) tới khi đủ max_batch_size record."""
+        items = [first]
+        size = len(first[0])
+        while size < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return items, True
+            items.append(item)
+            size += len(item[0])
+        return items, False
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            items, stop = self._collect(item)
+            try:
+                self._score(items)
+            except Exception as e:
+                self.last_error = repr(e)
+                metrics.SHADOW_DROPPED.labels(reason="error").inc(
+                    sum(len(r) for r, _ in items)
+                )
+                logger.exception("[SHADOW] shadow scoring failed")
+            if stop:
+                break
+
+    def _score(self, items: List[Tuple[list, np.ndarray]]) -> None:
+        records = [r for recs, _ in items for r in recs]
+        if not self._ensure_loaded():
+            metrics.SHADOW_DROPPED.labels(reason="model_unavailable").inc(len(records))
+            return
+        champion = np.concatenate([np.asarray(p, dtype=np.float64) for _, p in items])
+
+        t0 = time.perf_counter()
+        challenger = self._predict_proba(records)
+        metrics.SHADOW_LATENCY_SECONDS.observe(time.perf_counter() - t0)
+        metrics.SHADOW_BATCH_SIZE.observe(len(records))
+
+        agree = (challenger >= 0.5) == (champion >= 0.5)
+        n_agree = int(agree.sum())
+        metrics.SHADOW_PREDICTIONS.labels(agreement="agree").inc(n_agree)
+        metrics.SHADOW_PREDICTIONS.labels(agreement="disagree").inc(len(records) - n_agree)
+        for d in (challenger - champion).tolist():
+            metrics.SHADOW_SCORE_DELTA.observe(d)
+
+        self.scored += len(records)
+        self.agreed += n_agree
@@ -0,0 +1,234 @@
+"""
+State dùng chung giữa các uvicorn worker (multi-process serving, xem scripts/service/serve.py).
+
+Bật khi TELCO_SHARED_DIR được set. Trong thư mục này:
+  - compiled_models/<key>/ : CompiledPipeline (weights.npy + meta.json) được 1 worker
+    publish, các worker khác np.load(mmap_mode="r") thay vì tự load + unpickle model
+  - predictions.sqlite     : prediction log của mọi worker (WAL), drift job đọc từ đây
+  - *.lock                 : file lock (fcntl) để bầu 1 worker chạy scheduler
+"""
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from scripts.service.scoring import CompiledPipeline
+
+logger = logging.getLogger("telco-monitor")
+
+SHARED_DIR = os.getenv("TELCO_SHARED_DIR")
+ENABLED = bool(SHARED_DIR)
+
+# số dòng prediction log giữ lại trong store
+SHARED_LOG_MAX_ROWS = int(os.getenv("TELCO_SHARED_LOG_MAX_ROWS", "100000"))
+# chu kỳ flush buffer prediction của worker xuống store
+SHARED_FLUSH_SECONDS = float(os.getenv("TELCO_SHARED_FLUSH_SECONDS", "1"))
+
+LOG_COLUMNS = [
+    "Contract",
+    "tenure",
+    "MonthlyCharges",
+    "InternetService",
+    "OnlineSecurity",
+    "TechSupport",
+    "prediction",
+]
+
+
+def _dir() -> Path:
+    p = Path(SHARED_DIR)
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+# ================= FILE LOCK ===================
+@contextmanager
+def file_lock(name: str) -> Iterator[None]:
+    """Lock blocking giữa các process (vd. chỉ 1 worker load + publish model)."""
+    with open(_dir() / f"{name}.lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+_leader_locks: Dict[str, Any] = {}
+
+
+def try_become_leader(name: str) -> bool:
+    """
+    Non-blocking: True nếu process này giữ được lock `name` (giữ tới khi process chết).
+    Dùng để chỉ 1 worker chạy scheduler drift.
+    """
+    if not ENABLED:
+        return True
+    if name in _leader_locks:
+        return True
+    f = open(_dir() / f"{name}.leader.lock", "w")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    f.write(str(os.getpid()))
+    f.flush()
+    _leader_locks[name] = f
+    return True
+
+
+# ================= COMPILED MODEL ===================
+def _compiled_dir(fingerprint: str) -> Path:
+    key = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+    return _dir() / "compiled_models" / key
+
+
+def load_compiled(fingerprint: str) -> Optional[CompiledPipeline]:
+    """CompiledPipeline đã được publish cho fingerprint (memory-mapped), None nếu chưa có."""
+    path = _compiled_dir(fingerprint)
+    if not (path / "meta.json").exists():
+        return None
+    return CompiledPipeline.load(path, mmap=True)
+
+
+def publish_compiled(fingerprint: str, scorer: CompiledPipeline) -> None:
+    """Ghi atomically (tmp dir + rename) để worker khác không đọc file ghi dở."""
+    path = _compiled_dir(fingerprint)
+    if path.exists():
+        return
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    scorer.save(tmp)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    logger.info("[SHARED] published compiled model %s -> %s", fingerprint, path)
+
+
+# ================= PREDICTION LOG STORE ===================
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(str(_dir() / "predictions.sqlite"), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            pid INTEGER NOT NULL,
+            Contract TEXT,
+            tenure INTEGER,
+            MonthlyCharges REAL,
+            InternetService TEXT,
+            OnlineSecurity TEXT,
+            TechSupport TEXT,
+            prediction INTEGER
+        )
+        """
+    )
+    return conn
+
+
+class PredictionLogStore:
+    """
+    Buffer prediction trong process rồi flush hàng loạt xuống SQLite ở background
+    thread, để request thread không phải chờ I/O.
+    """
+
+    def __init__(self, flush_seconds: float = SHARED_FLUSH_SECONDS, max_rows: int = SHARED_LOG_MAX_ROWS):
+        self.flush_seconds = flush_seconds
+        self.max_rows = max_rows
+        self._buffer: List[tuple] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self.extend([entry])
+
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        now, pid = time.time(), os.getpid()
+        rows = [(now, pid, *(e.get(c) for c in LOG_COLUMNS)) for e in entries]
+        with self._lock:
+            self._buffer.extend(rows)
+        if self._thread is None:
+            self.start()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="telco-shared-log", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout=5)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("[SHARED] failed to flush prediction log")
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO predictions (ts, pid, "
+                    + ", ".join(LOG_COLUMNS)
+                    + ") VALUES (?, ?, "
+                    + ", ".join("?" for _ in LOG_COLUMNS)
+                    + ")",
+                    rows,
+                )
+                conn.execute(
+                    "DELETE FROM predictions WHERE id <= "
+                    "(SELECT MAX(id) FROM predictions) - ?",
+                    (self.max_rows,),
+                )
+        finally:
+            conn.close()
+        return len(rows)
+
+    def count(self) -> int:
+        conn = _connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        finally:
+            conn.close()
+
+    def recent(self, limit: int) -> pd.DataFrame:
+        """limit prediction mới nhất của mọi worker (cột như production_data)."""
+        conn = _connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT " + ", ".join(LOG_COLUMNS) + " FROM predictions "
+                "ORDER BY id DESC LIMIT ?",
+                conn,
+                params=(limit,),
+            ).iloc[::-1].reset_index(drop=True)
+        finally:
+            conn.close()
@@ -0,0 +1,128 @@
+"""
+KLL quantile sketch (Karnin–Lang–Liberty) dùng cho drift theo cửa sổ thời gian.
+
+- RAM cố định ~ k / (1 - c) phần tử bất kể số giá trị đã thêm
+  (k=200 -> sai số rank ~1%).
+- Mergeable: gộp sketch của nhiều bucket thời gian = nối các level rồi compact,
+  nên 1 window trượt chỉ cần merge các bucket còn trong window.
+- cdf(points): tỉ lệ giá trị < point, dùng để bin lại theo bin edges của
+  reference profile cho drift_engine (PSI / KS).
+"""
+import math
+import random
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+class KLLSketch:
+    def __init__(self, k: int = 200, c: float = 2.0 / 3.0, seed: Optional[int] = None):
+        self.k = max(8, int(k))
+        self.c = c
+        self.n = 0
+        self._rng = random.Random(seed)
+        # level h: các phần tử có trọng số 2^h
+        self._levels: List[List[float]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity_sum()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self._levels) - h - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _capacity_sum(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self._levels)))
+
+    def _grow(self) -> None:
+        self._levels.append([])
+        self._max_size = self._capacity_sum()
+
+    def update(self, value: float) -> None:
+        self.update_many([value])
+
+    def update_many(self, values: Iterable[float]) -> None:
+        if isinstance(values, (list, tuple)) and len(values) <= 16:
+            # batch nhỏ (/predict từng dòng): bỏ qua overhead của numpy
+            items = [float(v) for v in values if v is not None and v == v]
+        else:
+            arr = np.asarray(values, dtype=np.float64).ravel()
+            items = arr[~np.isnan(arr)].tolist()
+        if not items:
+            return
+        self._levels[0].extend(items)
+        self.n += len(items)
+        self._size += len(items)
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        while self._size >= self._max_size:
+            for h in range(len(self._levels)):
+                level = self._levels[h]
+                if len(level) >= self._capacity(h):
+                    if h + 1 >= len(self._levels):
+                        self._grow()
+                    level.sort()
+                    # số lẻ: giữ lại phần tử cuối ở level hiện tại
+                    keep = [level.pop()] if len(level) % 2 else []
+                    offset = self._rng.randint(0, 1)
+                    self._levels[h + 1].extend(level[offset::2])
+                    self._levels[h] = keep
+                    self._size = sum(len(lv) for lv in self._levels)
+                    if self._size < self._max_size:
+                        break
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Gộp other vào self (in-place), trả self."""
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for h, level in enumerate(other._levels):
+            self._levels[h].extend(level)
+        self.n += other.n
+        self._size = sum(len(lv) for lv in self._levels)
+        self._compress()
+        return self
+
+    def copy(self) -> "KLLSketch":
+        out = KLLSketch(self.k, self.c, seed=self._rng.random())
+        out._levels = [list(lv) for lv in self._levels]
+        out.n, out._size, out._max_size = self.n, self._size, self._max_size
+        return out
+
+    def _weighted(self):
+        items = np.concatenate([np.asarray(lv, dtype=np.float64) for lv in self._levels])
+        weights = np.concatenate(
+            [np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self._levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def cdf(self, points: Sequence[float]) -> np.ndarray:
+        """Tỉ lệ (ước lượng) giá trị < mỗi point."""
+        points = np.asarray(points, dtype=np.float64)
+        if self._size == 0:
+            return np.zeros(len(points))
+        items, cum = self._weighted()
+        idx = np.searchsorted(items, points, side="left")
+        below = np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0)
+        return below / cum[-1]
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        qs = np.asarray(qs, dtype=np.float64)
+        if self._size == 0:
+            return np.full(len(qs), np.nan)
+        items, cum = self._weighted()
+        idx = np.searchsorted(cum, qs * cum[-1], side="left")
+        return items[np.clip(idx, 0, len(items) - 1)]
+
+    def bin_counts(self, edges: Sequence[float]) -> np.ndarray:
+        """
+        Count (ước lượng, tổng = n) theo bin edges; như drift_engine.bin_counts:
+        2 bin ngoài cùng mở rộng tới ±inf.
+        """
+        inner = np.asarray(edges, dtype=np.float64)[1:-1]
+        cdf = np.concatenate([[0.0], self.cdf(inner), [1.0]])
+        return np.diff(cdf) * self.n
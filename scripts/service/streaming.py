@@ -0,0 +1,96 @@
+"""
+Đọc body của /predict_stream dần dần trong lúc đang trả kết quả.
+
+- BodyPipe: file-like (blocking) cho parser NDJSON / Arrow IPC chạy trên
+  thread, được 1 task asyncio nạp từ request.stream(). Chỉ giữ tối đa
+  `max_buffered` byte chưa đọc: parser / scoring chậm hơn upload thì ngừng
+  đọc socket (backpressure TCP) thay vì giữ cả body trong RAM hay trên disk.
+- DuplexStreamingResponse: StreamingResponse gửi response trong khi handler
+  vẫn còn đọc request body.
+"""
+import asyncio
+import io
+import threading
+from collections import deque
+from typing import AsyncIterator, Deque, Optional
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class BodyPipe(io.RawIOBase):
+    def __init__(self, max_buffered: int):
+        self.max_buffered = max(1, int(max_buffered))
+        self._chunks: Deque[bytes] = deque()
+        self._buffered = 0
+        self._eof = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        """Chạy trên thread của parser: chờ tới khi có data hoặc body kết thúc."""
+        with self._cond:
+            while not self._chunks and not self._eof:
+                self._cond.wait()
+            if not self._chunks:
+                if self._error is not None:
+                    raise self._error
+                return 0
+            data = self._chunks[0]
+            n = min(len(b), len(data))
+            b[:n] = data[:n]
+            if n == len(data):
+                self._chunks.popleft()
+            else:
+                self._chunks[0] = data[n:]
+            self._buffered -= n
+            return n
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Hết body (error != None: upload bị huỷ giữa chừng)."""
+        with self._cond:
+            if not self._eof:
+                self._eof, self._error = True, error
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        # đánh thức parser đang chờ data (vd. response bị huỷ)
+        self.finish()
+        super().close()
+
+    async def fill(self, stream: AsyncIterator[bytes]) -> None:
+        """Chạy trên event loop: nạp body vào pipe, đợi khi parser chưa đọc kịp."""
+        try:
+            async for data in stream:
+                while self._buffered >= self.max_buffered and not self._eof:
+                    await asyncio.sleep(0.005)
+                if self._eof:
+                    return
+                with self._cond:
+                    self._chunks.append(data)
+                    self._buffered += len(data)
+                    self._cond.notify_all()
+        except BaseException as e:
+            self.finish(OSError(f"request body aborted: {e!r}"))
+            raise
+        self.finish()
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse không chạy listen_for_disconnect (ASGI < 2.4): task đó
+    cũng gọi receive() nên sẽ nuốt mất các message body còn đang upload.
+    Client ngắt kết nối -> request.stream() raise ClientDisconnect / send lỗi.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
@@ -1,17 +1,29 @@
+import argparse
+import cProfile
+import io
 import os
+import pstats
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import accuracy_score, f1_score
 import mlflow
 import mlflow.sklearn
 from mlflow.tracking import MlflowClient  
 
+from scripts import data_cache
+from scripts.profiling import ResourceMeter, rss_bytes
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 
 DEFAULT_DATA_PATH = BASE_DIR / "data" / "telco_churn.csv"
@@ -33,115 +45,547 @@ FEATURE_COLS = [
     "TechSupport",
 ]
 
+CAT_COLS = ["Contract", "InternetService", "OnlineSecurity", "TechSupport"]
+NUM_COLS = ["tenure", "MonthlyCharges"]
+
+# category cố định cho OneHotEncoder: layout feature giống nhau giữa mọi version
+# (không phụ thuộc data lần train) nên hệ số model cũ dùng lại được khi update
+CATEGORIES = {
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "OnlineSecurity": ["No", "No internet service", "Yes"],
+    "TechSupport": ["No", "No internet service", "Yes"],
+}
+
 MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI")
 MODEL_NAME = "telco-churn-model"  # 👈 đặt tên model 1 chỗ
+EXPERIMENT_NAME = "telco_churn_experiment"
+PRODUCTION_MODEL_URI = f"models:/{MODEL_NAME}/Production"
+
+# incremental update: data mới đã có nhãn (CSV / Parquet, file hoặc thư mục)
+INCREMENTAL_DATA_PATH = os.getenv("TELCO_INCREMENTAL_DATA_PATH")
+INCREMENTAL_EPOCHS = int(os.getenv("TELCO_INCREMENTAL_EPOCHS", "5"))
+INCREMENTAL_ETA0 = float(os.getenv("TELCO_INCREMENTAL_ETA0", "0.01"))
+INCREMENTAL_ALPHA = float(os.getenv("TELCO_INCREMENTAL_ALPHA", "0.0001"))
 
 
 def load_data(path: Path = DATA_PATH) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    # cache Parquet có kiểu (key = md5 DVC): chỉ parse CSV lần đầu, TotalCharges đã là số
+    df = data_cache.read_table(path, FEATURE_COLS + [TARGET_COL, "TotalCharges"])
 
     df[TARGET_COL] = (df[TARGET_COL] == "Yes").astype(int)
 
-    # xử lý TotalCharges rỗng
-    df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors="coerce")
+    # bỏ dòng TotalCharges rỗng
     df = df.dropna(subset=["TotalCharges"])
 
     return df
 
 
-def build_pipeline(df: pd.DataFrame):
-    y = df[TARGET_COL]
-    # chỉ giữ đúng 6 cột feature
-    X = df[FEATURE_COLS]
-
-    cat_cols = ["Contract", "InternetService", "OnlineSecurity", "TechSupport"]
-    num_cols = ["tenure", "MonthlyCharges"]
+def load_new_data(path: Path) -> pd.DataFrame:
+    """Data mới đã có nhãn cho incremental update: 6 feature + Churn (Yes/No hoặc 0/1)."""
+    path = Path(path)
+    if path.is_dir() or path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=FEATURE_COLS + [TARGET_COL])
+    else:
+        df = pd.read_csv(path, usecols=FEATURE_COLS + [TARGET_COL])
+    df = df.dropna(subset=FEATURE_COLS + [TARGET_COL])
+    if df[TARGET_COL].dtype == object:
+        df[TARGET_COL] = (df[TARGET_COL] == "Yes").astype(int)
+    return df.reset_index(drop=True)
+
+
+def make_model(incremental: bool = False, estimator: Any = None) -> Pipeline:
+    """
+    incremental=False: OneHotEncoder + passthrough -> LogisticRegression (full retrain).
+    incremental=True: cột số được chuẩn hoá + SGDClassifier(log_loss), dùng để
+    update từ hệ số model Production (xem update_incremental).
+    estimator: classifier khác thay cho LogisticRegression (vd. khi search, xem scripts.search).
+    """
+    if estimator is not None:
+        num = "passthrough"
+        clf = estimator
+    elif incremental:
+        num = StandardScaler()
+        clf = SGDClassifier(
+            loss="log_loss",
+            alpha=INCREMENTAL_ALPHA,
+            learning_rate="constant",
+            eta0=INCREMENTAL_ETA0,
+            max_iter=INCREMENTAL_EPOCHS,
+            tol=None,
+            random_state=42,
+        )
+    else:
+        num = "passthrough"
+        clf = LogisticRegression(max_iter=500)
 
     preprocessor = ColumnTransformer(
         transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols),
-            ("num", "passthrough", num_cols),
+            (
+                "cat",
+                OneHotEncoder(
+                    categories=[CATEGORIES[c] for c in CAT_COLS], handle_unknown="ignore"
+                ),
+                CAT_COLS,
+            ),
+            ("num", num, NUM_COLS),
         ]
     )
 
-    clf = LogisticRegression(max_iter=500)
-
-    model = Pipeline(
+    return Pipeline(
         steps=[
             ("preprocessor", preprocessor),
             ("clf", clf),
         ]
     )
 
-    return X, y, model
 
+def build_pipeline(df: pd.DataFrame, incremental: bool = False, estimator: Any = None):
+    y = df[TARGET_COL]
+    # chỉ giữ đúng 6 cột feature
+    X = df[FEATURE_COLS]
 
-def train():
+    return X, y, make_model(incremental, estimator)
+
+
+# ===========================
+#  STAGE PROFILING
+# ===========================
+class StageProfiler:
+    """
+    Đo từng stage của train(): with profiler.stage("fit"): ...
+    Mỗi stage: thời gian, peak RSS trong stage (ResourceMeter) và RSS tăng thêm
+    sau stage; log lên run MLflow thành metric stage_<tên>_* + artifact JSON.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        rss_before = rss_bytes()
+        meter = ResourceMeter()
+        try:
+            with meter:
+                yield
+        finally:
+            stats = meter.stats()
+            rss_after = rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                stats["rss_delta_mb"] = round((rss_after - rss_before) / 2**20, 1)
+            self.stages[name] = stats
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "total_seconds": round(sum(s["seconds"] for s in self.stages.values()), 3),
+            "peak_memory_mb": max((s["peak_memory_mb"] for s in self.stages.values()), default=0.0),
+        }
+
+    def log_to_mlflow(self) -> None:
+        metrics = {}
+        for name, stats in self.stages.items():
+            for key, value in stats.items():
+                metrics[f"stage_{name}_{key}"] = value
+        mlflow.log_metrics(metrics)
+        mlflow.log_dict(self.summary(), "profile/stages.json")
+
+
+def _log_cprofile(profiler: cProfile.Profile, top: int = 50) -> None:
+    """Dump cProfile (.prof, mở bằng pstats / snakeviz) + bảng top hàm theo cumulative."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "train.prof"
+        profiler.dump_stats(path)
+        mlflow.log_artifact(str(path), "profile")
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+    mlflow.log_text(out.getvalue(), "profile/train_cumulative.txt")
+
+
+def train(profile: bool = False):
+    """
+    Train + log + đăng ký model, promote version mới lên Production.
+    Trả {run_id, accuracy, f1, model_version, stages} (worker retrain dùng làm kết quả job).
+    Thời gian + peak RAM từng stage (load, split, fit, evaluate, log_model,
+    registry) được log lên run; profile=True thêm dump cProfile.
+    """
     # Set tracking URI (local / Docker / Airflow)
     if MLFLOW_TRACKING_URI:
         mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
 
-    mlflow.set_experiment("telco_churn_experiment")
+    mlflow.set_experiment(EXPERIMENT_NAME)
+
+    stages = StageProfiler()
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        t0 = time.perf_counter()
+        with stages.stage("load"):
+            df = load_data()
+            X, y, model = build_pipeline(df)
+
+        with stages.stage("split"):
+            X_train, X_test, y_train, y_test = train_test_split(
+                X,
+                y,
+                test_size=0.2,
+                random_state=42,
+                stratify=y,
+            )
+
+        with mlflow.start_run():
+            with stages.stage("fit"):
+                model.fit(X_train, y_train)
+            train_seconds = time.perf_counter() - t0
+
+            with stages.stage("evaluate"):
+                y_pred = model.predict(X_test)
+                acc = accuracy_score(y_test, y_pred)
+                f1 = f1_score(y_test, y_pred)
+
+            mlflow.log_param("model_type", "LogisticRegression")
+            mlflow.log_param("mode", "full")
+            mlflow.log_metric("accuracy", acc)
+            mlflow.log_metric("f1", f1)
+            # load + split + fit, để so với incremental update
+            mlflow.log_metric("train_seconds", train_seconds)
+
+            # log model + đăng ký vào registry
+            with stages.stage("log_model"):
+                mlflow.sklearn.log_model(
+                    model,
+                    "model",
+                    registered_model_name=MODEL_NAME,
+                )
+
+            print(f"accuracy={acc:.4f}, f1={f1:.4f}")
+
+            result = {"accuracy": acc, "f1": f1, "run_id": None, "model_version": None}
+            run = mlflow.active_run()
+            if run is not None:
+                result["run_id"] = run.info.run_id
+                with stages.stage("registry"):
+                    result["model_version"] = promote_run_model(run.info.run_id, acc, f1)
+
+            if profiler is not None:
+                profiler.disable()
+                _log_cprofile(profiler)
+            stages.log_to_mlflow()
+            result["stages"] = stages.stages
+            for name, stats in stages.stages.items():
+                print(f"[train] {name}: {stats}")
+    finally:
+        # stage nào raise thì profiler vẫn phải tắt (process retrain sống lâu)
+        if profiler is not None:
+            profiler.disable()
+
+    return result
+
+
+def promote_run_model(run_id: str, acc: float, f1: float) -> Optional[str]:
+    """
+    AUTO PROMOTE TO PRODUCTION: version đăng ký từ run_id lên Production,
+    archive version cũ; trả version (None nếu run không đăng ký model).
+    """
+    version = run_model_version(run_id)
+    if version is None:
+        return None
+
+    # promote lên Production, archive version cũ
+    MlflowClient().transition_model_version_stage(
+        name=MODEL_NAME,
+        version=version,
+        stage="Production",
+        archive_existing_versions=True,
+    )
+    print(
+        f"🚀 Promoted {MODEL_NAME} v{version} to Production "
+        f"(acc={acc:.4f}, f1={f1:.4f})"
+    )
+    return version
+
+
+def run_model_version(run_id: str) -> Optional[str]:
+    """Version của MODEL_NAME đăng ký từ run_id (None nếu run không đăng ký model)."""
+    # tìm model version tương ứng với run
+    versions = MlflowClient().search_model_versions(
+        f"name = '{MODEL_NAME}' and run_id = '{run_id}'"
+    )
+    if not versions:
+        return None
+    # lấy version lớn nhất (phòng khi có nhiều)
+    return sorted(versions, key=lambda v: int(v.version))[-1].version
+
+
+# ===========================
+#  INCREMENTAL UPDATE
+# ===========================
+def _linear_weights(model: Pipeline) -> Tuple[Dict[str, float], float]:
+    """{tên feature sau preprocessor: hệ số}, intercept của model tuyến tính."""
+    names = model.named_steps["preprocessor"].get_feature_names_out()
+    clf = model.named_steps["clf"]
+    return dict(zip(names, clf.coef_[0].tolist())), float(clf.intercept_[0])
+
+
+def _num_scaling(preprocessor: ColumnTransformer) -> Dict[str, Tuple[float, float]]:
+    """{tên feature số: (mean, scale)} của StandardScaler trong preprocessor incremental."""
+    scaler = preprocessor.named_transformers_["num"]
+    return {
+        f"num__{col}": (float(m), float(sd))
+        for col, m, sd in zip(NUM_COLS, scaler.mean_, scaler.scale_)
+    }
+
+
+def to_scaled_weights(
+    base: Pipeline, preprocessor: ColumnTransformer
+) -> Tuple[np.ndarray, float]:
+    """
+    Hệ số model Production (cột số để nguyên) đổi sang không gian feature của
+    preprocessor incremental (cột số đã chuẩn hoá), cho cùng xác suất:
+        w' = w * scale,  b' = b + sum(w * mean)
+    Feature khớp theo tên nên model cũ không dùng CATEGORIES cố định vẫn dùng được.
+    """
+    weights, intercept = _linear_weights(base)
+    scaling = _num_scaling(preprocessor)
+    coef = []
+    for name in preprocessor.get_feature_names_out():
+        w = weights.get(name, 0.0)
+        if name in scaling:
+            mean, scale = scaling[name]
+            intercept += w * mean
+            w *= scale
+        coef.append(w)
+    return np.array([coef]), intercept
+
+
+def to_logistic_pipeline(updated: Pipeline, X: pd.DataFrame) -> Pipeline:
+    """
+    Đổi pipeline incremental (StandardScaler + SGD) về pipeline full
+    (passthrough + LogisticRegression) cho cùng xác suất:
+        w = w' / scale,  b = b' - sum(w' * mean / scale)
+    nên version mới vẫn compile được bằng scoring engine native khi serve.
+    """
+    weights, intercept = _linear_weights(updated)
+    scaling = _num_scaling(updated.named_steps["preprocessor"])
+
+    model = make_model()
+    preprocessor = model.named_steps["preprocessor"].fit(X)
+    coef = []
+    for name in preprocessor.get_feature_names_out():
+        w = weights.get(name, 0.0)
+        if name in scaling:
+            mean, scale = scaling[name]
+            w /= scale
+            intercept -= w * mean
+        coef.append(w)
+
+    clf = model.named_steps["clf"]
+    clf.classes_ = updated.named_steps["clf"].classes_
+    clf.coef_ = np.array([coef])
+    clf.intercept_ = np.array([intercept])
+    clf.n_features_in_ = len(coef)
+    clf.n_iter_ = np.array([updated.named_steps["clf"].n_iter_])
+    return model
+
+
+def incremental_fit(
+    base: Pipeline, X: pd.DataFrame, y: pd.Series, epochs: int = INCREMENTAL_EPOCHS
+) -> Pipeline:
+    """Bắt đầu từ hệ số của `base`, chạy `epochs` vòng SGD chỉ trên data mới (X, y)."""
+    updated = make_model(incremental=True)
+    preprocessor = updated.named_steps["preprocessor"].fit(X)
+    coef_init, intercept_init = to_scaled_weights(base, preprocessor)
+    updated.named_steps["clf"].set_params(max_iter=epochs).fit(
+        preprocessor.transform(X), y, coef_init=coef_init, intercept_init=[intercept_init]
+    )
+    return to_logistic_pipeline(updated, X)
 
+
+def last_full_retrain_seconds() -> Optional[float]:
+    """train_seconds của lần full retrain gần nhất trong experiment (baseline)."""
+    runs = mlflow.search_runs(
+        experiment_names=[EXPERIMENT_NAME],
+        filter_string="params.mode = 'full'",
+        order_by=["attributes.start_time DESC"],
+        max_results=1,
+    )
+    if runs.empty or "metrics.train_seconds" not in runs:
+        return None
+    value = runs["metrics.train_seconds"].iloc[0]
+    return None if pd.isna(value) else float(value)
+
+
+def measure_full_retrain_seconds() -> float:
+    """Đo lại full retrain (load CSV + split + fit) ngay bây giờ, không log model."""
+    t0 = time.perf_counter()
     df = load_data()
     X, y, model = build_pipeline(df)
+    X_train, _, y_train, _ = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    model.fit(X_train, y_train)
+    return time.perf_counter() - t0
+
+
+def update_incremental(
+    new_data_path: Optional[str] = None,
+    epochs: int = INCREMENTAL_EPOCHS,
+    base_model_uri: str = PRODUCTION_MODEL_URI,
+    measure_full_baseline: bool = False,
+) -> Dict[str, Any]:
+    """
+    Incremental update: lấy model Production làm điểm xuất phát, chỉ học thêm
+    trên data mới có nhãn (không đọc lại toàn bộ CSV) và đăng ký version mới.
+    Chỉ promote lên Production khi accuracy và f1 trên holdout của data mới
+    không thấp hơn model cũ; không thì version mới chỉ được đăng ký (tag
+    promotion trên run). Thời gian update được log cạnh baseline full retrain.
+    """
+    path = new_data_path or INCREMENTAL_DATA_PATH
+    if not path:
+        raise ValueError("No new data: pass new_data_path or set TELCO_INCREMENTAL_DATA_PATH")
 
+    if MLFLOW_TRACKING_URI:
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+
+    mlflow.set_experiment(EXPERIMENT_NAME)
+
+    base = mlflow.sklearn.load_model(base_model_uri)
+    base_version = None
+    if base_model_uri == PRODUCTION_MODEL_URI:
+        prod = MlflowClient().get_latest_versions(MODEL_NAME, stages=["Production"])
+        base_version = prod[0].version if prod else None
+
+    t0 = time.perf_counter()
+    df = load_new_data(Path(path))
+    X, y = df[FEATURE_COLS], df[TARGET_COL]
     X_train, X_test, y_train, y_test = train_test_split(
         X,
         y,
         test_size=0.2,
         random_state=42,
-        stratify=y,
+        stratify=y if y.value_counts().min() >= 2 else None,
     )
+    model = incremental_fit(base, X_train, y_train, epochs)
+    train_seconds = time.perf_counter() - t0
 
-    with mlflow.start_run():
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
+    full_seconds = (
+        measure_full_retrain_seconds() if measure_full_baseline else last_full_retrain_seconds()
+    )
 
+    with mlflow.start_run(run_name="incremental"):
+        y_pred = model.predict(X_test)
+        base_pred = base.predict(X_test)
         acc = accuracy_score(y_test, y_pred)
         f1 = f1_score(y_test, y_pred)
+        base_acc = accuracy_score(y_test, base_pred)
+        base_f1 = f1_score(y_test, base_pred)
+        promote = acc >= base_acc and f1 >= base_f1
 
         mlflow.log_param("model_type", "LogisticRegression")
+        mlflow.log_param("mode", "incremental")
+        mlflow.log_param("base_model_uri", base_model_uri)
+        mlflow.log_param("base_model_version", base_version)
+        mlflow.log_param("new_rows", len(df))
+        mlflow.log_param("epochs", epochs)
+        mlflow.log_param("eta0", INCREMENTAL_ETA0)
+        mlflow.log_param("alpha", INCREMENTAL_ALPHA)
+        # metric trên phần holdout của data mới, so với model cũ
         mlflow.log_metric("accuracy", acc)
         mlflow.log_metric("f1", f1)
+        mlflow.log_metric("base_accuracy", base_acc)
+        mlflow.log_metric("base_f1", base_f1)
+        mlflow.set_tag("promotion", "promoted" if promote else "rejected")
+        mlflow.log_metric("train_seconds", train_seconds)
+        if full_seconds:
+            mlflow.log_metric("full_retrain_seconds", full_seconds)
+            mlflow.log_metric("speedup_vs_full", full_seconds / max(train_seconds, 1e-9))
 
-        # log model + đăng ký vào registry
         mlflow.sklearn.log_model(
             model,
             "model",
             registered_model_name=MODEL_NAME,
         )
 
-        print(f"accuracy={acc:.4f}, f1={f1:.4f}")
-
-        # ===========================
-        #  AUTO PROMOTE TO PRODUCTION
-        # ===========================
-        run = mlflow.active_run()
-        if run is not None:
-            run_id = run.info.run_id
+        full_msg = f", full retrain {full_seconds:.2f}s" if full_seconds else ""
+        print(
+            f"accuracy={acc:.4f}, f1={f1:.4f} "
+            f"(incremental on {len(df)} rows in {train_seconds:.2f}s{full_msg})"
+        )
 
-            client = MlflowClient()
-            # tìm model version tương ứng với run hiện tại
-            versions = client.search_model_versions(
-                f"name = '{MODEL_NAME}' and run_id = '{run_id}'"
+        run_id = mlflow.active_run().info.run_id
+        if promote:
+            version = promote_run_model(run_id, acc, f1)
+        else:
+            version = run_model_version(run_id)
+            print(
+                f"⚠️ Not promoting {MODEL_NAME} v{version}: worse than base on new-data holdout "
+                f"(acc={acc:.4f} vs {base_acc:.4f}, f1={f1:.4f} vs {base_f1:.4f})"
             )
-            if versions:
-                # lấy version lớn nhất (phòng khi có nhiều)
-                new_mv = sorted(versions, key=lambda v: int(v.version))[-1]
-
-                # promote lên Production, archive version cũ
-                client.transition_model_version_stage(
-                    name=MODEL_NAME,
-                    version=new_mv.version,
-                    stage="Production",
-                    archive_existing_versions=True,
-                )
-                print(
-                    f"🚀 Promoted {MODEL_NAME} v{new_mv.version} to Production "
-                    f"(acc={acc:.4f}, f1={f1:.4f})"
-                )
+        return {
+            "mode": "incremental",
+            "accuracy": acc,
+            "f1": f1,
+            "base_accuracy": base_acc,
+            "base_f1": base_f1,
+            "run_id": run_id,
+            "base_model_version": base_version,
+            "model_version": version,
+            "promoted": promote,
+            "new_rows": len(df),
+            "update_seconds": round(train_seconds, 3),
+            "full_retrain_seconds": full_seconds,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train telco churn model")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="update model Production bằng data mới thay vì train lại từ đầu",
+    )
+    parser.add_argument("--new-data", default=INCREMENTAL_DATA_PATH)
+    parser.add_argument("--epochs", type=int, default=INCREMENTAL_EPOCHS)
+    parser.add_argument(
+        "--measure-full-baseline",
+        action="store_true",
+        help="đo lại full retrain để so thời gian (mặc định lấy từ run full gần nhất)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="chạy train dưới cProfile, log file .prof + bảng cumulative lên run MLflow",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="search hyperparameter song song (successive halving, xem scripts.search)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cpu-budget", type=float, default=None, help="tổng CPU giây cho các trial")
+    parser.add_argument("--time-limit", type=float, default=None, help="giới hạn wall clock (giây)")
+    args = parser.parse_args()
+
+    if args.search:
+        # import muộn: process pool + không gian search chỉ cần khi search
+        from scripts import search
+
+        options = {
+            "workers": args.workers,
+            "cpu_budget": args.cpu_budget,
+            "time_limit": args.time_limit,
+        }
+        search.run_search(**{k: v for k, v in options.items() if v is not None})
+    elif args.incremental:
+        update_incremental(
+            args.new_data, args.epochs, measure_full_baseline=args.measure_full_baseline
+        )
+    else:
+        train(profile=args.profile)
 
 
 if __name__ == "__main__":
-    train()
+    main()
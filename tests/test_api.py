@@ -1,4 +1,7 @@
+import asyncio
 import os
+from types import SimpleNamespace
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -8,13 +11,20 @@ os.environ.setdefault("MLFLOW_TRACKING_URI", "http://127.0.0.1:5050")
 
 
 @pytest.fixture(scope="session")
-def client():
+def client(tmp_path_factory):
     """
     Dùng context manager để FastAPI chạy startup event (load_model)
-    trước khi chạy test.
+    trước khi chạy test. Prediction log + index report ghi vào thư mục tạm của test.
     """
-    with TestClient(app) as c:
-        yield c
+    from scripts.service import monitoring
+
+    state = tmp_path_factory.mktemp("state")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(monitoring.report_index, "path", state / "report_index.sqlite")
+        if monitoring._prediction_log is not None:
+            mp.setattr(monitoring._prediction_log, "directory", state / "prediction_log")
+        with TestClient(app) as c:
+            yield c
 
 
 def test_health(client):
@@ -118,3 +128,280 @@ def test_predict_batch(client):
         assert "churn_predicted" in p
         assert 0.0 <= p["churn_probability"] <= 1.0
         assert p["churn_predicted"] in (0, 1)
+
+
+def test_predict_stream_ndjson(client):
+    import json
+
+    records = [
+        {
+            "Contract": "Month-to-month",
+            "tenure": i,
+            "MonthlyCharges": 70.0 + i,
+            "InternetService": "Fiber optic",
+            "OnlineSecurity": "No",
+            "TechSupport": "No",
+        }
+        for i in range(25)
+    ]
+    lines = [json.dumps(r) for r in records]
+    lines.insert(3, '{"Contract": "Two year"}')  # record thiếu field
+
+    resp = client.post(
+        "/predict_stream",
+        content="\n".join(lines).encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+
+    out = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(out) == 26
+    assert "error" in out[3]
+
+    batch = client.post("/predict_batch", json={"records": records}).json()
+    scored = [o for i, o in enumerate(out) if i != 3]
+    for got, expected in zip(scored, batch["predictions"]):
+        assert abs(got["churn_probability"] - expected["churn_probability"]) < 1e-9
+        assert got["churn_predicted"] == expected["churn_predicted"]
+
+
+def test_predict_stream_arrow(client):
+    pa = pytest.importorskip("pyarrow")
+
+    table = pa.table(
+        {
+            "Contract": ["Two year", "Month-to-month"],
+            "tenure": [30, 2],
+            "MonthlyCharges": [55.0, 95.0],
+            "InternetService": ["DSL", "Fiber optic"],
+            "OnlineSecurity": ["Yes", "No"],
+            "TechSupport": ["Yes", "No"],
+        }
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    resp = client.post(
+        "/predict_stream",
+        content=sink.getvalue().to_pybytes(),
+        headers={"Content-Type": "application/vnd.apache.arrow.stream"},
+    )
+    assert resp.status_code == 200
+    lines = resp.text.splitlines()
+    assert len(lines) == 2
+
+
+def test_predict_stream_answers_before_upload_finishes(client, monkeypatch):
+    import json
+
+    from scripts.service.router import telco
+
+    monkeypatch.setattr(telco, "STREAM_CHUNK_SIZE", 2)
+    record = json.dumps(
+        {
+            "Contract": "Month-to-month",
+            "tenure": 3,
+            "MonthlyCharges": 80.0,
+            "InternetService": "Fiber optic",
+            "OnlineSecurity": "No",
+            "TechSupport": "No",
+        }
+    ).encode()
+
+    async def scenario():
+        first_output = asyncio.Event()
+        done = asyncio.Event()
+        body = []
+        parts = [record + b"\n" + record + b"\n", record + b"\n"]
+
+        async def receive():
+            if not parts:
+                await done.wait()
+                return {"type": "http.disconnect"}
+            if len(parts) == 1:
+                # phần cuối của upload chỉ được gửi sau khi đã nhận kết quả đầu tiên
+                await asyncio.wait_for(first_output.wait(), 10)
+            return {"type": "http.request", "body": parts.pop(0), "more_body": bool(parts)}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+                if body[-1]:
+                    first_output.set()
+                if not message.get("more_body"):
+                    done.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/predict_stream",
+            "raw_path": b"/predict_stream",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", b"application/x-ndjson")],
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+        return b"".join(body)
+
+    lines = asyncio.run(scenario()).decode().splitlines()
+    assert len(lines) == 3
+    assert all("churn_probability" in json.loads(line) for line in lines)
+
+
+def test_ready_when_model_loaded_and_warmed_up(client, monkeypatch):
+    import threading
+
+    from scripts.service import model_loader
+    from scripts.service.router import telco
+
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(telco, "_ready", ready)
+    monkeypatch.setattr(model_loader, "current", lambda: SimpleNamespace(version="7"))
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ready", "model_version": "7"}
+
+
+def test_not_ready_without_model(client, monkeypatch):
+    import threading
+
+    from scripts.service import model_loader
+    from scripts.service.router import telco
+
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(telco, "_ready", ready)
+    monkeypatch.setattr(model_loader, "current", lambda: None)
+    assert client.get("/ready").status_code == 503
+
+    # có model nhưng warm-up chưa xong
+    monkeypatch.setattr(telco, "_ready", threading.Event())
+    monkeypatch.setattr(model_loader, "current", lambda: SimpleNamespace(version="7"))
+    assert client.get("/ready").status_code == 503
+
+
+def test_metrics_exposes_inference_stages_and_model(client):
+    payload = {
+        "Contract": "One year",
+        "tenure": 12,
+        "MonthlyCharges": 55.0,
+        "InternetService": "DSL",
+        "OnlineSecurity": "Yes",
+        "TechSupport": "No",
+    }
+    assert client.post("/predict", json=payload).status_code == 200
+
+    body = client.get("/metrics").text
+    for stage in ("validation", "predict_proba", "monitoring_log", "serialization"):
+        assert f'telco_inference_stage_seconds_count{{stage="{stage}"}}' in body
+    assert "telco_scoring_batch_size_count" in body
+    assert "telco_model_info{" in body
+    assert "telco_predicted_churn_rate" in body
+
+
+def test_predict_batch_records_validation_stage_once(client):
+    from prometheus_client import REGISTRY
+
+    def count(stage):
+        return REGISTRY.get_sample_value(
+            "telco_inference_stage_seconds_count", {"stage": stage}
+        ) or 0
+
+    record = {
+        "Contract": "Two year",
+        "tenure": 40,
+        "MonthlyCharges": 60.0,
+        "InternetService": "DSL",
+        "OnlineSecurity": "Yes",
+        "TechSupport": "Yes",
+    }
+    before = count("validation"), count("serialization")
+    resp = client.post("/predict_batch", json={"records": [record, record]})
+    assert resp.status_code == 200
+    assert (count("validation"), count("serialization")) == (before[0] + 1, before[1] + 1)
+
+
+def test_monitor_status_reports_current_drift(client):
+    resp = client.get("/monitor/status")
+    assert resp.status_code == 200
+    drift = resp.json()["current_drift"]
+    assert drift["data_points"] == resp.json()["current_data_points"]
+    assert set(drift["numeric"]) == {"tenure", "MonthlyCharges"}
+    assert drift["mean_shift_score"] >= 0.0
+    assert isinstance(drift["drift_detected"], bool)
+    windows = resp.json()["windows"]
+    assert set(windows) == {"5m", "1h", "24h"}
+    assert windows["24h"]["data_points"] >= windows["5m"]["data_points"]
+
+
+def test_trigger_now_returns_job_id(client, monkeypatch):
+    from scripts.service import monitoring
+
+    monkeypatch.setattr(
+        monitoring,
+        "generate_drift_report_background",
+        lambda raise_errors=False: {"report": "drift_report_test.html"},
+    )
+    resp = client.post("/monitor/trigger_now")
+    assert resp.status_code == 200
+    job_id = resp.json()["job_id"]
+    assert monitoring.report_jobs.get(job_id).done.wait(5)
+
+    job = client.get(f"/monitor/jobs/{job_id}").json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["report_url"].endswith("/reports/drift_report_test.html")
+    assert job["duration_seconds"] is not None
+
+    assert client.get("/monitor/jobs/does-not-exist").status_code == 404
+
+
+def test_monitor_status_does_not_overwrite_drift_gauges(client):
+    from prometheus_client import REGISTRY
+
+    from scripts.service import metrics, monitoring
+
+    metrics.DRIFT_SHARE.set(-1)
+    assert not asyncio.iscoroutinefunction(monitoring.monitor_status)
+    assert client.get("/monitor/status").status_code == 200
+    assert REGISTRY.get_sample_value("telco_drift_share") == -1
+
+
+def test_monitor_status_on_non_leader_worker(client, monkeypatch):
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    from scripts.service import monitoring
+
+    # worker không giữ leader lock: scheduler có job nhưng không bao giờ start
+    idle = BackgroundScheduler()
+    idle.add_job(lambda: None, "interval", seconds=300, id="drift_detection")
+    monkeypatch.setattr(monitoring, "scheduler", idle)
+
+    resp = client.get("/monitor/status")
+    assert resp.status_code == 200
+    assert resp.json()["next_scheduled_run"] is None
+
+
+def test_monitor_status_paginates_report_index(client):
+    resp = client.get("/monitor/status", params={"limit": 2, "offset": 0})
+    assert resp.status_code == 200
+    page = resp.json()["reports_page"]
+    assert page["limit"] == 2 and page["offset"] == 0
+    assert len(resp.json()["recent_reports"]) <= 2
+    assert client.get("/monitor/status", params={"limit": 0}).status_code == 422
+
+
+def test_retrain_status(client):
+    resp = client.get("/monitor/retrain/status")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["worker"]["target"] == "scripts.train:train"
+    assert data["queue_length"] == 0
+    assert isinstance(data["recent_jobs"], list)
+    assert client.get("/monitor/retrain/jobs/unknown").status_code == 404
@@ -0,0 +1,43 @@
+import threading
+
+import numpy as np
+import pytest
+
+from scripts.service.batching import MicroBatcher
+
+
+def test_concurrent_requests_are_batched():
+    batch_sizes = []
+    gate = threading.Event()
+
+    def score(records):
+        gate.wait(timeout=5)
+        batch_sizes.append(len(records))
+        return np.array([r["x"] * 0.1 for r in records])
+
+    batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=20)
+    try:
+        first = batcher.submit({"x": 0})
+        futures = [batcher.submit({"x": i}) for i in range(1, 6)]
+        gate.set()
+
+        assert first.result(timeout=5) == pytest.approx(0.0)
+        # mỗi caller nhận đúng kết quả của record mình
+        for i, fut in enumerate(futures, start=1):
+            assert fut.result(timeout=5) == pytest.approx(i * 0.1)
+        assert sum(batch_sizes) == 6
+        assert max(batch_sizes) > 1
+    finally:
+        batcher.stop()
+
+
+def test_score_error_is_propagated():
+    def score(records):
+        raise RuntimeError("model not loaded")
+
+    batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.submit({"x": 1}).result(timeout=5)
+    finally:
+        batcher.stop()
@@ -0,0 +1,40 @@
+import time
+
+from scripts.service.cache import PredictionCache, feature_key
+
+RECORD = {
+    "Contract": "Month-to-month",
+    "tenure": 5,
+    "MonthlyCharges": 80,
+    "InternetService": "Fiber optic",
+    "OnlineSecurity": "No",
+    "TechSupport": "No",
+}
+
+
+def test_feature_key_is_normalized():
+    assert feature_key(RECORD) == feature_key({**RECORD, "MonthlyCharges": 80.0})
+    assert feature_key(RECORD) != feature_key({**RECORD, "tenure": 6})
+
+
+def test_model_version_is_part_of_key():
+    cache = PredictionCache(maxsize=10, ttl_seconds=60)
+    cache.put_many([(("v1", feature_key(RECORD)), 0.7)])
+
+    assert cache.get_many([("v1", feature_key(RECORD))]) == [0.7]
+    assert cache.get_many([("v2", feature_key(RECORD))]) == [None]
+
+
+def test_lru_eviction_and_ttl():
+    cache = PredictionCache(maxsize=2, ttl_seconds=60)
+    cache.put_many([("a", 0.1), ("b", 0.2)])
+    cache.get_many(["a"])  # "a" mới dùng -> "b" bị đẩy ra trước
+    cache.put_many([("c", 0.3)])
+
+    assert cache.get_many(["a", "b", "c"]) == [0.1, None, 0.3]
+
+    short = PredictionCache(maxsize=2, ttl_seconds=0.01)
+    short.put_many([("a", 0.1)])
+    time.sleep(0.02)
+    assert short.get_many(["a"]) == [None]
+    assert len(short) == 0
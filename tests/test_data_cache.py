@@ -0,0 +1,78 @@
+import hashlib
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from scripts import data_cache
+
+
+@pytest.fixture
+def telco_csv(tmp_path):
+    path = tmp_path / "telco_churn.csv"
+    pd.DataFrame(
+        {
+            "customerID": ["a", "b", "c", "d"],
+            "Contract": ["Month-to-month", "One year", "Two year", "Month-to-month"],
+            "tenure": [1, 12, 40, 3],
+            "MonthlyCharges": [70.5, 20.0, 60.0, 99.9],
+            "TotalCharges": ["70.5", " ", "2400", "299.7"],
+            "Churn": ["Yes", "No", "No", "Yes"],
+        }
+    ).to_csv(path, index=False)
+    write_dvc(path, hashlib.md5(path.read_bytes()).hexdigest())
+    return path
+
+
+def write_dvc(path, md5):
+    path.with_name(path.name + ".dvc").write_text(
+        f"outs:\n- md5: {md5}\n  size: 1\n  hash: md5\n  path: {path.name}\n"
+    )
+
+
+def test_cache_is_typed_pruned_and_keyed_by_dvc_md5(telco_csv):
+    df = data_cache.read_table(telco_csv, ["Contract", "tenure", "TotalCharges", "Churn"])
+
+    cached = data_cache.cache_path(telco_csv, data_cache.dvc_md5(telco_csv))
+    assert cached.exists()
+    assert str(df["Contract"].dtype) == "category"
+    assert df["tenure"].dtype == "int64"
+    assert df["TotalCharges"].isna().tolist() == [False, True, False, False]
+    assert "customerID" not in pq.read_schema(cached).names
+
+    # CSV không còn (chưa dvc pull): vẫn đọc được từ cache đúng md5
+    telco_csv.unlink()
+    again = data_cache.read_table(telco_csv, ["Contract", "tenure", "TotalCharges", "Churn"])
+    pd.testing.assert_frame_equal(again, df)
+    assert "Churn" in data_cache.column_names(telco_csv)
+
+
+def test_columns_outside_cache_fall_back_to_csv(telco_csv):
+    df = data_cache.read_table(telco_csv, ["customerID", "tenure"])
+    assert df["customerID"].tolist() == ["a", "b", "c", "d"]
+
+    telco_csv.unlink()
+    with pytest.raises(FileNotFoundError):
+        data_cache.read_table(telco_csv, ["customerID"])
+
+
+def test_new_md5_builds_new_cache(telco_csv):
+    first = data_cache.ensure_cache(telco_csv)
+    write_dvc(telco_csv, "0123abcd")
+    second = data_cache.ensure_cache(telco_csv)
+    assert first == second
+    assert data_cache.dvc_md5(telco_csv) != data_cache.data_hash(telco_csv)
+
+
+def test_edited_csv_does_not_serve_stale_cache(telco_csv):
+    first = data_cache.read_table(telco_csv, ["tenure"])
+    assert data_cache.data_hash(telco_csv) == data_cache.dvc_md5(telco_csv)
+
+    # sửa CSV nhưng chưa `dvc add` (dvc status -> modified): .dvc vẫn giữ md5 cũ
+    df = pd.read_csv(telco_csv)
+    df["tenure"] = df["tenure"] + 100
+    df.to_csv(telco_csv, index=False)
+
+    second = data_cache.read_table(telco_csv, ["tenure"])
+    assert second["tenure"].tolist() == (first["tenure"] + 100).tolist()
+    assert data_cache.data_hash(telco_csv) != data_cache.dvc_md5(telco_csv)
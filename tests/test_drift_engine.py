@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.service import drift_engine
+from scripts.service.reference_profile import build_profile
+
+CONTRACTS = ["Month-to-month", "One year", "Two year"]
+
+
+@pytest.fixture(scope="module")
+def profile():
+    rng = np.random.default_rng(0)
+    n = 7000
+    df = pd.DataFrame(
+        {
+            "tenure": rng.integers(0, 73, n),
+            "MonthlyCharges": rng.normal(65, 30, n).clip(18, 120),
+            "Contract": rng.choice(CONTRACTS, n, p=[0.55, 0.21, 0.24]),
+        }
+    )
+    return build_profile(df, ["tenure", "MonthlyCharges"], ["Contract"])
+
+
+def _window(rng, n, charges_mean=65.0, contract_p=(0.55, 0.21, 0.24)):
+    numeric = {
+        "tenure": rng.integers(0, 73, n),
+        "MonthlyCharges": rng.normal(charges_mean, 30, n).clip(18, 120),
+    }
+    contracts = rng.choice(CONTRACTS, n, p=contract_p)
+    names, counts = np.unique(contracts, return_counts=True)
+    return numeric, {"Contract": dict(zip(names.tolist(), counts.tolist()))}
+
+
+def test_same_distribution_is_not_drift(profile):
+    numeric, cats = _window(np.random.default_rng(1), 5000)
+    result = drift_engine.evaluate(profile, numeric, cats)
+    assert result["drift_detected"] is False
+    assert set(result["features"]) == {"tenure", "MonthlyCharges", "Contract"}
+    assert result["features"]["MonthlyCharges"]["psi"] < 0.05
+
+
+def test_numeric_and_categorical_shift_is_detected(profile):
+    numeric, cats = _window(
+        np.random.default_rng(2), 5000, charges_mean=95.0, contract_p=(0.9, 0.05, 0.05)
+    )
+    result = drift_engine.evaluate(profile, numeric, cats)
+    assert result["drift_detected"] is True
+    assert set(result["drifted_features"]) == {"MonthlyCharges", "Contract"}
+    assert result["features"]["MonthlyCharges"]["psi"] >= drift_engine.PSI_THRESHOLD
+    assert result["features"]["Contract"]["chi2_pvalue"] < 1e-6
+
+
+def test_small_window_needs_significance(profile):
+    # 3 điểm lệch khỏi reference: JS lớn nhưng chưa đủ bằng chứng thống kê
+    numeric, cats = _window(np.random.default_rng(3), 12)
+    cats = {"Contract": {"Two year": 2, "One year": 1}}
+    result = drift_engine.evaluate(profile, numeric, cats)
+    assert result["features"]["Contract"]["js_distance"] >= drift_engine.JS_THRESHOLD
+    assert result["features"]["Contract"]["drifted"] is False
+
+
+def test_unseen_category_and_out_of_range_values(profile):
+    result = drift_engine.categorical_drift(
+        profile["category_counts"]["Contract"], {"Three year": 50, "One year": 50}
+    )
+    assert result["unseen_categories"] == ["Three year"]
+    assert result["drifted"] is True
+
+    counts = drift_engine.bin_counts(
+        np.array([-5.0, 1000.0]), profile["numeric"]["MonthlyCharges"]["histogram"]["edges"]
+    )
+    assert counts[0] == 1 and counts[-1] == 1 and counts.sum() == 2
+
+
+def test_no_reference_profile():
+    result = drift_engine.evaluate(None, {"tenure": np.arange(100)}, {})
+    assert result == {
+        "reference_available": False,
+        "drift_detected": False,
+        "drift_share": 0.0,
+        "drifted_features": [],
+        "features": {},
+    }
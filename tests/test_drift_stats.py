@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.service.drift_stats import WindowStats, frame_summary
+from scripts.service.ring_buffer import ColumnarRingBuffer
+
+CONTRACTS = ["Month-to-month", "One year", "Two year"]
+
+
+def _buffer(capacity):
+    stats = WindowStats(numeric=["tenure", "MonthlyCharges"], categorical=["Contract"])
+    buf = ColumnarRingBuffer(
+        capacity,
+        numeric={"tenure": np.int64, "MonthlyCharges": np.float64},
+        categorical=["Contract"],
+        stats=stats,
+    )
+    return buf, stats
+
+
+def test_running_stats_match_window_after_wraps():
+    rng = np.random.default_rng(0)
+    buf, stats = _buffer(50)
+
+    for step in range(40):
+        n = int(rng.integers(1, 30))
+        buf.extend_columns(
+            {
+                "tenure": rng.integers(0, 72, n),
+                "MonthlyCharges": rng.normal(60 + step, 20, n),
+                "Contract": [CONTRACTS[i] for i in rng.integers(0, 3, n)],
+            }
+        )
+
+        df = buf.snapshot().frame(["Contract", "tenure", "MonthlyCharges"])
+        expected = frame_summary(df, ["tenure", "MonthlyCharges"], ["Contract"])
+        got = buf.stats_summary()
+        assert got["count"] == len(df) == stats.count
+        for col in ("tenure", "MonthlyCharges"):
+            assert got["numeric"][col]["mean"] == pytest.approx(expected["numeric"][col]["mean"])
+            assert got["numeric"][col]["std"] == pytest.approx(expected["numeric"][col]["std"])
+        assert got["categories"]["Contract"] == pytest.approx(expected["categories"]["Contract"])
+
+
+def test_batch_larger_than_window_resets_stats():
+    buf, stats = _buffer(3)
+    buf.extend_columns({"tenure": [1, 2], "MonthlyCharges": [1.0, 2.0], "Contract": ["a", "b"]})
+    buf.extend_columns(
+        {"tenure": [10, 20, 30, 40, 50], "MonthlyCharges": [0.0] * 5, "Contract": ["c"] * 5}
+    )
+    assert stats.count == 3
+    assert stats.mean("tenure") == pytest.approx(40.0)
+    assert buf.stats_summary()["categories"]["Contract"] == {"c": 1.0}
+
+
+def test_frame_summary_on_empty_frame():
+    df = pd.DataFrame({"tenure": [], "Contract": []})
+    summary = frame_summary(df, ["tenure"], ["Contract"])
+    assert summary["count"] == 0
+    assert np.isnan(summary["numeric"]["tenure"]["mean"])
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.service.drift_windows import MultiWindowMonitor, parse_windows
+from scripts.service.ring_buffer import MAX_CATEGORIES, OTHER_CATEGORY
+from scripts.service.reference_profile import build_profile
+from scripts.service.sketches import KLLSketch
+
+CONTRACTS = ["Month-to-month", "One year", "Two year"]
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _columns(rng, n, charges_mean=65.0):
+    return {
+        "tenure": rng.integers(0, 73, n).tolist(),
+        "MonthlyCharges": rng.normal(charges_mean, 30, n).clip(18, 120).tolist(),
+        "Contract": rng.choice(CONTRACTS, n, p=[0.55, 0.21, 0.24]).tolist(),
+        "prediction": rng.integers(0, 2, n).tolist(),
+    }
+
+
+@pytest.fixture(scope="module")
+def profile():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(_columns(rng, 7000))
+    return build_profile(df, ["tenure", "MonthlyCharges"], ["Contract"])
+
+
+def test_kll_quantiles_and_merge_are_accurate():
+    rng = np.random.default_rng(1)
+    x = rng.normal(0, 1, 100_000)
+    a, b = KLLSketch(200, seed=1), KLLSketch(200, seed=2)
+    a.update_many(x[:50_000])
+    b.update_many(x[50_000:])
+    a.merge(b)
+
+    assert a.n == len(x)
+    assert len(sum(a._levels, [])) < 1000  # RAM cố định, không phụ thuộc n
+    qs = [0.05, 0.25, 0.5, 0.75, 0.95]
+    est = a.quantiles(qs)
+    # sai số rank ~1%
+    ranks = np.searchsorted(np.sort(x), est) / len(x)
+    assert np.max(np.abs(ranks - qs)) < 0.02
+    assert a.bin_counts([-10, -1, 0, 1, 10]).sum() == pytest.approx(len(x))
+
+
+def test_parse_windows():
+    assert parse_windows("5m, 1h,24h") == {"5m": 300.0, "1h": 3600.0, "24h": 86400.0}
+    with pytest.raises(ValueError):
+        parse_windows("5 minutes")
+
+
+def test_windows_expire_old_buckets(profile):
+    clock = FakeClock()
+    monitor = MultiWindowMonitor(
+        {"5m": 300, "1h": 3600}, ["tenure", "MonthlyCharges"], ["Contract"], clock=clock
+    )
+    rng = np.random.default_rng(2)
+    monitor.add(_columns(rng, 200))
+    clock.now += 600  # ra khỏi 5m, vẫn trong 1h
+    monitor.add(_columns(rng, 50))
+
+    result = monitor.evaluate(profile)
+    assert result["5m"]["data_points"] == 50
+    assert result["1h"]["data_points"] == 250
+    assert 0.0 <= result["1h"]["prediction_rate"] <= 1.0
+
+    clock.now += 3600
+    result = monitor.evaluate(profile)
+    assert result["1h"]["data_points"] == 0
+    assert result["1h"]["drift_detected"] is False
+
+
+def test_short_window_detects_recent_shift(profile):
+    clock = FakeClock()
+    monitor = MultiWindowMonitor(
+        {"5m": 300, "24h": 86400}, ["tenure", "MonthlyCharges"], ["Contract"], clock=clock
+    )
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        monitor.add(_columns(rng, 500))
+        clock.now += 3600
+    monitor.add(_columns(rng, 500, charges_mean=105.0))
+
+    result = monitor.evaluate(profile)
+    assert "MonthlyCharges" in result["5m"]["drifted_features"]
+    assert result["5m"]["drift_detected"] is True
+    assert result["24h"]["features"]["MonthlyCharges"]["psi"] < result["5m"]["features"][
+        "MonthlyCharges"
+    ]["psi"]
+
+
+def test_window_category_counts_are_capped():
+    monitor = MultiWindowMonitor({"5m": 300}, ["tenure"], ["Contract"], clock=FakeClock())
+    for start in range(0, 1000, 100):
+        monitor.add(
+            {
+                "tenure": list(range(100)),
+                "Contract": [f"junk-{i}" for i in range(start, start + 100)],
+                "prediction": [0] * 100,
+            }
+        )
+
+    counts = monitor.windows[0].merged().categories["Contract"]
+    assert len(counts) <= MAX_CATEGORIES + 1
+    assert sum(counts.values()) == 1000
+    assert counts[OTHER_CATEGORY] == 1000 - MAX_CATEGORIES
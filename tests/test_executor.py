@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+
+from scripts.service.executor import ExecutorSaturatedError, InferenceExecutor
+
+
+def test_full_queue_is_rejected_then_recovers():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    gate = threading.Event()
+    try:
+        running = executor.submit("predict", gate.wait, 5)
+        queued = executor.submit("predict", lambda: "queued")
+        assert executor.pending == 2
+
+        with pytest.raises(ExecutorSaturatedError):
+            executor.submit("predict", lambda: "rejected")
+
+        gate.set()
+        assert running.result(timeout=5) is True
+        assert queued.result(timeout=5) == "queued"
+        assert executor.submit("predict", lambda: "ok").result(timeout=5) == "ok"
+        assert executor.pending == 0
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+def test_run_after_shutdown_recreates_pool():
+    executor = InferenceExecutor(max_workers=2, max_queue=0)
+    assert asyncio.run(executor.run("predict", sum, [1, 2])) == 3
+    executor.shutdown()
+    assert asyncio.run(executor.run("predict", sum, [3, 4])) == 7
+    executor.shutdown()
+
+
+def test_waiting_for_a_slot_is_not_counted_as_rejection():
+    from prometheus_client import REGISTRY
+
+    def rejected():
+        return REGISTRY.get_sample_value(
+            "telco_inference_rejected_total", {"endpoint": "predict_stream"}
+        ) or 0
+
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    gate = threading.Event()
+    before = rejected()
+
+    async def scenario():
+        blocker = executor.submit("predict_stream", gate.wait, 5)
+        waiter = asyncio.ensure_future(
+            executor.run("predict_stream", lambda: "next chunk", wait=True)
+        )
+        await asyncio.sleep(0.1)  # ~20 lần thử lấy slot
+        assert not waiter.done()
+        gate.set()
+        assert await asyncio.wrap_future(blocker) is True
+        return await waiter
+
+    try:
+        assert asyncio.run(scenario()) == "next chunk"
+        assert rejected() == before
+        with pytest.raises(ExecutorSaturatedError):
+            gate.clear()
+            executor.submit("predict_stream", gate.wait, 5)
+            executor.submit("predict_stream", lambda: None)
+        assert rejected() == before + 1
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+def test_cancelled_queued_request_releases_its_slot():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def scenario():
+        running = executor.submit("predict", gate.wait, 5)
+        # request đang chờ bị cancel (vd. client ngắt kết nối)
+        queued = asyncio.ensure_future(executor.run("predict", lambda: "never"))
+        await asyncio.sleep(0.05)
+        assert executor.pending == 2
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert executor.pending == 1
+        gate.set()
+        assert await asyncio.wrap_future(running) is True
+
+    try:
+        asyncio.run(scenario())
+        assert executor.pending == 0
+        assert executor.submit("predict", lambda: "ok").result(timeout=5) == "ok"
+    finally:
+        gate.set()
+        executor.shutdown()
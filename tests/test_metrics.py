@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.parser import text_string_to_metric_families
+
+from scripts.service.metrics import FastHistogram
+
+
+def test_fast_histogram_buckets_and_sum():
+    registry = CollectorRegistry()
+    hist = FastHistogram(
+        "t_stage_seconds", "test", ["stage"], buckets=(0.1, 1.0), registry=registry
+    )
+    child = hist.labels(stage="a")
+    for v in (0.05, 0.1, 0.5, 2.0):
+        child.observe(v)
+
+    assert registry.get_sample_value("t_stage_seconds_bucket", {"stage": "a", "le": "0.1"}) == 2
+    assert registry.get_sample_value("t_stage_seconds_bucket", {"stage": "a", "le": "1.0"}) == 3
+    assert registry.get_sample_value("t_stage_seconds_bucket", {"stage": "a", "le": "+Inf"}) == 4
+    assert registry.get_sample_value("t_stage_seconds_count", {"stage": "a"}) == 4
+    assert abs(registry.get_sample_value("t_stage_seconds_sum", {"stage": "a"}) - 2.65) < 1e-9
+
+
+def test_fast_histogram_folds_and_keeps_counting():
+    registry = CollectorRegistry()
+    hist = FastHistogram("t_batch", "test", buckets=(10,), registry=registry)
+    n = FastHistogram.FOLD_THRESHOLD + 5
+    for _ in range(n):
+        hist.observe(1)
+    generate_latest(registry)  # scrape giữa chừng
+    hist.observe(100)
+
+    assert registry.get_sample_value("t_batch_bucket", {"le": "10.0"}) == n
+    assert registry.get_sample_value("t_batch_count") == n + 1
+
+
+MULTIPROCESS_SCRIPT = """
+from fastapi.testclient import TestClient
+from scripts.service.app import app
+
+with TestClient(app) as client:
+    record = {
+        "Contract": "Month-to-month", "tenure": 3, "MonthlyCharges": 80.0,
+        "InternetService": "Fiber optic", "OnlineSecurity": "No", "TechSupport": "No",
+    }
+    assert client.post("/predict", json=record).status_code == 200
+    assert client.post("/predict_batch", json={"records": [record, record]}).status_code == 200
+    print(client.get("/metrics").text)
+"""
+
+
+def test_service_metrics_survive_multiprocess_mode(tmp_path):
+    """Multi-worker: /metrics đọc qua MultiProcessCollector, metric riêng vẫn phải có."""
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    env.setdefault("LOCAL_MODEL_PATH", "models/mlflow_export")
+    env["TELCO_PREDICTION_LOG_DIR"] = ""
+    env["TELCO_STATE_DIR"] = str(tmp_path / "state")
+    out = subprocess.run(
+        [sys.executable, "-c", MULTIPROCESS_SCRIPT],
+        env=env,
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert out.returncode == 0, out.stderr[-2000:]
+    families = {f.name: f for f in text_string_to_metric_families(out.stdout)}
+
+    stage = families["telco_inference_stage_seconds"]
+    counts = {
+        s.labels["stage"]: s.value for s in stage.samples if s.name.endswith("_count")
+    }
+    # warm-up lúc startup cũng đi qua các stage nên chỉ kiểm tra có đủ
+    for name in ("validation", "predict_proba", "monitoring_log", "serialization"):
+        assert counts[name] > 0
+
+    (info,) = [s for s in families["telco_model_info"].samples if s.value == 1]
+    assert info.labels["scoring_engine"] in {"native", "sklearn"}
+    # gộp theo multiprocess_mode: 1 series, không tách theo pid
+    (rate,) = families["telco_predicted_churn_rate"].samples
+    assert "pid" not in rate.labels
+    assert 0.0 <= rate.value <= 1.0
@@ -0,0 +1,81 @@
+import shutil
+import threading
+from pathlib import Path
+
+import mlflow.sklearn
+import pytest
+
+from scripts.service import model_loader
+
+EXPORTED_MODEL_PATH = Path(__file__).resolve().parents[1] / "models" / "mlflow_export"
+
+
+@pytest.fixture
+def fresh_loader(monkeypatch, tmp_path):
+    """model_loader với state sạch + LOCAL_MODEL_PATH trỏ vào tmp."""
+    # watcher do TestClient (session) của test_api start sẽ gọi check_for_update
+    # trên các global bị monkeypatch bên dưới -> dừng nó để test chạy tất định
+    model_loader.shutdown_watcher()
+    model_dir = tmp_path / "model"
+    monkeypatch.setattr(model_loader, "LOCAL_MODEL_PATH", str(model_dir))
+    monkeypatch.setattr(model_loader, "MODEL_URI", str(tmp_path / "missing"))
+    monkeypatch.setattr(model_loader, "_active", None)
+    monkeypatch.setattr(model_loader, "_load_lock", threading.Lock())
+    monkeypatch.setattr(model_loader, "_local_signature", None)
+    monkeypatch.setattr(model_loader, "_swap_listeners", [])
+    monkeypatch.setattr(
+        model_loader,
+        "_status",
+        {
+            "last_error": None,
+            "last_error_at": None,
+            "consecutive_failures": 0,
+            "next_retry_at": None,
+            "last_check_at": None,
+            "last_swap_at": None,
+            "swaps": 0,
+        },
+    )
+    return model_dir
+
+
+def test_local_model_hot_swap(fresh_loader):
+    shutil.copytree(EXPORTED_MODEL_PATH, fresh_loader)
+    first = model_loader.ensure_loaded()
+    assert first.source == "local"
+    assert model_loader.check_for_update() is False
+
+    # "retrain": ghi đè model đã chỉnh intercept vào đúng thư mục
+    model = mlflow.sklearn.load_model(str(fresh_loader))
+    model.named_steps["clf"].intercept_ = model.named_steps["clf"].intercept_ + 1.0
+    shutil.rmtree(fresh_loader)
+    mlflow.sklearn.save_model(model, str(fresh_loader))
+
+    swapped = []
+    model_loader.add_swap_listener(lambda old, new: swapped.append((old, new)))
+    assert model_loader.check_for_update() is True
+
+    second = model_loader.current()
+    assert second is not first
+    assert second.checksum != first.checksum
+    assert swapped == [(first, second)]
+    assert model_loader.status()["swaps"] == 2
+
+
+def test_failed_load_is_retried_not_latched(fresh_loader, monkeypatch):
+    monkeypatch.setattr(model_loader, "MODEL_RETRY_BASE_SECONDS", 60)
+
+    with pytest.raises(model_loader.ModelUnavailableError):
+        model_loader.ensure_loaded()
+    assert model_loader.status()["consecutive_failures"] == 1
+
+    # trong backoff: fail ngay, không load lại
+    shutil.copytree(EXPORTED_MODEL_PATH, fresh_loader)
+    with pytest.raises(model_loader.ModelUnavailableError):
+        model_loader.ensure_loaded()
+    assert model_loader.status()["consecutive_failures"] == 1
+
+    # hết backoff -> load được, không cần restart process
+    model_loader._status["next_retry_at"] = 0
+    assert model_loader.ensure_loaded().source == "local"
+    assert model_loader.status()["consecutive_failures"] == 0
@@ -0,0 +1,71 @@
+import time
+
+import pyarrow.parquet as pq
+
+from scripts.service.prediction_log import (
+    SCHEMA,
+    PredictionLogWriter,
+    list_segments,
+    read_range,
+    read_segments,
+)
+
+
+def _columns(n, contract="Month-to-month"):
+    return {
+        "Contract": [contract] * n,
+        "tenure": list(range(n)),
+        "MonthlyCharges": [50.5] * n,
+        "InternetService": ["Fiber optic"] * n,
+        "OnlineSecurity": ["No"] * n,
+        "TechSupport": ["No"] * n,
+        "prediction": [i % 2 for i in range(n)],
+    }
+
+
+def test_size_triggered_flush_writes_compressed_segment(tmp_path):
+    writer = PredictionLogWriter(tmp_path, flush_rows=100, flush_seconds=60)
+    try:
+        writer.extend(_columns(150))
+        deadline = time.time() + 5
+        while not list_segments(tmp_path) and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        writer.stop()
+
+    segments = list_segments(tmp_path)
+    assert len(segments) == 1
+    assert segments[0].parent.name.startswith("dt=")
+    meta = pq.ParquetFile(segments[0]).metadata
+    assert meta.num_rows == 150
+    assert meta.row_group(0).column(0).compression == "ZSTD"
+
+
+def test_stop_drains_buffer_and_reader_filters_time_range(tmp_path):
+    writer = PredictionLogWriter(tmp_path, flush_rows=10_000, flush_seconds=60)
+    writer.extend(_columns(5, "One year"))
+    writer.flush()
+    t_split = time.time()
+    time.sleep(0.01)
+    writer.extend(_columns(7, "Two year"))
+    writer.stop()  # drain: không có flush nào khác
+
+    assert len(list_segments(tmp_path)) == 2
+    full = read_range(tmp_path)
+    assert len(full) == 12
+    assert list(full.columns) == SCHEMA.names
+
+    late = read_range(tmp_path, start=t_split)
+    assert len(late) == 7 and set(late["Contract"]) == {"Two year"}
+    early = list(read_segments(tmp_path, end=t_split, columns=["tenure", "prediction"]))
+    assert len(early) == 1 and list(early[0].columns) == ["tenure", "prediction"]
+    assert len(early[0]) == 5
+    assert read_range(tmp_path, start=time.time() + 3600).empty
+
+
+def test_full_buffer_drops_instead_of_blocking(tmp_path):
+    writer = PredictionLogWriter(tmp_path, flush_rows=10_000, flush_seconds=60, max_buffer_rows=10)
+    writer.extend(_columns(8))
+    writer.extend(_columns(8))  # vượt buffer -> bỏ
+    writer.stop()
+    assert len(read_range(tmp_path)) == 8
@@ -0,0 +1,63 @@
+import hashlib
+import json
+
+import pandas as pd
+import pytest
+
+from scripts.service import reference_profile
+
+NUMERIC = ["tenure", "MonthlyCharges"]
+CATEGORICAL = ["Contract"]
+
+
+@pytest.fixture
+def reference_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(reference_profile, "PROFILE_DIR", tmp_path / "profiles")
+    path = tmp_path / "telco_churn.csv"
+    pd.DataFrame(
+        {
+            "customerID": [f"c{i}" for i in range(8)],
+            "Contract": ["Month-to-month"] * 6 + ["Two year"] * 2,
+            "tenure": [1, 2, 3, 4, 5, 6, 7, 8],
+            "MonthlyCharges": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0],
+            "Churn": ["Yes", "No"] * 4,
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+def test_profile_is_keyed_by_dvc_md5_and_reused(reference_csv):
+    md5 = hashlib.md5(reference_csv.read_bytes()).hexdigest()
+    reference_csv.with_name("telco_churn.csv.dvc").write_text(
+        f"outs:\n- md5: {md5}\n  size: 1\n  hash: md5\n  path: telco_churn.csv\n"
+    )
+
+    profile = reference_profile.load_or_build(reference_csv, NUMERIC, CATEGORICAL)
+    stored = reference_profile.PROFILE_DIR / f"telco_churn.{md5}.json"
+    assert stored.exists()
+    assert profile["count"] == 8
+    assert profile["numeric"]["tenure"]["mean"] == pytest.approx(4.5)
+    assert profile["numeric"]["MonthlyCharges"]["quantiles"]["0.5"] == pytest.approx(45.0)
+    assert sum(profile["numeric"]["tenure"]["histogram"]["counts"]) == 8
+    assert profile["categories"]["Contract"] == {"Month-to-month": 0.75, "Two year": 0.25}
+
+    # CSV không còn (vd. chưa dvc pull): vẫn dùng được profile đã lưu
+    reference_csv.unlink()
+    again = reference_profile.load_or_build(reference_csv, NUMERIC, CATEGORICAL)
+    assert again == json.loads(stored.read_text())
+
+
+def test_profile_without_dvc_file_uses_content_hash(reference_csv):
+    profile = reference_profile.load_or_build(reference_csv, NUMERIC, CATEGORICAL)
+    assert profile["md5"] == reference_profile.data_hash(reference_csv)
+    assert len(profile["md5"]) == 32
+
+    reference_csv.write_text(reference_csv.read_text().replace("80.0", "800.0"))
+    changed = reference_profile.load_or_build(reference_csv, NUMERIC, CATEGORICAL)
+    assert changed["md5"] != profile["md5"]
+    assert changed["numeric"]["MonthlyCharges"]["mean"] > profile["numeric"]["MonthlyCharges"]["mean"]
+
+
+def test_missing_reference_returns_none(tmp_path, monkeypatch):
+    monkeypatch.setattr(reference_profile, "PROFILE_DIR", tmp_path / "profiles")
+    assert reference_profile.load_or_build(tmp_path / "nope.csv", NUMERIC, CATEGORICAL) is None
@@ -0,0 +1,66 @@
+import os
+import time
+
+from scripts.service.report_index import ReportIndex
+
+
+def _write(reports, name, age_seconds=0):
+    p = reports / name
+    p.write_text("<html></html>")
+    ts = time.time() - age_seconds
+    os.utime(p, (ts, ts))
+    return p
+
+
+def test_backfill_add_and_pagination(tmp_path):
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    _write(reports, "drift_report_old.html", age_seconds=60)
+    _write(reports, "drift_report_latest.html")
+
+    index = ReportIndex(reports, path=tmp_path / "index.sqlite", max_reports=10)
+    total, rows = index.page()
+    assert total == 1 and rows[0]["name"] == "drift_report_old.html"
+
+    _write(reports, "drift_report_new.html")
+    index.add(
+        {
+            "name": "drift_report_new.html",
+            "renderer": "simple",
+            "drift_detected": True,
+            "drifted_features": ["tenure"],
+            "render_seconds": 0.1,
+        }
+    )
+    total, rows = index.page(limit=1)
+    assert total == 2
+    assert rows[0]["name"] == "drift_report_new.html"
+    assert rows[0]["drift_detected"] is True
+    assert rows[0]["drifted_features"] == ["tenure"]
+    assert rows[0]["size_bytes"] == len("<html></html>")
+    _, rows = index.page(limit=1, offset=1)
+    assert rows[0]["name"] == "drift_report_old.html"
+
+
+def test_retention_by_count_and_age(tmp_path):
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    index = ReportIndex(reports, path=tmp_path / "index.sqlite", max_reports=3, max_age_days=1)
+
+    _write(reports, "drift_report_ancient.html")
+    index.add({"name": "drift_report_ancient.html", "created_at": time.time() - 2 * 86400})
+    assert not (reports / "drift_report_ancient.html").exists()
+
+    for i in range(5):
+        _write(reports, f"drift_report_{i}.html")
+        removed = index.add({"name": f"drift_report_{i}.html", "created_at": time.time() + i})
+
+    assert removed == ["drift_report_1.html"]
+    total, rows = index.page()
+    assert total == 3
+    assert [r["name"] for r in rows] == [f"drift_report_{i}.html" for i in (4, 3, 2)]
+    assert sorted(p.name for p in reports.iterdir()) == [
+        "drift_report_2.html",
+        "drift_report_3.html",
+        "drift_report_4.html",
+    ]
@@ -0,0 +1,95 @@
+import threading
+
+from scripts.service.report_jobs import ReportJobQueue
+
+
+def test_duplicate_triggers_are_coalesced_while_running():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"report": "drift_report_x.html"}
+
+    jobs = ReportJobQueue(fn)
+    try:
+        job, coalesced = jobs.submit("manual")
+        assert not coalesced
+        assert started.wait(5)
+        again, coalesced = jobs.submit("trigger_now")
+        assert coalesced and again is job
+        assert job.info()["status"] == "running"
+
+        release.set()
+        assert job.done.wait(5)
+        info = jobs.get(job.id).info()
+        assert info["status"] == "succeeded"
+        assert info["coalesced_triggers"] == 1
+        assert info["duration_seconds"] >= 0
+        assert info["result"] == {"report": "drift_report_x.html"}
+        assert len(calls) == 1
+
+        # job đã xong -> trigger mới tạo job mới
+        nxt, coalesced = jobs.submit("scheduled")
+        assert not coalesced and nxt.id != job.id
+        assert nxt.done.wait(5)
+    finally:
+        release.set()
+        jobs.stop()
+
+
+def test_failed_and_skipped_jobs():
+    results = iter([None, RuntimeError("boom")])
+
+    def fn():
+        r = next(results)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    jobs = ReportJobQueue(fn, max_history=1)
+    try:
+        skipped, _ = jobs.submit("manual")
+        assert skipped.done.wait(5)
+        assert skipped.status == "skipped"
+
+        failed, _ = jobs.submit("manual")
+        assert failed.done.wait(5)
+        assert failed.status == "failed"
+        assert "boom" in failed.error
+        # chỉ giữ max_history job
+        assert jobs.get(skipped.id) is None
+        assert [j["job_id"] for j in jobs.recent()] == [failed.id]
+    finally:
+        jobs.stop()
+
+
+def test_queue_positions_without_coalescing_into_running_job():
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        return {"model_version": "3"}
+
+    jobs = ReportJobQueue(fn, coalesce_running=False, name="retrain")
+    try:
+        running, _ = jobs.submit("drift")
+        assert started.wait(5)
+        queued, coalesced = jobs.submit("drift")
+        assert not coalesced and queued is not running
+        again, coalesced = jobs.submit("manual")
+        assert coalesced and again is queued
+        assert jobs.info(running)["queue_position"] == 0
+        assert jobs.info(queued)["queue_position"] == 1
+        assert jobs.queue_length() == 1
+
+        release.set()
+        assert queued.done.wait(5)
+        assert jobs.info(queued)["queue_position"] is None
+        assert queued.result == {"model_version": "3"}
+    finally:
+        release.set()
+        jobs.stop()
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.profiling import ResourceMeter
+from scripts.service.report_renderer import (
+    EvidentlyRenderer,
+    load_reference_sample,
+    stratified_sample,
+)
+
+
+def _frame(n=10_000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "tenure": rng.integers(0, 73, n),
+            "Contract": rng.choice(["Month-to-month", "One year", "Two year"], n),
+            "Churn": rng.choice(["Yes", "No"], n, p=[0.27, 0.73]),
+        }
+    )
+
+
+def test_stratified_sample_keeps_class_proportions():
+    df = _frame()
+    sample = stratified_sample(df, 1000, "Churn")
+    assert abs(len(sample) - 1000) <= 2
+    expected = df["Churn"].value_counts(normalize=True)
+    got = sample["Churn"].value_counts(normalize=True)
+    assert np.allclose(got[expected.index], expected, atol=0.005)
+    # nhỏ hơn cỡ mẫu -> giữ nguyên
+    assert len(stratified_sample(df.head(10), 1000, "Churn")) == 10
+
+
+def test_load_reference_sample_reads_only_needed_columns(tmp_path):
+    path = tmp_path / "ref.csv"
+    _frame().assign(customerID="x").to_csv(path, index=False)
+    sample = load_reference_sample(path, ["tenure", "Contract"], 500, "Churn")
+    assert list(sample.columns) == ["tenure", "Contract"]
+    assert abs(len(sample) - 500) <= 2
+    assert load_reference_sample(tmp_path / "missing.csv", ["tenure"], 500) is None
+
+
+def test_resource_meter_records_time_and_peak_memory():
+    with ResourceMeter() as meter:
+        block = np.ones(20 * 2**20 // 8)  # ~20 MB
+        del block
+    stats = meter.stats()
+    assert stats["seconds"] >= 0
+    assert stats["peak_memory_mb"] > 0
+
+
+def _evidently_importable() -> bool:
+    # import thật (process riêng): cài rồi vẫn có thể import lỗi, vd. numpy 2 bỏ np.float_
+    probe = (
+        "import queue\n"
+        "from scripts.service.report_renderer import _init_worker, _worker\n"
+        "_init_worker(queue.SimpleQueue())\n"
+        "raise SystemExit(_worker['error'] is not None)"
+    )
+    root = Path(__file__).resolve().parents[1]
+    return subprocess.run([sys.executable, "-c", probe], cwd=root).returncode == 0
+
+
+def test_renderer_reports_evidently_availability_from_worker():
+    renderer = EvidentlyRenderer(timeout=60)
+    try:
+        assert renderer.available() == _evidently_importable()
+    finally:
+        renderer.stop()
+
+
+FAKE_EVIDENTLY = '''
+class Report:
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def run(self, reference_data, current_data):
+        self.rows = (len(reference_data), len(current_data))
+
+    def save_html(self, path):
+        with open(path, "w") as f:
+            f.write("<html>%d %d</html>" % self.rows)
+'''
+
+
+def test_renderer_renders_in_worker_process(tmp_path, monkeypatch):
+    # Evidently giả lập: worker (spawn) nhận sys.path của process cha
+    pkg = tmp_path / "fake_site" / "evidently"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text(FAKE_EVIDENTLY)
+    (pkg / "presets.py").write_text("class DataDriftPreset:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path / "fake_site"))
+
+    ref_path = tmp_path / "ref.csv"
+    _frame().to_csv(ref_path, index=False)
+    current = _frame(50)[["tenure", "Contract"]]
+    out = [tmp_path / "a.html", tmp_path / "b.html"]
+
+    renderer = EvidentlyRenderer(sample_size=1000, stratify="Churn", timeout=60)
+    try:
+        assert renderer.available()
+        stats = renderer.render(ref_path, current, out)
+    finally:
+        renderer.stop()
+
+    assert stats["reference"] == "sample"
+    assert abs(stats["reference_rows"] - 1000) <= 2
+    assert stats["current_rows"] == 50
+    assert stats["peak_memory_mb"] > 0 and stats["seconds"] >= 0
+    assert stats["worker_pid"] != __import__("os").getpid()
+    assert all(p.read_text().startswith("<html>") for p in out)
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from scripts.service.retrain_worker import RetrainWorker
+
+FAKE_TRAIN = '''
+import os, time
+
+LOADED_IN = os.getpid()
+
+
+def train(sleep=0.0):
+    time.sleep(sleep)
+    return {"model_version": "7", "loaded_in": LOADED_IN}
+'''
+
+
+@pytest.fixture
+def fake_target(tmp_path, monkeypatch):
+    (tmp_path / "fake_train_mod.py").write_text(FAKE_TRAIN)
+    # worker spawn kế thừa sys.path của process cha
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return "fake_train_mod:train"
+
+
+def test_worker_reuses_prewarmed_process(fake_target):
+    worker = RetrainWorker(target=fake_target, timeout=60)
+    try:
+        first = worker.run()
+        second = worker.run()
+        assert first["model_version"] == "7"
+        assert first["worker_pid"] != os.getpid()
+        # cùng 1 process, target chỉ import 1 lần
+        assert second["worker_pid"] == first["worker_pid"] == first["loaded_in"]
+        assert second["train_seconds"] >= 0
+        assert worker.status()["completed_runs"] == 2
+        assert worker.status()["worker_pids"] == [first["worker_pid"]]
+    finally:
+        worker.stop()
+
+
+def test_timeout_kills_worker_and_next_job_gets_a_new_one(fake_target):
+    worker = RetrainWorker(target=fake_target, timeout=2)
+    try:
+        first = worker.run()
+        with pytest.raises(TimeoutError):
+            worker.run(sleep=30)
+        assert not worker.status()["running"]
+        assert worker.status()["worker_pids"] == []
+        # worker cũ (đang chạy job quá hạn) đã bị kill
+        deadline = time.monotonic() + 10
+        while first["worker_pid"] in {p.pid for p in multiprocessing.active_children()}:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert worker.run()["worker_pid"] != first["worker_pid"]
+    finally:
+        worker.stop()
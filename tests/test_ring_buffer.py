@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+
+from scripts.service.ring_buffer import OTHER_CATEGORY, ColumnarRingBuffer
+
+
+def _buffer(capacity):
+    return ColumnarRingBuffer(
+        capacity,
+        numeric={"tenure": np.int64, "prediction": np.int8},
+        categorical=["Contract"],
+    )
+
+
+def _row(i):
+    return {"Contract": "Two year" if i % 2 else "One year", "tenure": i, "prediction": i % 2}
+
+
+def test_snapshot_is_chronological_view_after_wrap():
+    buf = _buffer(4)
+    buf.extend([_row(i) for i in range(3)])
+    buf.append(_row(3))
+    buf.extend([_row(i) for i in range(4, 7)])
+
+    snap = buf.snapshot()
+    assert len(buf) == 4 and snap.total == 7
+    assert snap.numeric["tenure"].tolist() == [3, 4, 5, 6]
+    assert snap.category_counts("Contract") == {"Two year": 2, "One year": 2}
+    assert buf.snapshot(last=2).numeric["tenure"].tolist() == [5, 6]
+
+    df = snap.frame(["Contract", "tenure", "prediction"])
+    assert df["Contract"].tolist() == ["Two year", "One year", "Two year", "One year"]
+    assert df["tenure"].tolist() == [3, 4, 5, 6]
+
+
+def test_snapshot_is_stable_when_appending_after_it():
+    buf = _buffer(4)
+    buf.extend([_row(i) for i in range(4)])
+    snap = buf.snapshot()
+
+    buf.append(_row(99))
+    buf.append({"Contract": "Month-to-month", "tenure": 100, "prediction": 1})
+
+    assert snap.numeric["tenure"].tolist() == [0, 1, 2, 3]
+    # code của category mới không lọt vào snapshot cũ
+    assert snap.frame(["Contract"])["Contract"].tolist() == [
+        "One year", "Two year", "One year", "Two year"
+    ]
+    assert snap.category_counts("Contract") == {"One year": 2, "Two year": 2}
+
+
+def test_batch_larger_than_capacity_keeps_tail():
+    buf = _buffer(3)
+    buf.extend([_row(i) for i in range(10)])
+    assert buf.snapshot().numeric["tenure"].tolist() == [7, 8, 9]
+
+
+def test_concurrent_appends_are_not_lost():
+    buf = _buffer(100_000)
+
+    def worker(offset):
+        for i in range(1000):
+            buf.append(_row(offset + i))
+
+    threads = [threading.Thread(target=worker, args=(k * 1000,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    snap = buf.snapshot()
+    assert snap.total == 8000
+    assert sorted(snap.numeric["tenure"].tolist()) == list(range(8000))
+
+
+def test_category_dictionary_is_capped():
+    buf = ColumnarRingBuffer(
+        10, numeric={"tenure": np.int64}, categorical=["Contract"], max_categories=2
+    )
+    buf.extend([{"Contract": f"junk-{i}", "tenure": i} for i in range(10)])
+    buf.append({"Contract": "junk-1", "tenure": 10})
+
+    snap = buf.snapshot()
+    assert snap.categories["Contract"] == ["junk-0", "junk-1", OTHER_CATEGORY]
+    assert snap.category_counts("Contract") == {"junk-1": 2, OTHER_CATEGORY: 8}
@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import mlflow.sklearn
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.service import model_loader
+from scripts.service.scoring import CompiledPipeline, UnsupportedPipelineError
+
+EXPORTED_MODEL_PATH = Path(__file__).resolve().parents[1] / "models" / "mlflow_export"
+
+RECORDS = [
+    {
+        "Contract": "Month-to-month",
+        "tenure": 5,
+        "MonthlyCharges": 80.5,
+        "InternetService": "Fiber optic",
+        "OnlineSecurity": "No",
+        "TechSupport": "No",
+    },
+    {
+        "Contract": "Two year",
+        "tenure": 40,
+        "MonthlyCharges": 60.0,
+        "InternetService": "DSL",
+        "OnlineSecurity": "Yes",
+        "TechSupport": "Yes",
+    },
+    {
+        "Contract": "One year",
+        "tenure": 0,
+        "MonthlyCharges": 19.9,
+        "InternetService": "No",
+        "OnlineSecurity": "No internet service",
+        "TechSupport": "No internet service",
+    },
+    # category chưa gặp lúc train -> OneHotEncoder(handle_unknown="ignore")
+    {
+        "Contract": "Three year",
+        "tenure": 72,
+        "MonthlyCharges": 118.75,
+        "InternetService": "Satellite",
+        "OnlineSecurity": "Yes",
+        "TechSupport": "Unknown",
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def model():
+    return mlflow.sklearn.load_model(str(EXPORTED_MODEL_PATH))
+
+
+def test_native_scoring_matches_predict_proba(model):
+    """CompiledPipeline phải cho cùng xác suất với model.predict_proba."""
+    scorer = CompiledPipeline.from_pipeline(model)
+
+    expected = model.predict_proba(pd.DataFrame(RECORDS))[:, 1]
+
+    np.testing.assert_allclose(scorer.predict_proba_records(RECORDS), expected, atol=1e-12)
+    for record, p in zip(RECORDS, expected):
+        assert scorer.score_one(record) == pytest.approx(p, abs=1e-12)
+
+
+def test_native_scoring_random_records(model):
+    scorer = CompiledPipeline.from_pipeline(model)
+    rng = np.random.default_rng(0)
+
+    records = [
+        {
+            "Contract": rng.choice(["Month-to-month", "One year", "Two year"]),
+            "tenure": int(rng.integers(0, 73)),
+            "MonthlyCharges": float(rng.uniform(18.0, 120.0)),
+            "InternetService": rng.choice(["DSL", "Fiber optic", "No"]),
+            "OnlineSecurity": rng.choice(["Yes", "No", "No internet service"]),
+            "TechSupport": rng.choice(["Yes", "No", "No internet service"]),
+        }
+        for _ in range(500)
+    ]
+
+    expected = model.predict_proba(pd.DataFrame(records))[:, 1]
+    np.testing.assert_allclose(scorer.predict_proba_records(records), expected, atol=1e-12)
+
+
+def test_unfitted_pipeline_is_rejected():
+    from scripts import train as train_module
+
+    df = pd.DataFrame(RECORDS).assign(Churn=[1, 0, 0, 1])
+    _, _, unfitted = train_module.build_pipeline(df)
+
+    with pytest.raises(UnsupportedPipelineError):
+        CompiledPipeline.from_pipeline(unfitted)
+
+
+def test_sklearn_engine_switch(model, monkeypatch):
+    monkeypatch.setattr(model_loader, "SCORING_ENGINE", "sklearn")
+    assert model_loader.compile_scorer(model) is None
+
+    monkeypatch.setattr(model_loader, "SCORING_ENGINE", "native")
+    assert isinstance(model_loader.compile_scorer(model), CompiledPipeline)
+
+
+def test_save_and_mmap_load_round_trip(model, tmp_path):
+    scorer = CompiledPipeline.from_pipeline(model)
+    scorer.save(tmp_path / "compiled")
+
+    loaded = CompiledPipeline.load(tmp_path / "compiled", mmap=True)
+
+    assert isinstance(loaded.num_coef.base, np.memmap) or isinstance(loaded.num_coef, np.memmap)
+    np.testing.assert_array_equal(
+        loaded.predict_proba_records(RECORDS), scorer.predict_proba_records(RECORDS)
+    )
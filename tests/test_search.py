@@ -0,0 +1,95 @@
+import mlflow
+import pytest
+from mlflow.tracking import MlflowClient
+
+from scripts import search
+from scripts import train as train_module
+from tests.test_train_incremental import _frame
+
+SPACE = [
+    {"estimator": "logreg", "params": {"C": 1.0, "max_iter": 500}},
+    {"estimator": "logreg", "params": {"C": 0.001, "max_iter": 500}},
+    {"estimator": "logreg", "params": {"C": 0.1, "penalty": "l1", "solver": "liblinear"}},
+    {"estimator": "random_forest", "params": {"n_estimators": 20, "max_depth": 4, "random_state": 42}},
+]
+
+
+@pytest.fixture
+def tracking(tmp_path, monkeypatch):
+    previous = mlflow.get_tracking_uri()
+    monkeypatch.setattr(train_module, "MLFLOW_TRACKING_URI", f"file://{tmp_path}/mlruns")
+    monkeypatch.setattr(train_module, "EXPERIMENT_NAME", "search-test")
+    yield MlflowClient(tracking_uri=train_module.MLFLOW_TRACKING_URI)
+    mlflow.set_tracking_uri(previous)
+
+
+def test_rung_fractions_grow_by_eta():
+    assert search.rung_fractions(0.1, 3) == pytest.approx([1 / 9, 1 / 3, 1.0])
+    assert search.rung_fractions(0.5, 3) == [1.0]
+
+
+def test_default_space_builds_through_make_model():
+    for candidate in search.default_space():
+        model = train_module.make_model(estimator=search.make_estimator(candidate))
+        assert model.named_steps["clf"].get_params()["random_state"] in (None, 42)
+
+
+def test_search_prunes_and_logs_nested_trials(tracking):
+    result = search.run_search(
+        df=_frame(2000), space=SPACE, workers=2, eta=2, min_fraction=0.25
+    )
+
+    assert result["stop_reason"] is None
+    assert result["refit_data"] == "train"
+    # 4 ứng viên -> 2 -> 1 trên 3 rung (1/4, 1/2, 1)
+    assert result["trials"] == 4 + 2 + 1
+    assert result["model_version"] is not None
+
+    children = tracking.search_runs(
+        [tracking.get_experiment_by_name("search-test").experiment_id],
+        filter_string=f"tags.mlflow.parentRunId = '{result['run_id']}'",
+    )
+    statuses = sorted(run.data.tags["status"] for run in children)
+    assert statuses == ["final"] + ["promoted"] * 3 + ["pruned"] * 3
+
+
+def test_cpu_budget_stops_after_first_rung(tracking):
+    result = search.run_search(
+        df=_frame(2000), space=SPACE, workers=1, cpu_budget=1e-9, eta=2, min_fraction=0.25
+    )
+
+    assert result["stop_reason"] == "cpu_budget"
+    # trial đầu tiên vượt budget, các trial chưa chạy bị huỷ
+    assert result["trials"] < len(SPACE) + 2
+    run = tracking.get_run(result["run_id"])
+    assert run.data.tags["stop_reason"] == "cpu_budget"
+    assert run.data.metrics["reached_rung"] == 0
+
+
+def test_time_limit_bounds_refit_to_best_trial_data(tracking, monkeypatch):
+    import time
+    import types
+
+    # đồng hồ giả: sau khi rung 0 được log thì coi như đã quá deadline
+    offset = [0.0]
+    clock = types.SimpleNamespace(
+        perf_counter=lambda: time.perf_counter() + offset[0], process_time=time.process_time
+    )
+    monkeypatch.setattr(search, "time", clock)
+    log_trial = search._log_trial
+
+    def expire_after_log(*args, **kwargs):
+        log_trial(*args, **kwargs)
+        offset[0] = 1e6
+
+    monkeypatch.setattr(search, "_log_trial", expire_after_log)
+
+    result = search.run_search(
+        df=_frame(2000), space=SPACE, workers=2, time_limit=3600, eta=2, min_fraction=0.25
+    )
+
+    assert result["stop_reason"] == "time_limit"
+    assert result["refit_data"] == "rung0"
+    run = tracking.get_run(result["run_id"])
+    assert run.data.params["refit_data"] == "rung0"
+    assert run.data.metrics["reached_rung"] == 0
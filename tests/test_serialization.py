@@ -0,0 +1,23 @@
+import json
+
+import numpy as np
+
+from scripts.service import serialization
+from scripts.service.schemas.response import TelcoBatchResponse, TelcoPrediction
+
+
+def test_batch_response_matches_pydantic_schema():
+    proba = np.array([0.1, 0.5, 0.987654321, 1e-7])
+    pred = (proba >= 0.5).astype(int)
+
+    expected = TelcoBatchResponse(
+        predictions=[
+            TelcoPrediction(churn_probability=float(p), churn_predicted=int(y))
+            for p, y in zip(proba, pred)
+        ]
+    ).model_dump()
+
+    assert json.loads(serialization.batch_response_bytes(proba, pred)) == expected
+    assert json.loads(serialization.batch_response_bytes(np.empty(0), np.empty(0, dtype=int))) == {
+        "predictions": []
+    }
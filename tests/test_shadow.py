@@ -0,0 +1,75 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from scripts.service import metrics
+from scripts.service.shadow import ShadowScorer
+
+EXPORTED_MODEL_PATH = Path(__file__).resolve().parents[1] / "models" / "mlflow_export"
+
+RECORDS = [
+    {
+        "Contract": "Two year",
+        "tenure": 30,
+        "MonthlyCharges": 55.0,
+        "InternetService": "DSL",
+        "OnlineSecurity": "Yes",
+        "TechSupport": "Yes",
+    },
+    {
+        "Contract": "Month-to-month",
+        "tenure": 2,
+        "MonthlyCharges": 95.0,
+        "InternetService": "Fiber optic",
+        "OnlineSecurity": "No",
+        "TechSupport": "No",
+    },
+]
+
+
+def _dropped(reason):
+    return metrics.SHADOW_DROPPED.labels(reason=reason)._value.get()
+
+
+def test_challenger_scores_copies_of_live_traffic():
+    shadow = ShadowScorer(str(EXPORTED_MODEL_PATH), max_batch_size=8)
+    try:
+        # champion: nhãn 0 cho record 1, 1 cho record 2 (đúng như model export)
+        for _ in range(3):
+            assert shadow.submit(RECORDS, np.array([0.1, 0.9]))
+    finally:
+        shadow.stop(timeout=30)
+
+    info = shadow.info()
+    assert info["challenger_loaded"] is True
+    assert info["scored"] == 6
+    assert info["agreement_rate"] == 1.0
+
+
+def test_submit_never_blocks_when_queue_is_full():
+    shadow = ShadowScorer(str(EXPORTED_MODEL_PATH), max_queue=1)
+    gate = threading.Event()
+    shadow._ensure_loaded = lambda: gate.wait(timeout=5)
+    before = _dropped("queue_full")
+    try:
+        results = [shadow.submit(RECORDS, np.array([0.1, 0.9])) for _ in range(5)]
+        assert results[0] is True
+        assert False in results
+        assert _dropped("queue_full") > before
+    finally:
+        gate.set()
+        shadow.stop(timeout=30)
+
+
+def test_unavailable_challenger_is_retried_later():
+    shadow = ShadowScorer("/nonexistent/challenger", retry_seconds=3600)
+    before = _dropped("model_unavailable")
+    try:
+        shadow.submit(RECORDS, np.array([0.1, 0.9]))
+    finally:
+        shadow.stop(timeout=30)
+
+    assert shadow.info()["challenger_loaded"] is False
+    assert shadow.last_error is not None
+    assert _dropped("model_unavailable") == before + 2
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import mlflow.sklearn
+import numpy as np
+import pytest
+
+from scripts.service import shared_state
+from scripts.service.scoring import CompiledPipeline
+
+EXPORTED_MODEL_PATH = Path(__file__).resolve().parents[1] / "models" / "mlflow_export"
+
+RECORD = {
+    "Contract": "Two year",
+    "tenure": 30,
+    "MonthlyCharges": 55.0,
+    "InternetService": "DSL",
+    "OnlineSecurity": "Yes",
+    "TechSupport": "Yes",
+}
+
+
+@pytest.fixture
+def shared_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(shared_state, "SHARED_DIR", str(tmp_path))
+    monkeypatch.setattr(shared_state, "ENABLED", True)
+    return tmp_path
+
+
+def test_prediction_log_store_merges_and_trims(shared_dir):
+    # 2 store = 2 worker ghi vào cùng 1 SQLite
+    a = shared_state.PredictionLogStore(flush_seconds=60, max_rows=5)
+    b = shared_state.PredictionLogStore(flush_seconds=60, max_rows=5)
+    for i in range(4):
+        a.append({**RECORD, "tenure": i, "prediction": 0})
+        b.append({**RECORD, "tenure": 100 + i, "prediction": 1})
+    a.stop()
+    b.stop()
+
+    assert a.count() == 5
+    recent = b.recent(3)
+    assert list(recent["tenure"]) == [101, 102, 103]
+    assert list(recent.columns) == shared_state.LOG_COLUMNS
+
+
+def test_compiled_model_is_published_once_and_memory_mapped(shared_dir):
+    scorer = CompiledPipeline.from_pipeline(mlflow.sklearn.load_model(str(EXPORTED_MODEL_PATH)))
+
+    assert shared_state.load_compiled("local:abc") is None
+    shared_state.publish_compiled("local:abc", scorer)
+    mapped = shared_state.load_compiled("local:abc")
+
+    assert mapped is not None
+    np.testing.assert_array_equal(
+        mapped.predict_proba_records([RECORD, RECORD]),
+        scorer.predict_proba_records([RECORD, RECORD]),
+    )
+
+
+def test_single_leader(shared_dir, monkeypatch):
+    monkeypatch.setattr(shared_state, "_leader_locks", {})
+    assert shared_state.try_become_leader("drift-scheduler") is True
+    assert shared_state.try_become_leader("drift-scheduler") is True  # đã giữ lock
+
+    # process khác (mô phỏng bằng state rỗng + file handle mới) không lấy được lock
+    held = shared_state._leader_locks
+    monkeypatch.setattr(shared_state, "_leader_locks", {})
+    assert shared_state.try_become_leader("drift-scheduler") is False
+    for f in held.values():
+        f.close()
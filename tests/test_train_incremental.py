@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+
+from scripts import train as train_module
+from scripts.service.scoring import CompiledPipeline
+
+
+def _frame(n, shift=0.0, seed=0):
+    """Data giả lập; shift > 0 làm churn phụ thuộc MonthlyCharges mạnh hơn."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Contract": rng.choice(["Month-to-month", "One year", "Two year"], n),
+            "tenure": rng.integers(0, 73, n),
+            "MonthlyCharges": rng.uniform(18, 120, n).round(2),
+            "InternetService": rng.choice(["DSL", "Fiber optic", "No"], n),
+            "OnlineSecurity": rng.choice(["No", "Yes", "No internet service"], n),
+            "TechSupport": rng.choice(["No", "Yes", "No internet service"], n),
+        }
+    )
+    z = (
+        1.2 * (df["Contract"] == "Month-to-month")
+        - 0.04 * df["tenure"]
+        + (0.02 + shift) * (df["MonthlyCharges"] - 70)
+    )
+    df["Churn"] = (rng.uniform(size=n) < 1 / (1 + np.exp(-z))).astype(int)
+    return df
+
+
+def _base_model():
+    X, y, model = train_module.build_pipeline(_frame(3000))
+    return model.fit(X, y)
+
+
+def test_tiny_learning_rate_keeps_base_predictions(monkeypatch):
+    monkeypatch.setattr(train_module, "INCREMENTAL_ETA0", 1e-12)
+    base = _base_model()
+    new = _frame(500, seed=1)
+    X = new[train_module.FEATURE_COLS]
+
+    updated = train_module.incremental_fit(base, X, new["Churn"], epochs=1)
+
+    # đổi hệ số qua lại giữa 2 không gian feature không làm đổi xác suất
+    assert np.allclose(updated.predict_proba(X), base.predict_proba(X), atol=1e-6)
+
+
+def test_incremental_update_learns_new_data_and_stays_compilable():
+    base = _base_model()
+    new = _frame(4000, shift=0.06, seed=2)
+    train, test = new.iloc[:3000], new.iloc[3000:]
+    X_test = test[train_module.FEATURE_COLS]
+
+    updated = train_module.incremental_fit(
+        base, train[train_module.FEATURE_COLS], train["Churn"], epochs=5
+    )
+
+    base_acc = accuracy_score(test["Churn"], base.predict(X_test))
+    new_acc = accuracy_score(test["Churn"], updated.predict(X_test))
+    assert new_acc > base_acc
+
+    compiled = CompiledPipeline.from_pipeline(updated)
+    records = X_test.to_dict(orient="records")
+    assert np.allclose(
+        compiled.predict_proba_records(records), updated.predict_proba(X_test)[:, 1]
+    )
+
+
+def test_update_promotes_only_when_not_worse(tmp_path, monkeypatch):
+    import mlflow
+    from mlflow.tracking import MlflowClient
+
+    uri = f"file://{tmp_path}/mlruns"
+    previous = mlflow.get_tracking_uri()
+    monkeypatch.setattr(train_module, "MLFLOW_TRACKING_URI", uri)
+    monkeypatch.setattr(train_module, "EXPERIMENT_NAME", "incremental-test")
+    base_path = tmp_path / "base"
+    mlflow.sklearn.save_model(_base_model(), str(base_path))
+    new_path = tmp_path / "new.csv"
+    _frame(2000, seed=3).to_csv(new_path, index=False)
+
+    def update(eta0):
+        monkeypatch.setattr(train_module, "INCREMENTAL_ETA0", eta0)
+        return train_module.update_incremental(
+            str(new_path), epochs=3, base_model_uri=str(base_path)
+        )
+
+    try:
+        # bước học cực lớn làm hỏng model -> chỉ đăng ký, không promote
+        bad = update(50.0)
+        # gần như giữ nguyên model cũ -> không tệ hơn -> promote
+        good = update(1e-12)
+
+        # file registry đọc model qua tracking URI global: kiểm tra trước khi trả lại
+        client = MlflowClient(tracking_uri=uri)
+
+        def stage(version):
+            return client.get_model_version(train_module.MODEL_NAME, version).current_stage
+
+        assert not bad["promoted"] and stage(bad["model_version"]) == "None"
+        assert client.get_run(bad["run_id"]).data.tags["promotion"] == "rejected"
+        assert good["promoted"] and stage(good["model_version"]) == "Production"
+    finally:
+        mlflow.set_tracking_uri(previous)
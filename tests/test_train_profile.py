@@ -0,0 +1,69 @@
+import json
+import sys
+
+import mlflow
+import pytest
+from mlflow.tracking import MlflowClient
+
+from scripts import train as train_module
+from tests.test_train_incremental import _frame
+
+STAGES = ["load", "split", "fit", "evaluate", "log_model", "registry"]
+
+
+def test_stage_profiler_records_failed_stage():
+    stages = train_module.StageProfiler()
+    with pytest.raises(ValueError):
+        with stages.stage("fit"):
+            raise ValueError("boom")
+
+    assert set(stages.stages["fit"]) >= {"seconds", "peak_memory_mb"}
+    assert stages.summary()["total_seconds"] == stages.stages["fit"]["seconds"]
+
+
+def test_train_logs_stage_metrics_and_profile(tmp_path, monkeypatch):
+    previous = mlflow.get_tracking_uri()
+    monkeypatch.setattr(train_module, "MLFLOW_TRACKING_URI", f"file://{tmp_path}/mlruns")
+    monkeypatch.setattr(train_module, "EXPERIMENT_NAME", "profile-test")
+    monkeypatch.setattr(train_module, "load_data", lambda: _frame(1500))
+    try:
+        result = train_module.train(profile=True)
+    finally:
+        mlflow.set_tracking_uri(previous)
+
+    assert list(result["stages"]) == STAGES
+    client = MlflowClient(tracking_uri=f"file://{tmp_path}/mlruns")
+    metrics = client.get_run(result["run_id"]).data.metrics
+    for name in STAGES:
+        assert metrics[f"stage_{name}_seconds"] >= 0
+        assert metrics[f"stage_{name}_peak_memory_mb"] > 0
+
+    artifacts = {a.path for a in client.list_artifacts(result["run_id"], "profile")}
+    assert artifacts == {
+        "profile/stages.json",
+        "profile/train.prof",
+        "profile/train_cumulative.txt",
+    }
+    local = client.download_artifacts(result["run_id"], "profile/stages.json", str(tmp_path))
+    with open(local, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert list(summary["stages"]) == STAGES
+
+
+def test_profiler_is_disabled_when_a_stage_fails(tmp_path, monkeypatch):
+    previous = mlflow.get_tracking_uri()
+    monkeypatch.setattr(train_module, "MLFLOW_TRACKING_URI", f"file://{tmp_path}/mlruns")
+    monkeypatch.setattr(train_module, "EXPERIMENT_NAME", "profile-test")
+    monkeypatch.setattr(train_module, "load_data", lambda: _frame(500))
+
+    def broken_registry(*args):
+        raise RuntimeError("registry down")
+
+    monkeypatch.setattr(train_module, "promote_run_model", broken_registry)
+    try:
+        with pytest.raises(RuntimeError, match="registry down"):
+            train_module.train(profile=True)
+    finally:
+        mlflow.set_tracking_uri(previous)
+
+    assert sys.getprofile() is None